@@ -9,8 +9,15 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'djangonista.settings')
 
 application = get_asgi_application()
+
+# See hub/warmup.py.
+if settings.HUB_WARMUP:
+    from hub.warmup import warm_up
+
+    warm_up()
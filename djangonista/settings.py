@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -42,6 +43,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'hub.middleware.CompressionMiddleware',
+    'hub.middleware.HtmlMinifyMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -56,12 +59,20 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'hub.context_processors.assets',
+            ],
+            # Compiled templates are kept in memory; the dev server's
+            # autoreloader clears this cache whenever a template changes.
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
             ],
         },
     },
@@ -80,6 +91,15 @@ DATABASES = {
     }
 }
 
+# Set DJANGONISTA_POSTGRES_DB to use Postgres instead, connecting with the
+# usual PGHOST/PGPORT/PGUSER/PGPASSWORD variables (e.g. a local container).
+# The trigram index and query plan tests only run there.
+if os.environ.get('DJANGONISTA_POSTGRES_DB'):
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ['DJANGONISTA_POSTGRES_DB'],
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -116,6 +136,22 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = 'static/'
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# Production asset profile: link the purged, minified Tailwind bundle from
+# `manage.py build_assets` instead of compiling CSS in the browser via the
+# CDN, and serve content-hashed files with far-future cache headers.
+HUB_BUILT_ASSETS = os.environ.get('DJANGONISTA_BUILT_ASSETS') == '1'
+
+if HUB_BUILT_ASSETS:
+    STORAGES = {
+        'default': {
+            'BACKEND': 'django.core.files.storage.FileSystemStorage',
+        },
+        'staticfiles': {
+            'BACKEND': 'django.contrib.staticfiles.storage.ManifestStaticFilesStorage',
+        },
+    }
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -124,3 +160,88 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Path to bundled JSON data for quick prototyping
 DATA_ROOT = BASE_DIR / 'data'
+
+# Compile every hub template into the cached loader when the app loads, so
+# the first request of a production worker doesn't pay for parsing.
+HUB_PRECOMPILE_TEMPLATES = not DEBUG
+
+# Collapse indentation and comments in hub HTML before compression.
+HUB_MINIFY_HTML = True
+
+# Responses smaller than this many bytes are sent uncompressed. Install the
+# optional `brotli` or `zstandard` packages to prefer those over gzip.
+HUB_COMPRESS_MIN_LENGTH = 512
+
+# Typo- and accent-tolerant search on databases without pg_trgm, backed by an
+# in-memory trigram index kept current by the search index queue.
+HUB_FUZZY_SEARCH = True
+
+# Search relevance (see hub/scoring.py). Field weights per model override
+# the defaults, e.g. {"person": {"bio": 0.5}}; `manage.py benchmark_search`
+# measures the effect of changes.
+HUB_SEARCH_WEIGHTS = {}
+HUB_SEARCH_PREFIX_BOOST = 2.0
+HUB_SEARCH_FUZZY_WEIGHT = 3.0
+HUB_SEARCH_RECENCY_BOOST = 1.0
+HUB_SEARCH_RECENCY_HALF_LIFE_DAYS = 180
+
+# How long browsers and proxies may reuse /api/search/ suggestions.
+HUB_SEARCH_CACHE_SECONDS = 60
+
+# Token-bucket limits per client IP as (requests per second, burst). Use
+# HUB_RATELIMIT_STORE = "cache" to share buckets between workers through the
+# HUB_RATELIMIT_CACHE cache backend.
+HUB_RATE_LIMITS = {"search": (5.0, 30)}
+HUB_RATELIMIT_STORE = "locmem"
+HUB_RATELIMIT_CACHE = "default"
+# Reverse proxies in front of the app that append to X-Forwarded-For. With 0,
+# buckets are keyed by REMOTE_ADDR, so every client behind a proxy shares one.
+HUB_TRUSTED_PROXY_COUNT = 0
+
+# Admin changelists skip full COUNT(*)s, read filter choices from the facet
+# cache and load only the listed columns. Filtered counts stop at
+# HUB_ADMIN_COUNT_LIMIT rows.
+HUB_ADMIN_PERFORMANCE_MODE = True
+HUB_ADMIN_COUNT_LIMIT = 10000
+
+# Distinct filter values (roles, cities, ...) are cached this many seconds,
+# and dropped early when a row is saved or deleted.
+HUB_FACET_CACHE_SECONDS = 300
+
+# Path of the mmap'd store every worker on a host reads counts, facets and
+# search postings from (see hub/sharedstore.py), built by `manage.py build_shared_store`.
+# None keeps a cache per worker instead.
+HUB_SHARED_STORE_PATH = None
+
+# None leaves rebuilds to one leader process running
+# `manage.py build_shared_store`. A number of seconds makes every writing
+# process rebuild that long after a change, from the index queue; changes in
+# between share the rebuild, and an older build never replaces a newer one.
+HUB_SHARED_STORE_REBUILD_DELAY = None
+
+# Seconds /api/changes/ holds new change log entries back. Sequence numbers
+# are allocated before a transaction commits, so with concurrent writers
+# (Postgres) this must exceed the longest write transaction, or a mirror may
+# skip past an entry that commits late. None: 0 on SQLite, which serialises
+# writes, and 10 elsewhere (hub.changelog.DEFAULT_CONCURRENT_DELAY).
+HUB_CHANGE_FEED_DELAY_SECONDS = None
+
+# Resolve URLs, compile templates, connect to the database and prime caches
+# when wsgi.py/asgi.py load, before the worker takes traffic (see
+# hub/warmup.py; with `gunicorn --preload`, warm up after the fork instead).
+HUB_WARMUP = not DEBUG
+
+# Send the warmup step timings to the console (the server's log).
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {"hub.warmup": {"handlers": ["console"], "level": "INFO"}},
+}
+
+# Recompute "similar people" for the affected rows whenever people change,
+# from the index queue after the write commits, off the request (see
+# hub/similarity.py). Each process that writes holds every person's vector in
+# memory from its first write. Off, or after a seed command, schedule
+# `manage.py build_recommendations` instead.
+HUB_SIMILARITY_INCREMENTAL = True
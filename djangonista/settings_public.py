@@ -0,0 +1,50 @@
+"""
+Settings for read-only public web workers.
+
+Serves the directory pages and the public API only: no admin, sessions,
+logins or messages, so workers import and set up less and boot faster.
+Run staff-facing workers and management commands with the full settings.
+
+    DJANGO_SETTINGS_MODULE=djangonista.settings_public gunicorn djangonista.wsgi
+
+`manage.py profile_startup --settings djangonista.settings_public` compares
+the two profiles.
+"""
+
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS, MIDDLEWARE, TEMPLATES
+
+INSTALLED_APPS = [
+    app for app in INSTALLED_APPS
+    if app not in (
+        'django.contrib.admin',
+        'django.contrib.auth',
+        'django.contrib.contenttypes',
+        'django.contrib.sessions',
+        'django.contrib.messages',
+    )
+]
+
+MIDDLEWARE = [
+    middleware for middleware in MIDDLEWARE
+    if middleware not in (
+        'django.contrib.sessions.middleware.SessionMiddleware',
+        'django.contrib.auth.middleware.AuthenticationMiddleware',
+        'django.contrib.messages.middleware.MessageMiddleware',
+    )
+]
+
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        'OPTIONS': {
+            **TEMPLATES[0]['OPTIONS'],
+            'context_processors': [
+                'django.template.context_processors.request',
+                'hub.context_processors.assets',
+            ],
+        },
+    },
+]
+
+ROOT_URLCONF = 'djangonista.urls_public'
@@ -14,10 +14,19 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
+
+from hub.views import static_asset
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('hub.urls')),  # Public landing page
 ]
+
+if settings.HUB_BUILT_ASSETS and not settings.DEBUG:
+    # Small deployments without a fronting web server; prefer nginx/CDN.
+    urlpatterns.append(
+        re_path(rf'^{settings.STATIC_URL.strip("/")}/(?P<path>.*)$', static_asset),
+    )
@@ -0,0 +1,23 @@
+"""
+URL configuration for read-only public workers (see settings_public).
+
+The hub's pages and public API, without the admin or staff-only endpoints.
+Doesn't import djangonista.urls, which would load the admin.
+"""
+from django.conf import settings
+from django.urls import include, path, re_path
+
+from hub.urls import STAFF_URL_NAMES, app_name
+from hub.urls import urlpatterns as hub_urlpatterns
+from hub.views import static_asset
+
+public_patterns = [pattern for pattern in hub_urlpatterns if pattern.name not in STAFF_URL_NAMES]
+
+urlpatterns = [
+    path('', include((public_patterns, app_name))),
+]
+
+if settings.HUB_BUILT_ASSETS and not settings.DEBUG:
+    urlpatterns.append(
+        re_path(rf'^{settings.STATIC_URL.strip("/")}/(?P<path>.*)$', static_asset),
+    )
@@ -7,10 +7,26 @@ For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 """
 
+import gc
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'djangonista.settings')
 
-application = get_wsgi_application()
+# Booting allocates almost only long-lived objects (modules, classes, URL
+# patterns), so collecting during it is wasted work: pause the collector,
+# then freeze what was loaded so later collections skip it. Frozen objects
+# also stay shared with a forking master process.
+gc.disable()
+try:
+    application = get_wsgi_application()
+
+    if settings.HUB_WARMUP:
+        from hub.warmup import warm_up
+
+        warm_up()
+finally:
+    gc.freeze()
+    gc.enable()
@@ -1,18 +1,247 @@
 """Admin registrations for hub models."""
 
-from django.contrib import admin
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.contrib.admin.views.main import ChangeList
+from django.core.exceptions import PermissionDenied
+from django.core.paginator import Paginator
+from django.db import connection
+from django.http import StreamingHttpResponse
+from django.template.response import TemplateResponse
+from django.utils.functional import cached_property
 from django.utils.html import format_html
-from django.urls import reverse
+from django.urls import path, reverse
 from django.utils.safestring import mark_safe
 
-from .models import Community, Person, School
+from .batching import batch_changes
+from .export import CONTENT_TYPES, export_filename, iter_export
+from .facets import facet_counts
+from .forms import BulkEditForm, ImportForm
+from .models import Affiliation, Community, Membership, Person, School
+from .scoring import match_q, rank_queryset, use_trigram
+from .seeding import bulk_apply, bulk_seed, parse_records
+from .utils import fold_text
+
+DEFAULT_COUNT_LIMIT = 10000
+
+
+def _export_action(fmt):
+    """Build an admin action streaming the selected rows as ``fmt``."""
+
+    def action(modeladmin, request, queryset):
+        response = StreamingHttpResponse(
+            iter_export(queryset, fmt), content_type=CONTENT_TYPES[fmt]
+        )
+        filename = export_filename(queryset.model, fmt)
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+    action.__name__ = f"export_{fmt}"
+    action.short_description = f"Export selected as {fmt.upper()}"
+    return action
+
+
+EXPORT_ACTIONS = tuple(_export_action(fmt) for fmt in ("jsonl", "csv", "json"))
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that never counts a large table in full.
+
+    An unfiltered Postgres table is sized from the planner's row estimate.
+    Anything else is counted up to ``HUB_ADMIN_COUNT_LIMIT`` rows, so a
+    huge result set shows that many rows' worth of pages.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if connection.vendor == "postgresql" and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            if row and row[0] > 0:
+                return row[0]
+        limit = getattr(settings, "HUB_ADMIN_COUNT_LIMIT", DEFAULT_COUNT_LIMIT)
+        return queryset.order_by()[:limit].count()
+
+
+def facet_filter(field, lookup=None):
+    """List filter whose choices come from the cached facet index.
+
+    ``lookup`` builds the filter kwargs from the chosen value; by default the
+    value is matched exactly against ``field``.
+    """
+
+    class FacetListFilter(admin.SimpleListFilter):
+        title = field.replace("_", " ")
+        parameter_name = field
+
+        def lookups(self, request, model_admin):
+            return [(value, f"{value} ({count})") for value, count in facet_counts(model_admin.model, field)]
+
+        def queryset(self, request, queryset):
+            value = self.value()
+            if not value:
+                return queryset
+            return queryset.filter(**(lookup(value) if lookup else {field: value}))
+
+    FacetListFilter.__name__ = f"{field.title().replace('_', '')}FacetFilter"
+    return FacetListFilter
+
+
+class ProjectedChangeList(ChangeList):
+    def get_queryset(self, request, exclude_parameters=None):
+        queryset = super().get_queryset(request, exclude_parameters)
+        if self.model_admin.list_only:
+            queryset = queryset.only(*self.model_admin.list_only)
+        return queryset
+
+
+class PerformanceAdminMixin:
+    """Changelist settings that stay fast on tables with millions of rows.
+
+    Pagination skips the full ``COUNT(*)``, list filters read the facet
+    cache instead of running ``DISTINCT`` scans, searches match the same
+    fields as the public search (:func:`~hub.scoring.match_q`, or the
+    trigram index on Postgres), and the changelist loads only the
+    ``list_only`` columns. Set ``HUB_ADMIN_PERFORMANCE_MODE = False`` for stock behaviour.
+    """
+
+    list_only = ()
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    @property
+    def performance_mode(self):
+        return getattr(settings, "HUB_ADMIN_PERFORMANCE_MODE", True)
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        paginator = self.paginator if self.performance_mode else Paginator
+        return paginator(queryset, per_page, orphans, allow_empty_first_page)
+
+    def get_changelist(self, request, **kwargs):
+        return ProjectedChangeList if self.performance_mode else super().get_changelist(request, **kwargs)
+
+    def get_search_results(self, request, queryset, search_term):
+        # search_fields name the folded columns, so fold the term to match.
+        term = fold_text(search_term)
+        if not self.performance_mode:
+            return super().get_search_results(request, queryset, term)
+        if not term:
+            return queryset, False
+        if use_trigram():
+            # The changelist re-applies its own ordering over the ranking.
+            return rank_queryset(queryset, search_term, trigram=True), False
+        return queryset.filter(match_q(self.model, search_term)), False
+
+
+class BulkAdminMixin:
+    """Mass edits and file imports through the chunked writes in :mod:`hub.seeding`.
+
+    Both run in a single transaction and invalidate facets and the search
+    index once on commit, instead of saving and signalling row by row.
+    """
+
+    change_list_template = "admin/hub/change_list.html"
+
+    def response_action(self, request, queryset):
+        # Actions such as "Delete selected" save or delete row by row; batch
+        # their change notifications.
+        with batch_changes():
+            return super().response_action(request, queryset)
+
+    @admin.action(description="Bulk edit selected", permissions=["change"])
+    def bulk_edit(self, request, queryset):
+        opts = self.model._meta
+        form = BulkEditForm(self.model, request.POST if "apply" in request.POST else None)
+        if form.is_bound and form.is_valid():
+            report = bulk_apply(queryset, form.changes())
+            self.message_user(
+                request,
+                f"Updated {report.updated} {opts.verbose_name_plural} in {len(report.progress)} chunk(s).",
+                messages.SUCCESS,
+            )
+            for line in report.progress:
+                self.message_user(request, line, messages.INFO)
+            return None
+        context = {
+            **self.admin_site.each_context(request),
+            "title": f"Bulk edit {opts.verbose_name_plural}",
+            "opts": opts,
+            "form": form,
+            "count": queryset.count(),
+            "selected": request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+            "select_across": request.POST.get("select_across", "0"),
+            "action_checkbox_name": helpers.ACTION_CHECKBOX_NAME,
+        }
+        return TemplateResponse(request, "admin/hub/bulk_edit.html", context)
+
+    def get_urls(self):
+        opts = self.model._meta
+        urls = [
+            path(
+                "import/",
+                self.admin_site.admin_view(self.import_view),
+                name=f"{opts.app_label}_{opts.model_name}_import",
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def import_view(self, request):
+        if not (self.has_add_permission(request) and self.has_change_permission(request)):
+            raise PermissionDenied
+        opts = self.model._meta
+        report = None
+        form = ImportForm(request.POST or None, request.FILES or None)
+        if request.method == "POST" and form.is_valid():
+            upload = form.cleaned_data["file"]
+            try:
+                records = parse_records(upload.read(), upload.name)
+            except (ValueError, UnicodeDecodeError) as exc:
+                form.add_error("file", f"Could not read the file: {exc}")
+            else:
+                report = bulk_seed(self.model, records, validate=True)
+        context = {
+            **self.admin_site.each_context(request),
+            "title": f"Import {opts.verbose_name_plural}",
+            "opts": opts,
+            "form": form,
+            "report": report,
+        }
+        return TemplateResponse(request, "admin/hub/import.html", context)
+
+
+class MembershipInline(admin.TabularInline):
+    model = Membership
+    extra = 0
+    raw_id_fields = ("person", "community")
+
+
+class AffiliationInline(admin.TabularInline):
+    model = Affiliation
+    extra = 0
+    raw_id_fields = ("person", "school")
 
 
 @admin.register(Person)
-class PersonAdmin(admin.ModelAdmin):
+class PersonAdmin(BulkAdminMixin, PerformanceAdminMixin, admin.ModelAdmin):
     list_display = ("name", "role", "availability", "social_links", "created_at")
-    list_filter = ("role", "availability")
-    search_fields = ("name", "role", "bio", "interests")
+    list_filter = (
+        facet_filter("role", lambda value: {"role_folded": fold_text(value)}),
+        facet_filter("availability"),
+        facet_filter("interests", lambda value: {"interests_folded__contains": f"|{fold_text(value)}|"}),
+    )
+    search_fields = ("name_folded", "role_folded", "bio", "interests_folded")
+    list_only = (
+        "name", "slug", "role", "availability", "created_at",
+        "github_url", "twitter_url", "linkedin_url", "website_url",
+    )
+    actions = EXPORT_ACTIONS + ("bulk_edit",)
+    inlines = (MembershipInline, AffiliationInline)
     readonly_fields = ("slug", "created_at", "updated_at")
     fieldsets = (
         ("Basic Information", {
@@ -54,10 +283,16 @@ class PersonAdmin(admin.ModelAdmin):
 
 
 @admin.register(Community)
-class CommunityAdmin(admin.ModelAdmin):
+class CommunityAdmin(BulkAdminMixin, PerformanceAdminMixin, admin.ModelAdmin):
     list_display = ("name", "location", "member_count", "founded_year", "contact")
-    list_filter = ("location", "founded_year")
-    search_fields = ("name", "location", "focus", "description")
+    list_filter = (
+        facet_filter("location", lambda value: {"location_folded": fold_text(value)}),
+        "founded_year",
+    )
+    search_fields = ("name_folded", "location_folded", "focus", "description")
+    list_only = ("name", "slug", "location", "member_count", "founded_year", "contact")
+    actions = EXPORT_ACTIONS + ("bulk_edit",)
+    inlines = (MembershipInline,)
     readonly_fields = ("slug", "created_at", "updated_at")
     fieldsets = (
         ("Basic Information", {
@@ -81,10 +316,16 @@ class CommunityAdmin(admin.ModelAdmin):
 
 
 @admin.register(School)
-class SchoolAdmin(admin.ModelAdmin):
+class SchoolAdmin(BulkAdminMixin, PerformanceAdminMixin, admin.ModelAdmin):
     list_display = ("name", "city", "programs_count", "contact")
-    list_filter = ("city",)
-    search_fields = ("name", "city", "programs")
+    list_filter = (
+        facet_filter("city", lambda value: {"city_folded": fold_text(value)}),
+        facet_filter("programs", lambda value: {"programs_folded__contains": f"|{fold_text(value)}|"}),
+    )
+    search_fields = ("name_folded", "city_folded", "programs_folded")
+    list_only = ("name", "slug", "city", "programs", "contact")
+    actions = EXPORT_ACTIONS + ("bulk_edit",)
+    inlines = (AffiliationInline,)
     readonly_fields = ("slug", "created_at", "updated_at")
     fieldsets = (
         ("Basic Information", {
@@ -0,0 +1,359 @@
+"""Read-only JSON API for the directory.
+
+List endpoints reuse the ``_filter_*`` helpers from the HTML views, page
+with an opaque keyset cursor, and stream their payload so large exports run
+at constant memory.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import json
+
+from django.contrib.auth.decorators import user_passes_test
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.views.decorators.http import condition, require_http_methods
+
+from . import changelog, geo
+from .instrumentation import metrics
+from .models import Community, Person, School
+from .query import QueryError
+from .views import _filter_communities, _filter_people, _filter_schools
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+# Public fields per model. ``url`` is computed from the slug.
+API_FIELDS = {
+    Person: (
+        "id", "name", "slug", "url", "role", "interests", "availability",
+        "avatar_url", "bio", "github_url", "twitter_url", "linkedin_url",
+        "website_url", "created_at", "updated_at",
+    ),
+    Community: (
+        "id", "name", "slug", "url", "focus", "location", "contact", "links",
+        "logo_url", "description", "founded_year", "member_count",
+        "created_at", "updated_at",
+    ),
+    School: (
+        "id", "name", "slug", "url", "city", "programs", "contact",
+        "created_at", "updated_at",
+    ),
+}
+
+DETAIL_URL_NAMES = {
+    Person: "hub:person-detail",
+    Community: "hub:community-detail",
+    School: "hub:school-detail",
+}
+
+
+class APIError(Exception):
+    """Raised for malformed query parameters; rendered as a 400 response."""
+
+
+def _error(message, status=400):
+    return JsonResponse({"error": message}, status=status)
+
+
+def _selected_fields(request, model):
+    allowed = API_FIELDS[model]
+    raw = request.GET.get("fields", "").strip()
+    if not raw:
+        return allowed
+    requested = [name.strip() for name in raw.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in allowed]
+    if unknown:
+        raise APIError(f"Unknown field(s): {', '.join(unknown)}.")
+    return tuple(requested)
+
+
+def _limit(request):
+    raw = request.GET.get("limit", "")
+    if not raw:
+        return DEFAULT_LIMIT
+    try:
+        limit = int(raw)
+    except ValueError as exc:
+        raise APIError("limit must be an integer.") from exc
+    return max(1, min(limit, MAX_LIMIT))
+
+
+def encode_cursor(name, pk):
+    payload = json.dumps([name, pk], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    padded = token + "=" * (-len(token) % 4)
+    try:
+        name, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError, TypeError) as exc:
+        raise APIError("Invalid cursor.") from exc
+    if not isinstance(name, str) or not isinstance(pk, int):
+        raise APIError("Invalid cursor.")
+    return name, pk
+
+
+def _collection_queryset(request, model, filter_func):
+    """Filtered queryset in stable keyset order, positioned after ``cursor``."""
+    try:
+        queryset = filter_func(model.objects.all(), request).order_by("name", "pk")
+    except QueryError as exc:
+        raise APIError(str(exc)) from exc
+    cursor = request.GET.get("cursor", "").strip()
+    if cursor:
+        name, pk = decode_cursor(cursor)
+        queryset = queryset.filter(Q(name__gt=name) | Q(name=name, pk__gt=pk))
+    return queryset
+
+
+def _columns(model, fields):
+    return {"id", "name", "slug"} | {f for f in fields if f != "url"}
+
+
+def _serialize_row(row, model, fields):
+    item = {}
+    for field in fields:
+        if field == "url":
+            item["url"] = reverse(DETAIL_URL_NAMES[model], kwargs={"slug": row["slug"]})
+        else:
+            item[field] = row[field]
+    return item
+
+
+def _stream_page(rows, model, fields, limit):
+    """Yield the JSON document for one page, one record at a time."""
+    encoder = DjangoJSONEncoder(separators=(",", ":"))
+    last = None
+    yield b'{"results":['
+    for index, row in enumerate(rows):
+        if index == limit:
+            break
+        last = row
+        item = _serialize_row(row, model, fields)
+        yield (b"," if index else b"") + encoder.encode(item).encode()
+    else:
+        last = None  # Exhausted without seeing a row past the page: no next page.
+    next_cursor = encode_cursor(last["name"], last["id"]) if last else None
+    yield b'],"next":' + encoder.encode(next_cursor).encode() + b"}"
+
+
+def _collection_etag(model, filter_func):
+    """ETag of the page served: ids and ``updated_at`` of its ``limit + 1``
+    rows (the extra one decides ``next``), read in the same keyset order,
+    so checking it costs no more than the page itself."""
+
+    def etag(request, *args, **kwargs):
+        try:
+            queryset = _collection_queryset(request, model, filter_func)
+            limit = _limit(request)
+        except APIError:
+            return None
+        rows = queryset.values_list("pk", "updated_at")[: limit + 1]
+        fingerprint = "|".join([request.GET.urlencode(), *(f"{pk}:{ts.isoformat()}" for pk, ts in rows)])
+        return hashlib.sha1(fingerprint.encode()).hexdigest()
+
+    return etag
+
+
+def _detail_etag(model):
+    def etag(request, slug):
+        updated_at = model.objects.filter(slug=slug).values_list("updated_at", flat=True).first()
+        if updated_at is None:
+            return None
+        fingerprint = f"{slug}|{updated_at.isoformat()}|{request.GET.urlencode()}"
+        return hashlib.sha1(fingerprint.encode()).hexdigest()
+
+    return etag
+
+
+def collection_view(model, filter_func):
+    """Build a streaming, cursor-paginated list endpoint for ``model``."""
+
+    @require_http_methods(["GET", "HEAD"])
+    @condition(etag_func=_collection_etag(model, filter_func))
+    def view(request):
+        try:
+            fields = _selected_fields(request, model)
+            limit = _limit(request)
+            queryset = _collection_queryset(request, model, filter_func)
+        except APIError as exc:
+            return _error(str(exc))
+
+        rows = queryset.values(*_columns(model, fields))[: limit + 1].iterator(chunk_size=limit + 1)
+        return StreamingHttpResponse(
+            _stream_page(rows, model, fields, limit),
+            content_type="application/json",
+        )
+
+    view.__name__ = f"{model._meta.model_name}_collection"
+    return view
+
+
+def detail_view(model):
+    """Build a JSON detail endpoint for ``model`` looked up by slug."""
+
+    @require_http_methods(["GET", "HEAD"])
+    @condition(etag_func=_detail_etag(model))
+    def view(request, slug):
+        try:
+            fields = _selected_fields(request, model)
+        except APIError as exc:
+            return _error(str(exc))
+
+        row = model.objects.filter(slug=slug).values(*_columns(model, fields)).first()
+        if row is None:
+            raise Http404(f"No {model._meta.verbose_name} matches the given slug.")
+        item = _serialize_row(row, model, fields)
+        return JsonResponse(item)
+
+    view.__name__ = f"{model._meta.model_name}_detail"
+    return view
+
+
+people_collection = collection_view(Person, _filter_people)
+person_detail = detail_view(Person)
+community_collection = collection_view(Community, _filter_communities)
+community_detail = detail_view(Community)
+school_collection = collection_view(School, _filter_schools)
+school_detail = detail_view(School)
+
+
+def _since(request):
+    raw = request.GET.get("since", "").strip() or "0"
+    try:
+        since = int(raw)
+    except ValueError as exc:
+        raise APIError("since must be a sequence number.") from exc
+    if since < 0:
+        raise APIError("since must not be negative.")
+    return since
+
+
+def _change_models(request):
+    names = [name.strip() for name in request.GET.get("model", "").split(",") if name.strip()]
+    unknown = [name for name in names if name not in changelog.MODELS]
+    if unknown:
+        raise APIError(f"Unknown model(s): {', '.join(unknown)}.")
+    return names
+
+
+def change_items(entries):
+    """Feed items for change log ``entries``, each with the row's current
+    public fields as ``record`` (``None`` once the row is gone)."""
+    rows = changelog.current_rows(entries, lambda model: _columns(model, API_FIELDS[model]))
+    for entry in entries:
+        model = changelog.MODELS[entry.model_name]
+        row = rows.get((entry.model_name, entry.object_id))
+        yield {
+            "seq": entry.seq,
+            "model": entry.model_name,
+            "id": entry.object_id,
+            "action": entry.action,
+            "changed_at": entry.changed_at,
+            "record": _serialize_row(row, model, API_FIELDS[model]) if row else None,
+        }
+
+
+def _stream_changes(entries, next_since, more):
+    encoder = DjangoJSONEncoder(separators=(",", ":"))
+    yield b'{"results":['
+    for index, item in enumerate(change_items(entries)):
+        yield (b"," if index else b"") + encoder.encode(item).encode()
+    yield b'],"next":' + encoder.encode(next_since).encode() + b',"more":' + encoder.encode(more).encode() + b"}"
+
+
+@require_http_methods(["GET", "HEAD"])
+def changes(request):
+    """Changes after ``?since=<seq>``, oldest first.
+
+    Pass the returned ``next`` as ``since`` to continue; ``more`` says
+    whether another page is already waiting.
+    """
+    try:
+        since = _since(request)
+        limit = _limit(request)
+        model_names = _change_models(request)
+    except APIError as exc:
+        return _error(str(exc))
+    entries = changelog.changes_since(since, limit + 1, model_names)
+    more = len(entries) > limit
+    entries = entries[:limit]
+    next_since = entries[-1].seq if entries else since
+    return StreamingHttpResponse(_stream_changes(entries, next_since, more), content_type="application/json")
+
+
+@require_http_methods(["GET"])
+# Like admin's staff_member_required, without importing the admin on
+# workers that don't serve it.
+@user_passes_test(lambda user: user.is_active and user.is_staff, login_url="admin:login")
+def metrics_snapshot(request):
+    """Counters and timings recorded by the worker serving this request."""
+    return JsonResponse(metrics.snapshot())
+
+
+def _origin(request):
+    """``(place, lat, lon)`` from ``place`` or ``lat``/``lon`` parameters."""
+    name = request.GET.get("place", "").strip()
+    if name:
+        place = geo.geocode(name)
+        if place is None:
+            raise APIError(f"Unknown place: {name}.")
+        return place, place.lat, place.lon
+    try:
+        lat, lon = float(request.GET["lat"]), float(request.GET["lon"])
+    except KeyError as exc:
+        raise APIError("Pass place, or lat and lon.") from exc
+    except ValueError as exc:
+        raise APIError("lat and lon must be numbers.") from exc
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise APIError("lat and lon are out of range.")
+    return None, lat, lon
+
+
+def _radius(request):
+    try:
+        return geo.parse_radius(request.GET.get("radius", "").strip())
+    except ValueError as exc:
+        raise APIError(str(exc)) from exc
+
+
+@require_http_methods(["GET", "HEAD"])
+def nearby(request):
+    """Communities and schools within ``radius`` km of a place, nearest first."""
+    try:
+        place, lat, lon = _origin(request)
+        radius = _radius(request)
+        limit = _limit(request)
+    except APIError as exc:
+        return _error(str(exc))
+
+    payload = {
+        "origin": {"place": place.name if place else None, "lat": lat, "lon": lon},
+        "radius_km": radius,
+    }
+    for key, model, place_field in (
+        ("communities", Community, "location"),
+        ("schools", School, "city"),
+    ):
+        rows = (
+            geo.within(model.objects.all(), lat, lon, radius)
+            .order_by("distance_km", "name")
+            .values("name", "slug", place_field, "distance_km")[:limit]
+        )
+        payload[key] = [
+            {
+                "name": row["name"],
+                "url": reverse(DETAIL_URL_NAMES[model], kwargs={"slug": row["slug"]}),
+                place_field: row[place_field],
+                "distance_km": round(row["distance_km"], 3),
+            }
+            for row in rows
+        ]
+    return JsonResponse(payload)
@@ -1,6 +1,42 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db import connection
+from django.db.backends.signals import connection_created
 
 
 class HubConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'hub'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        if getattr(settings, "HUB_PRECOMPILE_TEMPLATES", False):
+            from .templating import precompile_templates
+
+            precompile_templates()
+
+        if connection.vendor == "postgresql":
+            from .scoring import set_trigram_threshold
+
+            connection_created.connect(set_trigram_threshold, dispatch_uid="hub.set_trigram_threshold")
+
+        if getattr(settings, "HUB_FUZZY_SEARCH", False) and connection.vendor != "postgresql":
+            from .fuzzy import fuzzy_index
+            from .indexing import index_queue
+
+            index_queue.register(fuzzy_index.apply)
+
+        if getattr(settings, "HUB_SIMILARITY_INCREMENTAL", True):
+            from .indexing import index_queue
+            from .similarity import apply as refresh_similar_people
+
+            index_queue.register(refresh_similar_people)
+
+        if getattr(settings, "HUB_SHARED_STORE_PATH", None):
+            from .sharedstore import apply as rebuild_shared_store, rebuild_delay
+
+            if rebuild_delay() is not None:
+                from .indexing import index_queue
+
+                index_queue.register(rebuild_shared_store)
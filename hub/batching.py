@@ -0,0 +1,82 @@
+"""Batched change notifications for directory rows.
+
+Derived data (the search index, facet caches) listens to
+:data:`objects_changed` rather than to ``post_save``/``post_delete``. Each
+row change is :func:`record`-ed; outside a batch it is dispatched once the
+surrounding transaction commits (at once in autocommit mode), while inside
+:func:`batch_changes` changes are buffered and deduplicated by
+``(model, pk)`` and dispatched once per model when the outermost block
+exits::
+
+    with batch_changes():
+        for entry in payload:
+            Person.objects.update_or_create(...)
+
+A batch dispatches once the surrounding transaction commits; wrap
+``transaction.atomic()`` inside the batch, not the other way round, to
+dispatch as soon as the block is done.
+"""
+
+from __future__ import annotations
+
+import threading
+from contextlib import ContextDecorator
+
+from django.db import transaction
+from django.dispatch import Signal
+
+from .instrumentation import metrics
+
+# Sent with ``sender=<model>`` and ``pks``, a frozenset of primary keys that
+# were created, updated or deleted. Receivers re-read the rows to tell
+# which.
+objects_changed = Signal()
+
+_local = threading.local()
+
+
+def _send(model, pks):
+    metrics.incr(f"batching.{model._meta.label_lower}.dispatched")
+    objects_changed.send(sender=model, pks=frozenset(pks))
+
+
+def record(model, pks):
+    """Note that rows ``pks`` of ``model`` changed.
+
+    Outside a batch the signal is sent when the surrounding transaction
+    commits, so receivers never see, or cache, rows that may roll back;
+    ``save()`` always runs in one.
+    """
+    pks = set(pks)
+    pending = getattr(_local, "pending", None)
+    if pending is None:
+        transaction.on_commit(lambda: _send(model, pks))
+        return
+    buffered = pending.setdefault(model, set())
+    before = len(buffered)
+    buffered.update(pks)
+    metrics.incr("batching.coalesced", len(pks) - (len(buffered) - before))
+
+
+class batch_changes(ContextDecorator):
+    """Buffer :func:`record` calls and dispatch them once on exit.
+
+    Nested blocks join the outermost one. Changes are dispatched even when
+    the block raises: rows written before the error may have been committed,
+    and receivers re-read the database anyway.
+    """
+
+    def __enter__(self):
+        if getattr(_local, "depth", 0) == 0:
+            _local.pending = {}
+        _local.depth = getattr(_local, "depth", 0) + 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _local.depth -= 1
+        if _local.depth:
+            return False
+        pending, _local.pending = _local.pending, None
+        for model, pks in pending.items():
+            transaction.on_commit(lambda model=model, pks=pks: _send(model, pks))
+        return False
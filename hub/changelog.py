@@ -0,0 +1,96 @@
+"""Append-only change log behind the ``/api/changes/`` feed.
+
+Every write path (``save()``/``delete()`` through :mod:`hub.signals`, and
+the chunked writes of :mod:`hub.seeding`) appends a
+:class:`~hub.models.ChangeLogEntry` per row in the same transaction as the
+change, so the log never records a rolled-back write or misses a committed
+one. Mirrors poll :func:`changes_since` with the last ``seq`` they applied
+and only refetch what changed.
+
+Sequence numbers are allocated when a row is inserted, not when its
+transaction commits. Where writers run concurrently (Postgres), a
+long transaction can commit an entry below a ``seq`` a reader has already
+passed, so :func:`feed_delay` holds entries back until such transactions
+are done: ``HUB_CHANGE_FEED_DELAY_SECONDS``, by default
+:data:`DEFAULT_CONCURRENT_DELAY` seconds, or none on SQLite, which
+serializes writers.
+"""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import ChangeLogEntry, Community, Person, School
+
+MODELS = {model._meta.model_name: model for model in (Person, Community, School)}
+DEFAULT_BATCH_SIZE = 500
+# Seconds entries are held back by default where writers run concurrently;
+# longer write transactions need a higher HUB_CHANGE_FEED_DELAY_SECONDS.
+DEFAULT_CONCURRENT_DELAY = 10.0
+
+
+def log_changes(model, pks, action):
+    """Append one ``action`` entry per row ``pks`` of ``model``."""
+    ChangeLogEntry.objects.bulk_create(
+        [ChangeLogEntry(model_name=model._meta.model_name, object_id=pk, action=action) for pk in pks]
+    )
+
+
+def feed_delay():
+    """Seconds an entry is held back before readers may pass its ``seq``."""
+    delay = getattr(settings, "HUB_CHANGE_FEED_DELAY_SECONDS", None)
+    if delay is None:
+        vendor = connections[ChangeLogEntry.objects.db].vendor
+        delay = 0 if vendor == "sqlite" else DEFAULT_CONCURRENT_DELAY
+    return delay
+
+
+def _settled(entries):
+    delay = feed_delay()
+    if delay:
+        entries = entries.filter(changed_at__lte=timezone.now() - timedelta(seconds=delay))
+    return entries
+
+
+def changes_since(since, limit=DEFAULT_BATCH_SIZE, model_names=None):
+    """Up to ``limit`` entries with ``seq > since``, oldest first."""
+    entries = ChangeLogEntry.objects.filter(seq__gt=since)
+    if model_names:
+        entries = entries.filter(model_name__in=model_names)
+    return list(_settled(entries).order_by("seq")[:limit])
+
+
+def settled_seq():
+    """The highest ``seq`` past the feed delay: no entry at or below it is
+    expected to commit later."""
+    return _settled(ChangeLogEntry.objects.all()).aggregate(seq=Max("seq"))["seq"] or 0
+
+
+def iter_batches(since, batch_size=DEFAULT_BATCH_SIZE, model_names=None):
+    """Yield successive :func:`changes_since` batches until caught up."""
+    while True:
+        batch = changes_since(since, batch_size, model_names)
+        if not batch:
+            return
+        yield batch
+        since = batch[-1].seq
+
+
+def current_rows(entries, columns):
+    """``{(model_name, pk): row values}`` for the rows of ``entries`` that
+    still exist; ``columns(model)`` names the values to read."""
+    wanted = {}
+    for entry in entries:
+        if entry.action != ChangeLogEntry.DELETED:
+            wanted.setdefault(entry.model_name, set()).add(entry.object_id)
+    rows = {}
+    for model_name, pks in wanted.items():
+        model = MODELS[model_name]
+        for row in model.objects.filter(pk__in=pks).values(*columns(model)):
+            rows[model_name, row["id"]] = row
+    return rows
@@ -0,0 +1,8 @@
+"""Template context shared by every hub page."""
+
+from django.conf import settings
+
+
+def assets(request):
+    """Tell ``base.html`` whether to link the prebuilt CSS bundle."""
+    return {"hub_built_assets": getattr(settings, "HUB_BUILT_ASSETS", False)}
@@ -0,0 +1,114 @@
+"""Streaming exporters for directory data.
+
+Every exporter reads rows with ``.iterator(chunk_size=...)`` and yields text
+chunks, so a dump of any size runs at constant memory. The ``json`` format
+writes the same list-of-records layout the ``seed_*`` commands consume.
+"""
+
+from __future__ import annotations
+
+import csv
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Community, Person, School
+
+DEFAULT_CHUNK_SIZE = 2000
+
+# Fields per model, in the same shape as data/*.json and the seed commands.
+EXPORT_FIELDS = {
+    Person: (
+        "name", "role", "interests", "availability", "avatar_url", "bio",
+        "github_url", "twitter_url", "linkedin_url", "website_url",
+    ),
+    Community: (
+        "name", "focus", "location", "contact", "links", "logo_url",
+        "description", "founded_year", "member_count",
+    ),
+    School: ("name", "city", "programs", "contact"),
+}
+
+# Data file stem for each model, matching ``load_json_data`` names.
+DATA_NAMES = {
+    Person: "people",
+    Community: "communities",
+    School: "schools",
+}
+
+FORMATS = ("jsonl", "csv", "json")
+
+CONTENT_TYPES = {
+    "jsonl": "application/x-ndjson",
+    "csv": "text/csv",
+    "json": "application/json",
+}
+
+_encoder = DjangoJSONEncoder(ensure_ascii=False)
+
+
+def iter_rows(queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield export dictionaries for ``queryset`` without caching results."""
+    fields = EXPORT_FIELDS[queryset.model]
+    return queryset.order_by("pk").values(*fields).iterator(chunk_size=chunk_size)
+
+
+def _jsonl(rows):
+    for row in rows:
+        yield _encoder.encode(row) + "\n"
+
+
+def _json(rows):
+    yield "["
+    for index, row in enumerate(rows):
+        yield ("," if index else "") + "\n  " + _encoder.encode(row)
+    yield "\n]\n"
+
+
+class _Echo:
+    """File-like object whose ``write`` hands back the value for streaming."""
+
+    def write(self, value):
+        return value
+
+
+def _csv(rows, fields):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow([_csv_cell(row[field]) for field in fields])
+
+
+def _csv_cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, (list, dict)):
+        return _encoder.encode(value)
+    return value
+
+
+def iter_export(queryset, fmt, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield ``queryset`` serialised as ``fmt`` in text chunks."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {', '.join(FORMATS)}.")
+    rows = iter_rows(queryset, chunk_size)
+    if fmt == "jsonl":
+        return _jsonl(rows)
+    if fmt == "json":
+        return _json(rows)
+    return _csv(rows, EXPORT_FIELDS[queryset.model])
+
+
+def gzip_chunks(chunks, level=6):
+    """Incrementally gzip an iterable of text chunks."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_filename(model, fmt, compress=False):
+    name = f"{DATA_NAMES[model]}.{fmt}"
+    return f"{name}.gz" if compress else name
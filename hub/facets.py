@@ -0,0 +1,101 @@
+"""Cached facet values (distinct values with row counts) for directory fields.
+
+The list page dropdowns and the admin filters both need "every distinct
+role / city / interest". Computing that is a full-table scan, so results
+are cached per ``(model, field)`` for ``HUB_FACET_CACHE_SECONDS`` and
+dropped whenever rows of the model change (once per
+:mod:`hub.batching` batch, see :mod:`hub.signals`). Writes that bypass
+signals (``QuerySet.update()``) become visible once the entry expires.
+
+When ``HUB_SHARED_STORE_PATH`` is set, counts and facets are read from the
+store shared by every worker on the host (see :mod:`hub.sharedstore`)
+instead, and the per-process cache is only a fallback.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db.models import Count
+
+from . import sharedstore
+from .models import Community, Person, School
+
+FACET_FIELDS = {
+    Person: ("role", "availability", "interests"),
+    Community: ("location",),
+    School: ("city", "programs"),
+}
+
+DEFAULT_CACHE_SECONDS = 300
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def _compute(model, field):
+    if model._meta.get_field(field).get_internal_type() == "JSONField":
+        counts = Counter()
+        for values in model.objects.order_by().values_list(field, flat=True).iterator(chunk_size=2000):
+            counts.update(value for value in values or () if value)
+        return sorted(counts.items())
+    # order_by() drops the default ordering, which would otherwise be added
+    # to GROUP BY and split identical values into separate groups.
+    rows = (
+        model.objects.order_by()
+        .exclude(**{field: ""})
+        .values_list(field)
+        .annotate(count=Count("pk"))
+    )
+    return sorted(rows)
+
+
+def _cached(key, compute):
+    ttl = getattr(settings, "HUB_FACET_CACHE_SECONDS", DEFAULT_CACHE_SECONDS)
+    now = time.monotonic()
+    with _lock:
+        cached = _cache.get(key)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+    value = compute()
+    if ttl:
+        with _lock:
+            _cache[key] = (now + ttl, value)
+    return value
+
+
+def facet_counts(model, field):
+    """Return ``[(value, row_count)]`` for ``field``, sorted by value."""
+    store = sharedstore.shared_store()
+    if store is not None:
+        counts = store.facet_counts(model, field)
+        if counts is not None:
+            return counts
+    return _cached((model._meta.label_lower, field), lambda: _compute(model, field))
+
+
+def row_count(model):
+    """Total number of ``model`` rows, cached like the facets."""
+    store = sharedstore.shared_store()
+    if store is not None:
+        return store.count(model)
+    return _cached((model._meta.label_lower, None), model.objects.count)
+
+
+def facet_values(model, field):
+    """Distinct non-empty values of ``field``, sorted."""
+    return [value for value, _ in facet_counts(model, field)]
+
+
+def invalidate(model=None):
+    """Drop cached facets of ``model``, or of every model."""
+    with _lock:
+        if model is None:
+            _cache.clear()
+            return
+        label = model._meta.label_lower
+        for key in [key for key in _cache if key[0] == label]:
+            del _cache[key]
@@ -0,0 +1,69 @@
+"""Forms for the admin bulk edit and import screens."""
+
+from __future__ import annotations
+
+from django import forms
+
+from .models import Community, Person, School
+
+# Fields the bulk edit form can overwrite, and list fields it can add to or
+# remove items from, per model.
+BULK_EDIT_FIELDS = {
+    Person: (("role", "availability"), ("interests",)),
+    Community: (("location", "contact"), ()),
+    School: (("city", "contact"), ("programs",)),
+}
+
+
+def _split(value):
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+class BulkEditForm(forms.Form):
+    """Changes to apply to every selected row; blank inputs change nothing."""
+
+    def __init__(self, model, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.model = model
+        scalar_fields, list_fields = BULK_EDIT_FIELDS[model]
+        for name in scalar_fields:
+            # The model field's own form field carries its max_length.
+            model_field = model._meta.get_field(name)
+            self.fields[f"set_{name}"] = model_field.formfield(
+                required=False, label=f"Set {model_field.verbose_name} to"
+            )
+        for name in list_fields:
+            label = model._meta.get_field(name).verbose_name
+            self.fields[f"add_{name}"] = forms.CharField(
+                required=False, label=f"Add {label}", help_text="Comma-separated."
+            )
+            self.fields[f"remove_{name}"] = forms.CharField(
+                required=False, label=f"Remove {label}", help_text="Comma-separated."
+            )
+
+    def clean(self):
+        cleaned = super().clean()
+        if not any(value.strip() for value in cleaned.values() if isinstance(value, str)):
+            raise forms.ValidationError("Fill in at least one change.")
+        return cleaned
+
+    def changes(self):
+        """Map of field name to a function computing its new value."""
+        scalar_fields, list_fields = BULK_EDIT_FIELDS[self.model]
+        changes = {}
+        for name in scalar_fields:
+            value = self.cleaned_data[f"set_{name}"].strip()
+            if value:
+                changes[name] = lambda old, value=value: value
+        for name in list_fields:
+            add = _split(self.cleaned_data[f"add_{name}"])
+            remove = set(_split(self.cleaned_data[f"remove_{name}"]))
+            if add or remove:
+                changes[name] = lambda old, add=add, remove=remove: [
+                    item for item in dict.fromkeys([*(old or []), *add]) if item not in remove
+                ]
+        return changes
+
+
+class ImportForm(forms.Form):
+    file = forms.FileField(help_text="A .jsonl, .json or .csv file in the export format.")
@@ -0,0 +1,235 @@
+"""In-memory trigram index for typo-tolerant search without Postgres.
+
+Scoring mirrors ``pg_trgm``: text is split into alphanumeric words, each
+word is padded with two leading blanks and one trailing blank, and the
+similarity of two strings is ``shared / (len(a) + len(b) - shared)`` over
+their trigram sets. A row's score is the best score across its indexed
+fields, and rows below :data:`SIMILARITY_THRESHOLD` are dropped. Unlike
+``pg_trgm``, text is accent-folded first, so "Yaunde" finds "Yaoundé".
+
+Posting lists are split by the size of each row's trigram set, so a
+search prunes in two steps. A row with ``n`` trigrams scores at most
+``min(q, n) / max(q, n)`` against a ``q``-trigram query, which rules out
+whole sizes. For the sizes left, a row reaching ``threshold`` shares at
+least ``k = ceil(threshold * (q + n) / (1 + threshold))`` trigrams with
+the query, so it appears in one of the ``m - k + 1`` rarest of the ``m``
+matching lists; only those are walked, and their rows are scored by set
+intersection.
+
+The index is built lazily, once per process and model, from the database
+and then kept current by the write-behind :mod:`hub.indexing` queue.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import re
+import threading
+
+from .models import Community, Person, School
+from .utils import fold_text
+
+SIMILARITY_THRESHOLD = 0.2
+DEFAULT_CANDIDATES = 200
+
+# Fields matched fuzzily, per model.
+FUZZY_FIELDS = {
+    Person: ("name", "role"),
+    Community: ("name", "location"),
+    School: ("name", "city"),
+}
+
+_WORD_RE = re.compile(r"[^\W_]+")
+
+
+def trigrams(value):
+    """Return the ``pg_trgm`` trigram set of ``value`` after accent folding."""
+    grams = set()
+    for word in _WORD_RE.findall(fold_text(value)):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+def similarity(a, b):
+    """``pg_trgm.similarity`` of two strings."""
+    left, right = trigrams(a), trigrams(b)
+    if not left or not right:
+        return 0.0
+    shared = len(left & right)
+    return shared / (len(left) + len(right) - shared)
+
+
+class _ModelIndex:
+    """Posting lists for one model, split by the size of each row's trigram
+    set: ``postings[field][trigram][size] -> {pk}``."""
+
+    def __init__(self, fields):
+        self.fields = fields
+        self.postings = {field: {} for field in fields}
+        self.grams = {}  # pk -> tuple of trigram sets, one per field
+
+    def __len__(self):
+        return len(self.grams)
+
+    def add(self, pk, document):
+        self.remove(pk)
+        grams = tuple(trigrams(document.get(field)) for field in self.fields)
+        self.grams[pk] = grams
+        for field, field_grams in zip(self.fields, grams):
+            postings = self.postings[field]
+            for gram in field_grams:
+                postings.setdefault(gram, {}).setdefault(len(field_grams), set()).add(pk)
+
+    def remove(self, pk):
+        grams = self.grams.pop(pk, None)
+        if grams is None:
+            return
+        for field, field_grams in zip(self.fields, grams):
+            postings = self.postings[field]
+            for gram in field_grams:
+                sizes = postings.get(gram, {})
+                bucket = sizes.get(len(field_grams))
+                if bucket is not None:
+                    bucket.discard(pk)
+                    if not bucket:
+                        del sizes[len(field_grams)]
+                        if not sizes:
+                            del postings[gram]
+
+    def search(self, query_grams, limit, threshold):
+        best = {}
+        size = len(query_grams)
+        shortest, longest = threshold * size, size / threshold if threshold > 0 else math.inf
+        for position, field in enumerate(self.fields):
+            by_size = {}
+            for gram in query_grams:
+                for length, bucket in self.postings[field].get(gram, {}).items():
+                    if shortest <= length <= longest:
+                        by_size.setdefault(length, []).append(bucket)
+            for length, buckets in by_size.items():
+                min_shared = max(math.ceil(threshold * (size + length) / (1 + threshold) - 1e-9), 1)
+                if len(buckets) < min_shared:
+                    continue
+                buckets.sort(key=len)
+                for pk in set().union(*buckets[:len(buckets) - min_shared + 1]):
+                    shared = len(query_grams & self.grams[pk][position])
+                    score = shared / (size + length - shared)
+                    if score >= threshold and score > best.get(pk, 0.0):
+                        best[pk] = score
+        return heapq.nlargest(limit, best.items(), key=lambda item: (item[1], -item[0]))
+
+
+class FuzzyIndex:
+    """Thread-safe collection of per-model trigram indexes."""
+
+    def __init__(self, fields=None):
+        self.fields = fields or FUZZY_FIELDS
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()
+        self._indexes = {}
+        self._pending = {}  # label -> updates that arrived during a build
+
+    def reset(self):
+        """Forget everything; each model is rebuilt on its next search."""
+        with self._lock:
+            self._indexes.clear()
+
+    def is_built(self, model):
+        with self._lock:
+            return model._meta.label_lower in self._indexes
+
+    def build(self, model):
+        """(Re)load ``model`` from the database.
+
+        Rows are read outside :attr:`_lock`, so updates that arrive in the
+        meantime are queued and replayed onto the new index before it is
+        stored; the read may or may not have seen them, and replaying is
+        idempotent either way.
+        """
+        with self._build_lock:
+            return self._build(model)
+
+    def _build(self, model):
+        label = model._meta.label_lower
+        with self._lock:
+            self._pending[label] = []
+        try:
+            index = _ModelIndex(self.fields[model])
+            queryset = model.objects.order_by().values("pk", *self.fields[model])
+            for row in queryset.iterator(chunk_size=2000):
+                index.add(row["pk"], row)
+        except BaseException:
+            with self._lock:
+                del self._pending[label]
+            raise
+        with self._lock:
+            for update in self._pending.pop(label):
+                index = self._apply_one(index, update)
+            self._indexes[label] = index
+        return index
+
+    def _index_for(self, model):
+        with self._lock:
+            index = self._indexes.get(model._meta.label_lower)
+        if index is not None:
+            return index
+        with self._build_lock:
+            with self._lock:
+                index = self._indexes.get(model._meta.label_lower)
+            return index if index is not None else self._build(model)
+
+    @staticmethod
+    def _apply_one(index, update):
+        if update.pk is None:
+            return _ModelIndex(index.fields)
+        if update.document is None:
+            index.remove(update.pk)
+        else:
+            index.add(update.pk, update.document)
+        return index
+
+    def apply(self, batch):
+        """Index queue handler: apply a batch of :class:`IndexUpdate`."""
+        with self._lock:
+            for update in batch:
+                if update.label in self._pending:
+                    self._pending[update.label].append(update)
+                    continue
+                index = self._indexes.get(update.label)
+                if index is None:
+                    continue  # Not built yet; the first search loads fresh rows.
+                self._indexes[update.label] = self._apply_one(index, update)
+
+    def search(self, model, query, limit=DEFAULT_CANDIDATES, threshold=SIMILARITY_THRESHOLD):
+        """Return up to ``limit`` ``(pk, score)`` pairs, best first."""
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+        index = self._index_for(model)
+        with self._lock:
+            return index.search(query_grams, limit, threshold)
+
+
+fuzzy_index = FuzzyIndex()
+
+
+def fuzzy_matches(model, query, limit=DEFAULT_CANDIDATES, threshold=SIMILARITY_THRESHOLD):
+    """Fuzzy matches for ``query`` re-scored against current database rows.
+
+    Candidates come from the in-memory index, which may briefly lag behind
+    the database; re-scoring the (at most ``limit``) candidate rows means a
+    stale entry can cause a miss but never a wrong match.
+    """
+    candidates = fuzzy_index.search(model, query, limit, threshold)
+    if not candidates:
+        return []
+    fields = FUZZY_FIELDS[model]
+    rows = model.objects.filter(pk__in=[pk for pk, _ in candidates]).values("pk", *fields)
+    scores = {}
+    for row in rows:
+        score = max(similarity(query, row[field]) for field in fields)
+        if score >= threshold:
+            scores[row["pk"]] = score
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
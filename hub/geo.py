@@ -0,0 +1,148 @@
+"""Local geocoding and proximity search without PostGIS.
+
+Free-text ``Community.location`` and ``School.city`` values are geocoded
+at write time against a bundled gazetteer of Cameroonian cities and
+regions (``hub/data/gazetteer.json``) into indexed ``latitude`` and
+``longitude`` columns. :func:`within` answers "near <place> within N km"
+with a bounding-box prefilter on those columns, which their index serves,
+and the exact haversine distance computed by the database for the rows
+inside the box.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+from django.db.models import FloatField, Value
+from django.db.models.functions import ASin, Cos, Least, Power, Radians, Sin, Sqrt
+
+from .utils import fold_text
+
+GAZETTEER_PATH = Path(__file__).resolve().parent / "data" / "gazetteer.json"
+EARTH_RADIUS_KM = 6371.0088
+DEFAULT_RADIUS_KM = 50
+MAX_RADIUS_KM = 2000
+# Longest place name, in words, tried when scanning free text.
+MAX_NAME_WORDS = 3
+
+_PART_SPLIT_RE = re.compile(r"[,;/()|]| - ")
+_NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+
+
+@dataclass(frozen=True)
+class Place:
+    name: str
+    kind: str
+    region: str
+    lat: float
+    lon: float
+
+
+def _key(text):
+    return _NON_WORD_RE.sub(" ", fold_text(text)).strip()
+
+
+@lru_cache(maxsize=1)
+def gazetteer():
+    """``{folded name or alias: Place}`` loaded once from the data file."""
+    with GAZETTEER_PATH.open(encoding="utf-8") as handle:
+        entries = json.load(handle)["places"]
+    places = {}
+    for entry in entries:
+        place = Place(entry["name"], entry["kind"], entry["region"], entry["lat"], entry["lon"])
+        for label in (entry["name"], *entry.get("aliases", ())):
+            places.setdefault(_key(label), place)
+    return places
+
+
+def places(kind=None):
+    """Distinct gazetteer places, optionally of one ``kind``, by name."""
+    unique = {place.name: place for place in gazetteer().values()}
+    return sorted((p for p in unique.values() if kind is None or p.kind == kind), key=lambda p: p.name)
+
+
+@lru_cache(maxsize=4096)
+def geocode(text):
+    """Return the :class:`Place` ``text`` refers to, or ``None``.
+
+    Comma-, slash- and parenthesis-separated parts are tried in order, each
+    first as a whole and then word by word, longest names first. A city
+    anywhere in the text wins over a region, so "Buea, South-West" resolves
+    to Buea.
+    """
+    index = gazetteer()
+    region = None
+    for part in _PART_SPLIT_RE.split(text or ""):
+        words = _key(part).split()
+        for size in range(min(len(words), MAX_NAME_WORDS), 0, -1):
+            for start in range(len(words) - size + 1):
+                place = index.get(" ".join(words[start:start + size]))
+                if place is None:
+                    continue
+                if place.kind == "city":
+                    return place
+                region = region or place
+    return region
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points, in kilometres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def distance_expression(lat, lon):
+    """Haversine distance in km from ``(lat, lon)`` to each row's
+    ``latitude``/``longitude``, as a database expression."""
+    phi1 = math.radians(lat)
+    half_dphi = (Radians("latitude") - Value(phi1)) / Value(2.0)
+    half_dlambda = (Radians("longitude") - Value(math.radians(lon))) / Value(2.0)
+    a = Power(Sin(half_dphi), 2) + Value(math.cos(phi1)) * Cos(Radians("latitude")) * Power(Sin(half_dlambda), 2)
+    return Value(2 * EARTH_RADIUS_KM) * ASin(Least(Value(1.0), Sqrt(a)), output_field=FloatField())
+
+
+def bounding_box(lat, lon, radius_km):
+    """``(min_lat, max_lat, min_lon, max_lon)`` enclosing the search circle.
+
+    Does not wrap around the antimeridian, which no place in the gazetteer
+    is anywhere near.
+    """
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    cos_lat = math.cos(math.radians(lat))
+    dlon = 180.0 if cos_lat < 1e-9 else min(180.0, dlat / cos_lat)
+    return lat - dlat, lat + dlat, lon - dlon, lon + dlon
+
+
+def within(queryset, lat, lon, radius_km):
+    """Rows of ``queryset`` within ``radius_km`` of ``(lat, lon)``.
+
+    The result is annotated with ``distance_km``, computed in the query for
+    the rows inside the bounding box only.
+    """
+    min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_km)
+    return (
+        queryset.filter(latitude__range=(min_lat, max_lat), longitude__range=(min_lon, max_lon))
+        .annotate(distance_km=distance_expression(lat, lon))
+        .filter(distance_km__lte=radius_km)
+    )
+
+
+def parse_radius(raw, default=DEFAULT_RADIUS_KM):
+    """Radius in km from a query parameter; ``ValueError`` when invalid."""
+    if raw in (None, ""):
+        return default
+    try:
+        radius = float(raw)
+    except ValueError:
+        raise ValueError("radius must be a number.") from None
+    if not 0 < radius <= MAX_RADIUS_KM:
+        raise ValueError(f"radius must be between 0 and {MAX_RADIUS_KM} km.")
+    return radius
@@ -0,0 +1,247 @@
+"""Write-behind queue for search index maintenance.
+
+Changed rows (see :mod:`hub.batching`) are enqueued as :class:`IndexUpdate`
+snapshots of the fields search indexes care about. A background thread drains the queue
+in batches and hands each batch to the registered index handlers, so admin
+saves never wait on index writes. Pending updates are coalesced by
+``(model, pk)``: only the latest state of an object is applied.
+
+Handlers receive plain documents rather than model instances, so search
+indexes never touch the database from the worker thread; only handlers that
+store derived rows (:func:`hub.similarity.apply`) write from it.
+
+Each process holds its own indexes. ``manage.py flush_search_index`` bumps
+the :class:`~hub.models.IndexGeneration` row, and every process re-indexes
+all models the next time it searches (:meth:`IndexQueue.sync_generation`).
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from .instrumentation import metrics
+from django.db.models import F
+
+from .models import Community, IndexGeneration, Person, School
+
+logger = logging.getLogger(__name__)
+
+# Fields copied into index documents, per model.
+SEARCH_DOCUMENT_FIELDS = {
+    Person: ("name", "slug", "role", "interests", "availability"),
+    Community: ("name", "slug", "location", "focus"),
+    School: ("name", "slug", "city", "programs"),
+}
+
+# Seconds between a process's checks for a new index generation.
+GENERATION_CHECK_INTERVAL = 1.0
+
+
+def current_generation():
+    return IndexGeneration.objects.values_list("generation", flat=True).first() or 0
+
+
+def bump_generation():
+    """Ask every process to re-index; return the new generation."""
+    IndexGeneration.objects.get_or_create(pk=1)
+    IndexGeneration.objects.filter(pk=1).update(generation=F("generation") + 1)
+    return current_generation()
+
+
+@dataclass(frozen=True)
+class IndexUpdate:
+    """One pending change. ``document=None`` deletes; ``pk=None`` resets the
+    whole model before the updates that follow it, which carry ``reload``:
+    they restate rows rather than report changes."""
+
+    label: str
+    pk: int | None
+    document: dict | None = None
+    reload: bool = False
+
+
+def iter_documents(model, chunk_size=2000):
+    """Yield ``(pk, document)`` for every row of ``model`` in one pass."""
+    fields = SEARCH_DOCUMENT_FIELDS[model]
+    for row in model.objects.order_by().values("pk", *fields).iterator(chunk_size=chunk_size):
+        pk = row.pop("pk")
+        yield pk, row
+
+
+class IndexQueue:
+    """Bounded, coalescing queue drained by a daemon thread."""
+
+    def __init__(self, maxsize=10000, batch_size=500, autostart=True):
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.autostart = autostart
+        self._handlers = []
+        self._pending = {}
+        self._busy = False
+        self._cond = threading.Condition()
+        self._worker = None
+        self._local = threading.local()
+        self._generation = None
+        self._generation_checked = float("-inf")
+
+    # Handler registry -------------------------------------------------
+
+    def register(self, handler):
+        """Add ``handler(batch)``; usable as a decorator."""
+        if handler not in self._handlers:
+            self._handlers.append(handler)
+        return handler
+
+    def unregister(self, handler):
+        if handler in self._handlers:
+            self._handlers.remove(handler)
+
+    # Producers --------------------------------------------------------
+
+    @property
+    def suspended(self):
+        return getattr(self._local, "suspended", 0) > 0
+
+    def put(self, update):
+        """Enqueue ``update``, blocking while the queue is full."""
+        if not self._handlers or self.suspended:
+            return
+        with self._cond:
+            self._enqueue_locked(update)
+            self._cond.notify_all()
+        self._ensure_worker()
+
+    def _enqueue_locked(self, update):
+        while len(self._pending) >= self.maxsize:
+            if not self._ensure_worker():
+                self._drain_locked()
+            else:
+                self._cond.wait()
+        key = (update.label, update.pk)
+        if update.pk is None:
+            for stale in [k for k in self._pending if k[0] == update.label]:
+                del self._pending[stale]
+                metrics.incr("index.queue.coalesced")
+        elif self._pending.pop(key, None) is not None:
+            metrics.incr("index.queue.coalesced")
+        # Re-insert at the end so updates keep their relative order.
+        self._pending[key] = update
+
+    def put_pks(self, model, pks, chunk_size=2000):
+        """Enqueue the current state of rows ``pks`` of ``model``.
+
+        Rows are read in chunks; pks that no longer exist are enqueued as
+        deletions.
+        """
+        if not self._handlers or self.suspended:
+            return
+        label = model._meta.label_lower
+        fields = SEARCH_DOCUMENT_FIELDS[model]
+        pks = sorted(pks)
+        for start in range(0, len(pks), chunk_size):
+            chunk = pks[start:start + chunk_size]
+            rows = {row.pop("pk"): row for row in model.objects.filter(pk__in=chunk).values("pk", *fields)}
+            with self._cond:
+                for pk in chunk:
+                    self._enqueue_locked(IndexUpdate(label, pk, rows.get(pk)))
+                self._cond.notify_all()
+            self._ensure_worker()
+
+    def put_model(self, model):
+        """Replace everything indexed for ``model`` with its current rows."""
+        if not self._handlers:
+            return
+        label = model._meta.label_lower
+        self.put(IndexUpdate(label, None))
+        for pk, document in iter_documents(model):
+            self.put(IndexUpdate(label, pk, document, reload=True))
+
+    def sync_generation(self):
+        """Re-index every model if the index generation changed since the
+        last check, which runs at most every ``GENERATION_CHECK_INTERVAL``
+        seconds. Searches call this before reading the indexes."""
+        now = time.monotonic()
+        if not self._handlers or now - self._generation_checked < GENERATION_CHECK_INTERVAL:
+            return
+        self._generation_checked = now
+        seen, self._generation = self._generation, current_generation()
+        if seen is not None and self._generation != seen:
+            for model in SEARCH_DOCUMENT_FIELDS:
+                self.put_model(model)
+
+    @contextmanager
+    def bulk(self, *models):
+        """Skip per-row updates inside the block, then re-index ``models``
+        from the database once on exit. Used by the seed commands."""
+        self._local.suspended = getattr(self._local, "suspended", 0) + 1
+        try:
+            yield
+        finally:
+            self._local.suspended -= 1
+        for model in models:
+            self.put_model(model)
+
+    # Consumers --------------------------------------------------------
+
+    def pending(self):
+        with self._cond:
+            return len(self._pending)
+
+    def _ensure_worker(self):
+        if not self.autostart:
+            return False
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="hub-index-queue", daemon=True)
+            self._worker.start()
+        return True
+
+    def _take_batch_locked(self):
+        keys = list(self._pending)[: self.batch_size]
+        return [self._pending.pop(key) for key in keys]
+
+    def _apply(self, batch):
+        for handler in list(self._handlers):
+            try:
+                handler(batch)
+            except Exception:  # pragma: no cover - keep draining on handler bugs
+                logger.exception("Index handler %r failed on a batch of %d updates.", handler, len(batch))
+        metrics.incr("index.queue.applied", len(batch))
+        metrics.observe("index.queue.batch_size", len(batch))
+
+    def _drain_locked(self):
+        while self._pending:
+            self._apply(self._take_batch_locked())
+        self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                batch = self._take_batch_locked()
+                self._busy = True
+            try:
+                self._apply(batch)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        """Block until every pending update has been applied.
+
+        Without a running worker (``autostart=False``) the queue is drained
+        in the calling thread. Returns ``False`` if ``timeout`` expired.
+        """
+        with self._cond:
+            if self._worker is None or not self._worker.is_alive():
+                self._drain_locked()
+                return True
+            return self._cond.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+
+index_queue = IndexQueue()
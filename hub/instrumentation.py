@@ -0,0 +1,74 @@
+"""Lightweight in-process counters and timings.
+
+The hub records what it measures here (template render times, compression
+ratios, rejected requests, ...). Values are per process; the staff-only
+``/api/metrics/`` endpoint exposes a snapshot of the worker that serves it.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+
+class Metrics:
+    """Thread-safe registry of counters and value distributions."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = defaultdict(int)
+        self._observations = {}
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def observe(self, name, value):
+        """Record one sample of ``name`` (count, total, min, max, last)."""
+        with self._lock:
+            stats = self._observations.get(name)
+            if stats is None:
+                self._observations[name] = {
+                    "count": 1, "total": value, "min": value, "max": value, "last": value,
+                }
+                return
+            stats["count"] += 1
+            stats["total"] += value
+            stats["min"] = min(stats["min"], value)
+            stats["max"] = max(stats["max"], value)
+            stats["last"] = value
+
+    @contextmanager
+    def timer(self, name):
+        """Observe the wall-clock duration of the block in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def counter(self, name):
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def stats(self, name):
+        with self._lock:
+            stats = self._observations.get(name)
+            return dict(stats) if stats else None
+
+    def snapshot(self):
+        with self._lock:
+            observations = {}
+            for name, stats in self._observations.items():
+                observations[name] = dict(stats, mean=stats["total"] / stats["count"])
+            return {"counters": dict(self._counters), "observations": observations}
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._observations.clear()
+
+
+metrics = Metrics()
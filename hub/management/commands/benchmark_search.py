@@ -0,0 +1,108 @@
+"""Offline relevance and latency benchmark for directory search."""
+
+from __future__ import annotations
+
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from hub.models import Community, Person, School
+from hub.scoring import match_q, rank_queryset, rerank, use_trigram
+from hub.utils import fold_text
+
+MODELS = {"person": Person, "community": Community, "school": School}
+TOP_K = 10
+
+
+def _typo(name, rng):
+    """Drop one inner character, the commonest typo in search logs."""
+    if len(name) < 5:
+        return name
+    index = rng.randrange(1, len(name) - 1)
+    return name[:index] + name[index + 1:]
+
+
+def build_queries(model, sample, rng):
+    """Return ``[(kind, query, target_pk)]`` generated from sampled rows."""
+    rows = list(model.objects.values_list("pk", "name"))
+    queries = []
+    for pk, name in rng.sample(rows, min(sample, len(rows))):
+        queries.append(("prefix", fold_text(name)[:4], pk))
+        queries.append(("folded", fold_text(name), pk))
+        queries.append(("typo", _typo(name, rng), pk))
+    return queries
+
+
+def _alphabetical(model, query):
+    # The original fallback: substring matches in name order.
+    return list(model.objects.filter(match_q(model, query)).order_by("name").values_list("pk", flat=True)[:TOP_K])
+
+
+def _scored(model, query):
+    return list(rank_queryset(model.objects.all(), query, trigram=use_trigram()).values_list("pk", flat=True)[:TOP_K])
+
+
+def _reranked(model, query):
+    candidates = rank_queryset(model.objects.all(), query, trigram=use_trigram())[: TOP_K * 3]
+    return [obj.pk for obj, _ in rerank(candidates, query)[:TOP_K]]
+
+
+MODES = {"alphabetical": _alphabetical, "scored": _scored, "reranked": _reranked}
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure search relevance (MRR@10, hit@1) and latency for name-derived "
+        "queries under the alphabetical, database-scored and reranked modes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--model",
+            choices=sorted(MODELS),
+            action="append",
+            help="Model to benchmark; repeat for several (default: all).",
+        )
+        parser.add_argument(
+            "--sample",
+            type=int,
+            default=50,
+            help="Rows sampled per model to derive queries from (default: 50).",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Random seed for sampling and typos (default: 0).",
+        )
+
+    def handle(self, *args, **options):
+        if options["sample"] < 1:
+            raise CommandError("--sample must be a positive integer.")
+        rng = random.Random(options["seed"])
+        names = options["model"] or sorted(MODELS)
+
+        for name in names:
+            model = MODELS[name]
+            queries = build_queries(model, options["sample"], rng)
+            if not queries:
+                self.stdout.write(self.style.WARNING(f"No {model._meta.verbose_name_plural} to benchmark."))
+                continue
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{model._meta.verbose_name_plural} ({len(queries)} queries)"))
+            self.stdout.write(f"{'mode':<13}{'MRR@10':>8}{'hit@1':>8}{'mean ms':>10}{'p95 ms':>9}")
+
+            for mode, search in MODES.items():
+                ranks, timings = [], []
+                for _, query, target in queries:
+                    start = time.perf_counter()
+                    results = search(model, query)
+                    timings.append((time.perf_counter() - start) * 1000)
+                    ranks.append(results.index(target) + 1 if target in results else None)
+                mrr = sum(1 / rank for rank in ranks if rank) / len(ranks)
+                hit1 = sum(1 for rank in ranks if rank == 1) / len(ranks)
+                p95 = statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0]
+                self.stdout.write(
+                    f"{mode:<13}{mrr:>8.3f}{hit1:>8.1%}{statistics.fmean(timings):>10.2f}{p95:>9.2f}"
+                )
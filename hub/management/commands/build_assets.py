@@ -0,0 +1,74 @@
+"""Build the production CSS bundle and collect hashed static files."""
+
+from __future__ import annotations
+
+import shutil
+import subprocess
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+HUB_DIR = settings.BASE_DIR / "hub"
+TAILWIND_CONFIG = settings.BASE_DIR / "tailwind.config.js"
+TAILWIND_INPUT = HUB_DIR / "assets" / "tailwind.css"
+CSS_OUTPUT = HUB_DIR / "static" / "hub" / "css" / "hub.css"
+
+
+class Command(BaseCommand):
+    help = (
+        "Compile a purged, minified Tailwind bundle from the hub templates "
+        "and run collectstatic so files get content-hashed names."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--tailwind",
+            default=None,
+            help=(
+                "Path to the Tailwind CLI (standalone binary or node_modules/.bin/tailwindcss). "
+                "Defaults to `tailwindcss` on PATH."
+            ),
+        )
+        parser.add_argument(
+            "--no-collect",
+            action="store_true",
+            help="Only build the CSS bundle; skip collectstatic.",
+        )
+
+    def handle(self, *args, **options):
+        tailwind = options["tailwind"] or shutil.which("tailwindcss")
+        if not tailwind:
+            raise CommandError(
+                "Tailwind CLI not found. Download the standalone binary from "
+                "https://github.com/tailwindlabs/tailwindcss/releases or pass --tailwind."
+            )
+
+        CSS_OUTPUT.parent.mkdir(parents=True, exist_ok=True)
+        command = [
+            tailwind,
+            "--config", str(TAILWIND_CONFIG),
+            "--input", str(TAILWIND_INPUT),
+            "--output", str(CSS_OUTPUT),
+            "--minify",
+        ]
+        try:
+            subprocess.run(command, check=True, capture_output=True, text=True)
+        except FileNotFoundError as exc:
+            raise CommandError(f"Could not execute {tailwind!r}.") from exc
+        except subprocess.CalledProcessError as exc:
+            raise CommandError(f"Tailwind build failed:\n{exc.stderr}") from exc
+
+        size_kb = CSS_OUTPUT.stat().st_size / 1024
+        self.stdout.write(self.style.SUCCESS(f"Built {CSS_OUTPUT.relative_to(settings.BASE_DIR)} ({size_kb:.1f} KiB)."))
+
+        if options["no_collect"]:
+            return
+
+        if not settings.HUB_BUILT_ASSETS:
+            self.stdout.write(
+                self.style.WARNING(
+                    "DJANGONISTA_BUILT_ASSETS is not set; collected files will not be content-hashed."
+                )
+            )
+        call_command("collectstatic", interactive=False, verbosity=options["verbosity"])
@@ -0,0 +1,39 @@
+"""Rebuild the precomputed similar-people and related-community tables."""
+
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from hub.recommendations import DEFAULT_MIN_SCORE, DEFAULT_TOP_K, build_recommendations
+
+
+class Command(BaseCommand):
+    help = "Recompute 'similar people' and 'related communities' (see hub.recommendations)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--top-k",
+            type=int,
+            default=DEFAULT_TOP_K,
+            help=f"Recommendations stored per row (default: {DEFAULT_TOP_K}).",
+        )
+        parser.add_argument(
+            "--min-score",
+            type=float,
+            default=DEFAULT_MIN_SCORE,
+            help=f"Lowest similarity score worth recommending (default: {DEFAULT_MIN_SCORE}).",
+        )
+
+    def handle(self, *args, **options):
+        if options["top_k"] < 1:
+            raise CommandError("--top-k must be a positive integer.")
+        start = time.perf_counter()
+        people, communities = build_recommendations(options["top_k"], options["min_score"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Stored {people} similar-people and {communities} related-community links "
+                f"in {time.perf_counter() - start:.2f}s."
+            )
+        )
@@ -0,0 +1,33 @@
+"""Write the mmap'd store that workers read counts, facets and search postings from."""
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+
+from hub import sharedstore
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the shared read-only store (names, counts, facets and search "
+        "postings) at "
+        "HUB_SHARED_STORE_PATH or --path, replacing any previous version "
+        "atomically."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path",
+            help="File to write (default: HUB_SHARED_STORE_PATH).",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"] or sharedstore.store_path()
+        if not path:
+            raise CommandError("Set HUB_SHARED_STORE_PATH or pass --path.")
+        version = sharedstore.build(path)
+        snapshot = sharedstore.Snapshot(path)
+        counts = ", ".join(
+            f"{snapshot.count(model)} {model._meta.verbose_name_plural.lower()}" for model in sharedstore.MODELS
+        )
+        self.stdout.write(self.style.SUCCESS(f"Wrote version {version} to {path}: {counts}."))
@@ -0,0 +1,114 @@
+"""Write the directory to a compact binary snapshot."""
+
+from __future__ import annotations
+
+import gc
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+
+from hub.export import DATA_NAMES, EXPORT_FIELDS
+from hub.snapshot import MODELS, DirectorySnapshot, database_tables, write_snapshot
+from hub.utils import load_json_data
+
+REPEATS = 5
+
+
+def _measure(load, use):
+    """Best-of wall time of ``use(load())`` in ms, and the memory held by
+    what ``load()`` returned, in bytes."""
+    best = float("inf")
+    for _ in range(REPEATS):
+        gc.collect()
+        start = time.perf_counter()
+        use(load())
+        best = min(best, time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        loaded = load()
+        use(loaded)
+        memory = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del loaded
+    return best * 1000, memory
+
+
+class Command(BaseCommand):
+    help = (
+        "Write people, communities and schools from the database (or from "
+        "data/*.json with --from-data) to a binary snapshot; --compare "
+        "measures it against loading the same records with json.load."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            default="directory.snap",
+            help="Snapshot file to write (default: ./directory.snap).",
+        )
+        parser.add_argument(
+            "--from-data",
+            action="store_true",
+            help="Read data/*.json instead of the database.",
+        )
+        parser.add_argument(
+            "--compare",
+            action="store_true",
+            help="Report size, open time and memory against json.load.",
+        )
+
+    def _tables(self, from_data):
+        if not from_data:
+            return {model: (fields, list(rows)) for model, (fields, rows) in database_tables().items()}
+        tables = {}
+        for model in MODELS:
+            try:
+                rows = load_json_data(DATA_NAMES[model])
+            except FileNotFoundError as exc:
+                raise CommandError(f"Missing data/{DATA_NAMES[model]}.json.") from exc
+            tables[model] = (EXPORT_FIELDS[model], [row for row in rows if isinstance(row, dict) and row.get("name")])
+        return tables
+
+    def handle(self, *args, **options):
+        tables = self._tables(options["from_data"])
+        output = options["output"]
+        version = write_snapshot(output, tables)
+        counts = ", ".join(f"{len(rows)} {model._meta.verbose_name_plural.lower()}" for model, (_, rows) in tables.items())
+        self.stdout.write(self.style.SUCCESS(f"Wrote snapshot version {version} to {output}: {counts}."))
+        if options["compare"]:
+            self._compare(output, tables)
+
+    def _compare(self, path, tables):
+        payload = {model._meta.model_name: rows for model, (_, rows) in tables.items()}
+        middle = {model: len(rows) // 2 for model, (_, rows) in tables.items() if rows}
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False, encoding="utf-8") as handle:
+            json.dump(payload, handle, cls=DjangoJSONEncoder, ensure_ascii=False)
+        try:
+            def load_json():
+                with open(handle.name, encoding="utf-8") as source:
+                    return json.load(source)
+
+            def read_json(data):
+                return [data[model._meta.model_name][index] for model, index in middle.items()]
+
+            def read_snapshot(snapshot):
+                return [snapshot.table(model)[index] for model, index in middle.items()]
+
+            results = {
+                "json.load": (os.path.getsize(handle.name), *_measure(load_json, read_json)),
+                "snapshot": (os.path.getsize(path), *_measure(lambda: DirectorySnapshot.open(path), read_snapshot)),
+            }
+        finally:
+            os.unlink(handle.name)
+
+        self.stdout.write("Open and read one record per model:")
+        self.stdout.write(f"{'format':<11}{'size KB':>10}{'ms':>9}{'memory KB':>11}")
+        for label, (size, elapsed, memory) in results.items():
+            self.stdout.write(f"{label:<11}{size / 1024:>10.1f}{elapsed:>9.2f}{memory / 1024:>11.1f}")
@@ -0,0 +1,56 @@
+"""Render the directory into static HTML files."""
+
+from __future__ import annotations
+
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from hub.staticsite import build_site, copy_static
+
+
+class Command(BaseCommand):
+    help = (
+        "Render the home page, every list page and every detail page into OUTPUT. "
+        "Only pages whose rows changed since the last build are re-rendered."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            default="site",
+            help="Directory for the generated site (default: ./site).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Render processes to use (default: number of CPUs).",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Ignore the previous build manifest and render every page.",
+        )
+        parser.add_argument(
+            "--no-static",
+            action="store_true",
+            help="Do not copy static files into the output tree.",
+        )
+
+    def handle(self, *args, **options):
+        if options["workers"] < 1:
+            raise CommandError("--workers must be a positive integer.")
+
+        result = build_site(options["output"], workers=options["workers"], force=options["force"])
+        if not options["no_static"]:
+            copy_static(options["output"])
+
+        for output in result.removed:
+            self.stdout.write(f"Removed {output}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rendered {len(result.rendered)} page(s), skipped {result.skipped} unchanged, "
+                f"removed {len(result.removed)} into {options['output']}."
+            )
+        )
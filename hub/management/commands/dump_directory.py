@@ -0,0 +1,81 @@
+"""Export the directory to JSONL, CSV, or seed-compatible JSON files."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from hub.export import (
+    DATA_NAMES,
+    DEFAULT_CHUNK_SIZE,
+    FORMATS,
+    export_filename,
+    gzip_chunks,
+    iter_export,
+)
+
+MODELS_BY_NAME = {name: model for model, name in DATA_NAMES.items()}
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream people, communities, and schools to files in OUTPUT. "
+        "The json format matches data/*.json so dumps can be re-seeded."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            default="jsonl",
+            help="Output format (default: jsonl).",
+        )
+        parser.add_argument(
+            "--output",
+            default="dump",
+            help="Directory to write the export files into (default: ./dump).",
+        )
+        parser.add_argument(
+            "--models",
+            nargs="+",
+            choices=sorted(MODELS_BY_NAME),
+            default=list(MODELS_BY_NAME),
+            help="Subset of the directory to export.",
+        )
+        parser.add_argument(
+            "--gzip",
+            action="store_true",
+            help="Compress each file with gzip.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help=f"Rows fetched per database round trip (default: {DEFAULT_CHUNK_SIZE}).",
+        )
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be a positive integer.")
+
+        output = Path(options["output"])
+        output.mkdir(parents=True, exist_ok=True)
+
+        for name in options["models"]:
+            model = MODELS_BY_NAME[name]
+            target = output / export_filename(model, options["format"], options["gzip"])
+            chunks = iter_export(
+                model.objects.all(), options["format"], chunk_size=options["chunk_size"]
+            )
+
+            if options["gzip"]:
+                with target.open("wb") as handle:
+                    for data in gzip_chunks(chunks):
+                        handle.write(data)
+            else:
+                with target.open("w", encoding="utf-8", newline="") as handle:
+                    for chunk in chunks:
+                        handle.write(chunk)
+
+            self.stdout.write(self.style.SUCCESS(f"Exported {name} to {target}."))
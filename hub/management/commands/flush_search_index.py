@@ -0,0 +1,31 @@
+"""Rebuild the search indexes of every process from the database."""
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+
+from hub.indexing import bump_generation, index_queue
+from hub.signals import DIRECTORY_MODELS
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the search indexes from the database: those of this process "
+        "now, and those of every running worker on its next search."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=None,
+            help="Seconds to wait for the queue to drain (default: no limit).",
+        )
+
+    def handle(self, *args, **options):
+        for model in DIRECTORY_MODELS:
+            index_queue.put_model(model)
+        if not index_queue.flush(timeout=options["timeout"]):
+            raise CommandError(f"Index queue still has {index_queue.pending()} pending update(s).")
+        generation = bump_generation()
+        self.stdout.write(self.style.SUCCESS(f"Search index queue flushed; workers re-index at generation {generation}."))
@@ -0,0 +1,119 @@
+"""Measure how long a web worker takes to boot and what its imports cost."""
+
+from __future__ import annotations
+
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# What a worker does before serving its first request: load the project's
+# WSGI application and the URLconf (and with it every view module).
+BOOT = (
+    "from django.conf import settings\n"
+    "from django.utils.module_loading import import_string\n"
+    "import_string(settings.WSGI_APPLICATION)\n"
+    "from django.urls import get_resolver\n"
+    "get_resolver().url_patterns\n"
+)
+
+_IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)\s*$")
+
+
+def parse_importtime(text):
+    """``[(module, self_us, cumulative_us)]`` from ``-X importtime`` output."""
+    rows = []
+    for line in text.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match:
+            rows.append((match[4], int(match[1]), int(match[2])))
+    return rows
+
+
+def summarize(rows, depth=2):
+    """``[(package, modules, self_us)]``, costliest first.
+
+    Modules are grouped by their first ``depth`` dotted components, so
+    ``django.contrib.admin.options`` counts towards ``django.contrib`` at
+    depth 2.
+    """
+    groups = defaultdict(lambda: [0, 0])
+    for module, self_us, _ in rows:
+        group = groups[".".join(module.split(".")[:depth])]
+        group[0] += 1
+        group[1] += self_us
+    return sorted(((name, count, total) for name, (count, total) in groups.items()), key=lambda g: (-g[2], g[0]))
+
+
+def _boot(*flags):
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(settings.BASE_DIR), os.environ.get("PYTHONPATH")])),
+    }
+    result = subprocess.run(
+        [sys.executable, *flags, "-c", BOOT],
+        cwd=settings.BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode:
+        raise CommandError(f"Worker boot failed:\n{result.stderr.strip()}")
+    return result.stderr
+
+
+class Command(BaseCommand):
+    help = (
+        "Boot a worker in fresh interpreters: report the cold-start time and "
+        "the import cost per package (from python -X importtime). Use "
+        "--settings to profile another settings module."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--runs",
+            type=int,
+            default=5,
+            help="Timed cold starts (default: 5).",
+        )
+        parser.add_argument(
+            "--top",
+            type=int,
+            default=15,
+            help="Packages to list (default: 15).",
+        )
+        parser.add_argument(
+            "--depth",
+            type=int,
+            default=2,
+            help="Dotted components packages are grouped by (default: 2).",
+        )
+
+    def handle(self, *args, **options):
+        for name in ("runs", "top", "depth"):
+            if options[name] < 1:
+                raise CommandError(f"--{name} must be a positive integer.")
+
+        timings = []
+        for _ in range(options["runs"]):
+            start = time.perf_counter()
+            _boot()
+            timings.append((time.perf_counter() - start) * 1000)
+
+        rows = parse_importtime(_boot("-X", "importtime"))
+        total = sum(self_us for _, self_us, _ in rows)
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Cold start ({os.environ.get('DJANGO_SETTINGS_MODULE')})"))
+        self.stdout.write(
+            f"{len(timings)} runs: min {min(timings):.0f} ms, median {statistics.median(timings):.0f} ms"
+        )
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Imports: {len(rows)} modules, {total / 1000:.1f} ms"))
+        self.stdout.write(f"{'package':<40}{'modules':>8}{'ms':>9}{'share':>8}")
+        for name, count, self_us in summarize(rows, options["depth"])[: options["top"]]:
+            self.stdout.write(f"{name:<40}{count:>8}{self_us / 1000:>9.1f}{self_us / max(total, 1):>8.1%}")
@@ -0,0 +1,87 @@
+"""Compare cold and cached render times for a hub template."""
+
+from __future__ import annotations
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates
+from django.template.loader import get_template
+from django.test import RequestFactory
+
+from hub.models import Person
+from hub.views import _paginate
+
+
+class Command(BaseCommand):
+    help = (
+        "Render a hub template repeatedly with and without the cached loader "
+        "and report the mean time per render."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--template",
+            default="hub/people.html",
+            help="Template to profile (default: hub/people.html).",
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=200,
+            help="Renders per mode (default: 200).",
+        )
+
+    def handle(self, *args, **options):
+        name = options["template"]
+        iterations = options["iterations"]
+        if iterations < 1:
+            raise CommandError("--iterations must be a positive integer.")
+
+        request = RequestFactory().get("/")
+        page_obj = _paginate(request, Person.objects.all())
+        context = {"page_obj": page_obj, "people": page_obj, "roles": [], "interests": []}
+
+        # Same engine configuration, minus the cached loader.
+        uncached = DjangoTemplates({
+            "NAME": "uncached",
+            "DIRS": settings.TEMPLATES[0].get("DIRS", []),
+            "APP_DIRS": False,
+            "OPTIONS": {
+                **settings.TEMPLATES[0]["OPTIONS"],
+                "loaders": [
+                    "django.template.loaders.filesystem.Loader",
+                    "django.template.loaders.app_directories.Loader",
+                ],
+            },
+        })
+
+        def cold():
+            uncached.get_template(name).render(context, request)
+
+        def cached():
+            get_template(name).render(context, request)
+
+        try:
+            cached()  # Populate the cache outside the timed loop.
+        except TemplateDoesNotExist as exc:
+            raise CommandError(f"Template {name!r} does not exist.") from exc
+
+        results = {}
+        for label, func in (("uncached", cold), ("cached", cached)):
+            start = time.perf_counter()
+            for _ in range(iterations):
+                func()
+            results[label] = (time.perf_counter() - start) / iterations * 1000
+
+        for label, mean_ms in results.items():
+            self.stdout.write(f"{label:>9}: {mean_ms:.3f} ms/render")
+        saved = results["uncached"] - results["cached"]
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Cached loader saves {saved:.3f} ms per render of {name} "
+                f"({saved / results['uncached'] * 100:.0f}%)."
+            )
+        )
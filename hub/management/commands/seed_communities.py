@@ -4,7 +4,10 @@ from __future__ import annotations
 
 from django.core.management.base import BaseCommand, CommandError
 
+from hub.batching import batch_changes
+from hub.indexing import index_queue
 from hub.models import Community
+from hub.seeding import DEFAULT_CHUNK_SIZE, bulk_seed
 from hub.utils import load_json_data
 
 
@@ -17,8 +20,19 @@ class Command(BaseCommand):
             action="store_true",
             help="Remove existing communities before seeding.",
         )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help=f"Rows written per bulk query (default: {DEFAULT_CHUNK_SIZE}).",
+        )
+
+    def _progress(self, done, total):
+        self.stdout.write(f"  {done}/{total} rows written")
 
     def handle(self, *args, **options):
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be a positive integer.")
         try:
             payload = load_json_data("communities")
         except FileNotFoundError as exc:
@@ -27,37 +41,25 @@ class Command(BaseCommand):
         if not isinstance(payload, list):
             raise CommandError("Expected data/communities.json to contain a list of records.")
 
-        if options["refresh"]:
-            deleted = Community.objects.all().delete()[0]
-            self.stdout.write(self.style.WARNING(f"Deleted {deleted} existing communities."))
-
-        created_count = 0
-        updated_count = 0
-
-        for entry in payload:
-            name = entry.get("name")
-            if not name:
-                self.stdout.write(self.style.WARNING("Skipped entry without a name."))
-                continue
-
-            defaults = {
-                "focus": entry.get("focus", ""),
-                "location": entry.get("location", ""),
-                "contact": entry.get("contact", ""),
-                "links": entry.get("links", {}),
-                "logo_url": entry.get("logo_url", ""),
-                "description": entry.get("description", ""),
-                "founded_year": entry.get("founded_year"),
-                "member_count": entry.get("member_count"),
-            }
-            _, created = Community.objects.update_or_create(name=name, defaults=defaults)
-            if created:
-                created_count += 1
-            else:
-                updated_count += 1
+        # Index the whole table once at the end and refresh other derived
+        # data once, instead of row by row.
+        with index_queue.bulk(Community), batch_changes():
+            if options["refresh"]:
+                deleted = Community.objects.all().delete()[0]
+                self.stdout.write(self.style.WARNING(f"Deleted {deleted} existing communities."))
+
+            report = bulk_seed(
+                Community,
+                payload,
+                chunk_size=options["chunk_size"],
+                progress=self._progress if options["verbosity"] > 1 else None,
+            )
+
+        for error in report.errors:
+            self.stdout.write(self.style.WARNING(f"Skipped: {error}"))
 
         self.stdout.write(
             self.style.SUCCESS(
-                f"Seeding complete. Created {created_count} and updated {updated_count} community entries."
+                f"Seeding complete. Created {report.created} and updated {report.updated} community entries."
             )
         )
@@ -4,7 +4,10 @@ from __future__ import annotations
 
 from django.core.management.base import BaseCommand, CommandError
 
+from hub.batching import batch_changes
+from hub.indexing import index_queue
 from hub.models import School
+from hub.seeding import DEFAULT_CHUNK_SIZE, bulk_seed
 from hub.utils import load_json_data
 
 
@@ -17,8 +20,19 @@ class Command(BaseCommand):
             action="store_true",
             help="Remove existing schools before seeding.",
         )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help=f"Rows written per bulk query (default: {DEFAULT_CHUNK_SIZE}).",
+        )
+
+    def _progress(self, done, total):
+        self.stdout.write(f"  {done}/{total} rows written")
 
     def handle(self, *args, **options):
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be a positive integer.")
         try:
             payload = load_json_data("schools")
         except FileNotFoundError as exc:
@@ -27,32 +41,25 @@ class Command(BaseCommand):
         if not isinstance(payload, list):
             raise CommandError("Expected data/schools.json to contain a list of records.")
 
-        if options["refresh"]:
-            deleted = School.objects.all().delete()[0]
-            self.stdout.write(self.style.WARNING(f"Deleted {deleted} existing schools."))
-
-        created_count = 0
-        updated_count = 0
-
-        for entry in payload:
-            name = entry.get("name")
-            if not name:
-                self.stdout.write(self.style.WARNING("Skipped entry without a name."))
-                continue
-
-            defaults = {
-                "city": entry.get("city", ""),
-                "programs": entry.get("programs", []),
-                "contact": entry.get("contact", ""),
-            }
-            _, created = School.objects.update_or_create(name=name, defaults=defaults)
-            if created:
-                created_count += 1
-            else:
-                updated_count += 1
+        # Index the whole table once at the end and refresh other derived
+        # data once, instead of row by row.
+        with index_queue.bulk(School), batch_changes():
+            if options["refresh"]:
+                deleted = School.objects.all().delete()[0]
+                self.stdout.write(self.style.WARNING(f"Deleted {deleted} existing schools."))
+
+            report = bulk_seed(
+                School,
+                payload,
+                chunk_size=options["chunk_size"],
+                progress=self._progress if options["verbosity"] > 1 else None,
+            )
+
+        for error in report.errors:
+            self.stdout.write(self.style.WARNING(f"Skipped: {error}"))
 
         self.stdout.write(
             self.style.SUCCESS(
-                f"Seeding complete. Created {created_count} and updated {updated_count} school entries."
+                f"Seeding complete. Created {report.created} and updated {report.updated} school entries."
             )
         )
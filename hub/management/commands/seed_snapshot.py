@@ -0,0 +1,48 @@
+"""Seed the directory from a binary snapshot."""
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+
+from hub.batching import batch_changes
+from hub.indexing import index_queue
+from hub.seeding import DEFAULT_CHUNK_SIZE, bulk_seed
+from hub.sharedstore import StoreError
+from hub.snapshot import DirectorySnapshot
+
+
+class Command(BaseCommand):
+    help = "Create or update people, communities and schools from a build_snapshot file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Snapshot file to read.")
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help=f"Rows written per bulk query (default: {DEFAULT_CHUNK_SIZE}).",
+        )
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be a positive integer.")
+        try:
+            snapshot = DirectorySnapshot.open(options["path"])
+        except FileNotFoundError as exc:
+            raise CommandError(f"No snapshot at {options['path']}.") from exc
+        except StoreError as exc:
+            raise CommandError(str(exc)) from exc
+
+        models = snapshot.models
+        with index_queue.bulk(*models), batch_changes():
+            reports = {model: bulk_seed(model, snapshot.table(model), chunk_size=options["chunk_size"]) for model in models}
+
+        for model, report in reports.items():
+            for error in report.errors:
+                self.stdout.write(self.style.WARNING(f"Skipped: {error}"))
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Created {report.created} and updated {report.updated} "
+                    f"{model._meta.verbose_name_plural.lower()}."
+                )
+            )
@@ -0,0 +1,49 @@
+"""Print directory changes as JSON lines, for mirrors and pipelines."""
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+
+from hub.api import change_items
+from hub.changelog import DEFAULT_BATCH_SIZE, MODELS, iter_batches
+
+
+class Command(BaseCommand):
+    help = (
+        "Write every change after --since to stdout, one JSON object per "
+        "line, in the /api/changes/ item format. Reads the log in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--since",
+            type=int,
+            default=0,
+            help="Last sequence number already applied (default: 0, everything).",
+        )
+        parser.add_argument(
+            "--model",
+            choices=sorted(MODELS),
+            action="append",
+            help="Only changes to this model; repeat for several (default: all).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f"Log entries read per query (default: {DEFAULT_BATCH_SIZE}).",
+        )
+
+    def handle(self, *args, **options):
+        if options["since"] < 0:
+            raise CommandError("--since must not be negative.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be a positive integer.")
+        encoder = DjangoJSONEncoder(separators=(",", ":"), ensure_ascii=False)
+        last = options["since"]
+        for batch in iter_batches(options["since"], options["batch_size"], options["model"]):
+            for item in change_items(batch):
+                self.stdout.write(encoder.encode(item))
+            last = batch[-1].seq
+        self.stderr.write(f"Up to date at sequence {last}.")
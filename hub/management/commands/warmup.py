@@ -0,0 +1,32 @@
+"""Warm this process up as a worker would and report each step's cost."""
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+
+from hub.warmup import STEPS, warm_up
+
+
+class Command(BaseCommand):
+    help = (
+        "Resolve URLs, compile hub templates, open database connections and "
+        "prime the in-process caches, reporting the time each step took."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--step",
+            choices=[name for name, _ in STEPS],
+            action="append",
+            help="Step to run; repeat for several (default: all).",
+        )
+
+    def handle(self, *args, **options):
+        results = warm_up(options["step"])
+        for name, (elapsed, summary) in results.items():
+            line = f"{name:<12}{elapsed:>9.1f} ms  {summary or 'failed (see log)'}"
+            self.stdout.write(line if summary is not None else self.style.ERROR(line))
+        total = sum(elapsed for elapsed, _ in results.values())
+        if any(summary is None for _, summary in results.values()):
+            raise CommandError(f"Warmup finished with failures in {total:.1f} ms.")
+        self.stdout.write(self.style.SUCCESS(f"Warmed up in {total:.1f} ms."))
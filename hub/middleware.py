@@ -0,0 +1,247 @@
+"""Response middleware: HTML minification and content compression."""
+
+from __future__ import annotations
+
+import re
+
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_sequence, compress_string
+
+from .instrumentation import metrics
+
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+DEFAULT_MIN_LENGTH = 512
+# Random bytes padded into gzip output against BREACH, as GZipMiddleware does.
+MAX_RANDOM_BYTES = GZipMiddleware.max_random_bytes
+
+# Blocks whose whitespace is significant and must survive minification.
+PRESERVED_BLOCK_RE = re.compile(r"(<(pre|textarea|script|style)\b.*?</\2\s*>)", re.S | re.I)
+COMMENT_RE = re.compile(r"<!--(?!\[if).*?-->", re.S)
+INDENT_RE = re.compile(r"\n\s+")
+SPACES_RE = re.compile(r"[ \t]{2,}")
+
+ACCEPT_ENCODING_RE = re.compile(r"\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?\s*")
+
+
+def minify_html(html):
+    """Strip comments, indentation and runs of blanks outside preserved blocks."""
+    parts = PRESERVED_BLOCK_RE.split(html)
+    output = []
+    # re.split with two groups yields [text, block, tag, text, block, tag, ...].
+    for index in range(0, len(parts), 3):
+        text = COMMENT_RE.sub("", parts[index])
+        text = INDENT_RE.sub("\n", text)
+        output.append(SPACES_RE.sub(" ", text))
+        if index + 1 < len(parts):
+            output.append(parts[index + 1])
+    return "".join(output).strip() + "\n"
+
+
+class HtmlMinifyMiddleware(MiddlewareMixin):
+    """Minify HTML rendered by hub views when ``HUB_MINIFY_HTML`` is set."""
+
+    def process_response(self, request, response):
+        if not getattr(settings, "HUB_MINIFY_HTML", False):
+            return response
+        if response.streaming or response.status_code != 200:
+            return response
+        if not response.get("Content-Type", "").startswith("text/html"):
+            return response
+        match = getattr(request, "resolver_match", None)
+        if match is None or match.app_name != "hub":
+            return response
+
+        original = len(response.content)
+        response.content = minify_html(response.content.decode(response.charset)).encode(response.charset)
+        if response.has_header("Content-Length"):
+            response.headers["Content-Length"] = str(len(response.content))
+        if original:
+            metrics.observe("minify.ratio", len(response.content) / original)
+        return response
+
+
+def _accepted_encodings(header):
+    accepted = set()
+    for item in header.split(","):
+        match = ACCEPT_ENCODING_RE.fullmatch(item)
+        if not match:
+            continue
+        coding, quality = match.groups()
+        try:
+            if quality is not None and float(quality) == 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(coding.lower())
+    return accepted
+
+
+def available_encodings():
+    """Encodings this process can produce, most effective first."""
+    encodings = []
+    if HAS_BROTLI:
+        encodings.append("br")
+    if HAS_ZSTD:
+        encodings.append("zstd")
+    encodings.append("gzip")
+    return encodings
+
+
+def choose_encoding(accept_encoding, encodings=None):
+    """The first of ``encodings`` (default: every available one) the client
+    accepts, or ``None``."""
+    accepted = _accepted_encodings(accept_encoding)
+    for encoding in available_encodings() if encodings is None else encodings:
+        if encoding in accepted or "*" in accepted:
+            return encoding
+    return None
+
+
+def may_carry_secrets(request):
+    """Whether a response may hold a CSRF token or other per-user secret.
+
+    Anything outside the hub app (the admin's bulk edit and import forms,
+    say) may, and so may any view that asked for a CSRF token.
+    """
+    match = getattr(request, "resolver_match", None)
+    return match is None or match.app_name != "hub" or bool(request.META.get("CSRF_COOKIE_NEEDS_UPDATE"))
+
+
+def _compressor(encoding):
+    """Return (compress, flush) callables for an incremental brotli or zstd
+    encoder; gzip goes through Django's padded helpers instead."""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=5)
+        return compressor.process, compressor.finish
+    compressor = zstandard.ZstdCompressor(level=6).compressobj()
+    return compressor.compress, compressor.flush
+
+
+def compress_bytes(data, encoding):
+    if encoding == "gzip":
+        return compress_string(data, max_random_bytes=MAX_RANDOM_BYTES)
+    compress, flush = _compressor(encoding)
+    return compress(data) + flush()
+
+
+class _StreamStats:
+    """Accumulate streamed byte counts and record the ratio once finished."""
+
+    def __init__(self, encoding):
+        self.encoding = encoding
+        self.original = 0
+        self.compressed = 0
+
+    def record(self):
+        metrics.incr(f"compression.{self.encoding}")
+        if self.original:
+            metrics.observe("compression.ratio", self.compressed / self.original)
+
+
+def _encode_stream(chunks, encoding):
+    if encoding == "gzip":
+        yield from compress_sequence(chunks, max_random_bytes=MAX_RANDOM_BYTES)
+        return
+    compress, flush = _compressor(encoding)
+    for chunk in chunks:
+        data = compress(chunk)
+        if data:
+            yield data
+    yield flush()
+
+
+def _compress_stream(chunks, encoding, stats):
+    def counted():
+        for chunk in chunks:
+            stats.original += len(chunk)
+            yield chunk
+
+    for data in _encode_stream(counted(), encoding):
+        stats.compressed += len(data)
+        yield data
+    stats.record()
+
+
+async def _compress_async_stream(chunks, encoding, stats):
+    # Like GZipMiddleware, gzip compresses each chunk as its own member.
+    compress, flush = (None, None) if encoding == "gzip" else _compressor(encoding)
+    async for chunk in chunks:
+        stats.original += len(chunk)
+        data = compress_bytes(chunk, encoding) if compress is None else compress(chunk)
+        if data:
+            stats.compressed += len(data)
+            yield data
+    if flush is not None:
+        tail = flush()
+        stats.compressed += len(tail)
+        yield tail
+    stats.record()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Compress responses with brotli, zstd or gzip, whichever the client
+    accepts first from that order. Brotli and zstd require the optional
+    ``brotli`` and ``zstandard`` packages.
+
+    Responses smaller than ``HUB_COMPRESS_MIN_LENGTH`` bytes go out as-is,
+    since the encoding overhead would outweigh the savings.
+
+    Against BREACH, gzip output carries the random padding of Django's
+    ``GZipMiddleware``, and responses that may hold a CSRF token
+    (:func:`may_carry_secrets`) are only ever gzipped.
+    """
+
+    def process_response(self, request, response):
+        if response.has_header("Content-Encoding"):
+            return response
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        encodings = ["gzip"] if may_carry_secrets(request) else None
+        encoding = choose_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""), encodings)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            stats = _StreamStats(encoding)
+            if response.is_async:
+                response.streaming_content = _compress_async_stream(
+                    response.streaming_content, encoding, stats
+                )
+            else:
+                response.streaming_content = _compress_stream(
+                    response.streaming_content, encoding, stats
+                )
+            del response["Content-Length"]
+        else:
+            min_length = getattr(settings, "HUB_COMPRESS_MIN_LENGTH", DEFAULT_MIN_LENGTH)
+            original = len(response.content)
+            if original < min_length:
+                return response
+            compressed = compress_bytes(response.content, encoding)
+            if len(compressed) >= original:
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+            metrics.incr(f"compression.{encoding}")
+            metrics.observe("compression.ratio", len(compressed) / original)
+
+        # The compressed body is a different representation of the resource.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+        return response
@@ -0,0 +1,72 @@
+from django.db import migrations, models
+
+from hub.utils import fold_text, fold_tokens
+
+FOLDED_FIELDS = {
+    "person": {"name": "name_folded", "role": "role_folded", "interests": "interests_folded"},
+    "community": {"name": "name_folded", "location": "location_folded"},
+    "school": {"name": "name_folded", "city": "city_folded", "programs": "programs_folded"},
+}
+
+
+def backfill_folded_columns(apps, schema_editor):
+    for model_name, fields in FOLDED_FIELDS.items():
+        Model = apps.get_model("hub", model_name)
+        batch = []
+        for obj in Model.objects.only("pk", *fields).iterator(chunk_size=1000):
+            for source, target in fields.items():
+                value = getattr(obj, source)
+                setattr(obj, target, fold_tokens(value) if isinstance(value, list) else fold_text(value))
+            batch.append(obj)
+        Model.objects.bulk_update(batch, list(fields.values()), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hub', '0005_auto_20251006_0454'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='person',
+            name='name_folded',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=150),
+        ),
+        migrations.AddField(
+            model_name='person',
+            name='role_folded',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=120),
+        ),
+        migrations.AddField(
+            model_name='person',
+            name='interests_folded',
+            field=models.TextField(blank=True, db_index=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='community',
+            name='name_folded',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=150),
+        ),
+        migrations.AddField(
+            model_name='community',
+            name='location_folded',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=120),
+        ),
+        migrations.AddField(
+            model_name='school',
+            name='name_folded',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=150),
+        ),
+        migrations.AddField(
+            model_name='school',
+            name='city_folded',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=120),
+        ),
+        migrations.AddField(
+            model_name='school',
+            name='programs_folded',
+            field=models.TextField(blank=True, db_index=True, editable=False),
+        ),
+        migrations.RunPython(backfill_folded_columns, migrations.RunPython.noop),
+    ]
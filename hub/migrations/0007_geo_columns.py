@@ -0,0 +1,55 @@
+from django.db import migrations, models
+
+from hub.geo import geocode
+
+GEO_SOURCES = {"community": "location", "school": "city"}
+
+
+def geocode_rows(apps, schema_editor):
+    for model_name, source in GEO_SOURCES.items():
+        Model = apps.get_model("hub", model_name)
+        batch = []
+        for obj in Model.objects.only("pk", source).iterator(chunk_size=1000):
+            place = geocode(getattr(obj, source))
+            obj.latitude, obj.longitude = (place.lat, place.lon) if place else (None, None)
+            batch.append(obj)
+        Model.objects.bulk_update(batch, ["latitude", "longitude"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hub', '0006_folded_search_columns'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='community',
+            name='latitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='community',
+            name='longitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='school',
+            name='latitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='school',
+            name='longitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='community',
+            index=models.Index(fields=['latitude', 'longitude'], name='hub_community_geo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='school',
+            index=models.Index(fields=['latitude', 'longitude'], name='hub_school_geo_idx'),
+        ),
+        migrations.RunPython(geocode_rows, migrations.RunPython.noop),
+    ]
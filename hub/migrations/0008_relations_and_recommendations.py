@@ -0,0 +1,98 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hub', '0007_geo_columns'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Affiliation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('student', 'Student'), ('alumnus', 'Alumnus'), ('staff', 'Staff'), ('mentor', 'Mentor')], default='student', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('person', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='affiliations', to='hub.person')),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='affiliations', to='hub.school')),
+            ],
+            options={
+                'ordering': ['school', 'person'],
+            },
+        ),
+        migrations.AddField(
+            model_name='person',
+            name='schools',
+            field=models.ManyToManyField(blank=True, related_name='affiliates', through='hub.Affiliation', to='hub.school'),
+        ),
+        migrations.CreateModel(
+            name='Membership',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(blank=True, help_text='Organizer, member, speaker...', max_length=120)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('community', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='memberships', to='hub.community')),
+                ('person', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='memberships', to='hub.person')),
+            ],
+            options={
+                'ordering': ['community', 'person'],
+            },
+        ),
+        migrations.AddField(
+            model_name='person',
+            name='communities',
+            field=models.ManyToManyField(blank=True, related_name='members', through='hub.Membership', to='hub.community'),
+        ),
+        migrations.CreateModel(
+            name='RelatedCommunity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('community', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_links', to='hub.community')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='hub.community')),
+            ],
+            options={
+                'ordering': ['community', 'rank'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SimilarPerson',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('person', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_links', to='hub.person')),
+                ('similar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='hub.person')),
+            ],
+            options={
+                'ordering': ['person', 'rank'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='affiliation',
+            index=models.Index(fields=['school', 'person'], name='hub_affiliation_school_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='affiliation',
+            constraint=models.UniqueConstraint(fields=('person', 'school'), name='hub_affiliation_unique'),
+        ),
+        migrations.AddIndex(
+            model_name='membership',
+            index=models.Index(fields=['community', 'person'], name='hub_membership_community_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='membership',
+            constraint=models.UniqueConstraint(fields=('person', 'community'), name='hub_membership_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='relatedcommunity',
+            constraint=models.UniqueConstraint(fields=('community', 'rank'), name='hub_relatedcommunity_rank_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='similarperson',
+            constraint=models.UniqueConstraint(fields=('person', 'rank'), name='hub_similarperson_rank_unique'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+from django.db import migrations
+
+# Frozen copy of hub.scoring.TRIGRAM_DOCUMENTS: the index expression must
+# match what TrigramDocument renders for queries to use it.
+TRIGRAM_DOCUMENTS = {
+    "hub_person": ("name_folded", "role_folded", "interests_folded", "availability", "bio"),
+    "hub_community": ("name_folded", "focus", "location_folded", "description"),
+    "hub_school": ("name_folded", "city_folded", "programs_folded"),
+}
+
+
+def _document(columns):
+    return "(" + " || ' ' || ".join(f'"{column}"' for column in columns) + ")"
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for table, columns in TRIGRAM_DOCUMENTS.items():
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS "{table}_trgm_idx" ON "{table}" '
+            f"USING gin ({_document(columns)} gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for table in TRIGRAM_DOCUMENTS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{table}_trgm_idx"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hub', '0008_relations_and_recommendations'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
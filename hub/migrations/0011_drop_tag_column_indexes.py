@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hub', '0010_change_log'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='person',
+            name='interests_folded',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='school',
+            name='programs_folded',
+            field=models.TextField(blank=True, editable=False),
+        ),
+    ]
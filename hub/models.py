@@ -4,11 +4,14 @@ from __future__ import annotations
 
 from django.core.validators import URLValidator, MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, router, transaction
 from django.urls import reverse
 from django.utils.text import slugify
 from django.utils.html import format_html
 
+from .geo import geocode
+from .utils import fold_text, fold_tokens
+
 
 class SluggedModel(models.Model):
     """Abstract base model adding a unique slug derived from the name."""
@@ -17,11 +20,40 @@ class SluggedModel(models.Model):
     slug = models.SlugField(max_length=160, unique=True, editable=False, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    name_folded = models.CharField(max_length=150, blank=True, editable=False, db_index=True)
+
+    # Source field -> shadow column holding its accent- and case-folded form.
+    # Searches and filters query the shadow columns; see prepare_for_write().
+    FOLDED_FIELDS = {"name": "name_folded"}
+    # Free-text place field geocoded into latitude/longitude columns, on
+    # models that have them; see hub.geo.
+    GEO_SOURCE = None
 
     class Meta:
         abstract = True
         ordering = ["name"]
 
+    def prepare_for_write(self):
+        """Refresh the folded shadow columns from their source fields.
+
+        ``save()`` calls this; code writing rows with ``bulk_create`` or
+        ``bulk_update`` must call it on each instance first.
+        """
+        for source, target in self.FOLDED_FIELDS.items():
+            value = getattr(self, source)
+            setattr(self, target, fold_tokens(value) if isinstance(value, list) else fold_text(value))
+        if self.GEO_SOURCE:
+            place = geocode(getattr(self, self.GEO_SOURCE))
+            self.latitude, self.longitude = (place.lat, place.lon) if place else (None, None)
+
+    @classmethod
+    def derived_fields(cls, fields):
+        """Columns prepare_for_write() recomputes from any of ``fields``."""
+        derived = [target for source, target in cls.FOLDED_FIELDS.items() if source in fields]
+        if cls.GEO_SOURCE in fields:
+            derived += ["latitude", "longitude"]
+        return derived
+
     def save(self, *args, **kwargs):
         if not self.name:
             raise ValueError("Name is required to generate a slug.")
@@ -39,7 +71,18 @@ class SluggedModel(models.Model):
             slug = f"{base_slug}-{counter}"
 
         self.slug = slug
-        super().save(*args, **kwargs)
+        self.prepare_for_write()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            update_fields.update(self.derived_fields(update_fields))
+            kwargs["update_fields"] = update_fields
+        # Outside a transaction Django would commit the row before post_save
+        # runs; keep it and its change log entry together. (delete() already
+        # sends post_delete inside its own transaction.)
+        using = kwargs.get("using") or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
 
     def __str__(self) -> str:  # pragma: no cover - human-friendly repr
         return self.name
@@ -58,6 +101,23 @@ class Person(SluggedModel):
     linkedin_url = models.URLField(blank=True, help_text="LinkedIn profile URL")
     website_url = models.URLField(blank=True, help_text="Personal website URL")
 
+    role_folded = models.CharField(max_length=120, blank=True, editable=False, db_index=True)
+    # Matched with "|tag|" containment, which no b-tree index serves.
+    interests_folded = models.TextField(blank=True, editable=False)
+
+    communities = models.ManyToManyField(
+        "Community", through="Membership", related_name="members", blank=True
+    )
+    schools = models.ManyToManyField(
+        "School", through="Affiliation", related_name="affiliates", blank=True
+    )
+
+    FOLDED_FIELDS = {
+        **SluggedModel.FOLDED_FIELDS,
+        "role": "role_folded",
+        "interests": "interests_folded",
+    }
+
     class Meta:
         ordering = ["name"]
         verbose_name = "Person"
@@ -131,10 +191,18 @@ class Community(SluggedModel):
         validators=[MinValueValidator(0)]
     )
 
+    location_folded = models.CharField(max_length=120, blank=True, editable=False, db_index=True)
+    latitude = models.FloatField(null=True, blank=True, editable=False)
+    longitude = models.FloatField(null=True, blank=True, editable=False)
+
+    FOLDED_FIELDS = {**SluggedModel.FOLDED_FIELDS, "location": "location_folded"}
+    GEO_SOURCE = "location"
+
     class Meta:
         ordering = ["name"]
         verbose_name = "Community"
         verbose_name_plural = "Communities"
+        indexes = [models.Index(fields=["latitude", "longitude"], name="hub_community_geo_idx")]
 
     def clean(self):
         """Validate the model instance."""
@@ -187,10 +255,24 @@ class School(SluggedModel):
     programs = models.JSONField(default=list, blank=True, help_text="List of programs offered")
     contact = models.CharField(max_length=150, blank=True, help_text="Contact information")
 
+    city_folded = models.CharField(max_length=120, blank=True, editable=False, db_index=True)
+    # Matched with "|tag|" containment, which no b-tree index serves.
+    programs_folded = models.TextField(blank=True, editable=False)
+    latitude = models.FloatField(null=True, blank=True, editable=False)
+    longitude = models.FloatField(null=True, blank=True, editable=False)
+
+    FOLDED_FIELDS = {
+        **SluggedModel.FOLDED_FIELDS,
+        "city": "city_folded",
+        "programs": "programs_folded",
+    }
+    GEO_SOURCE = "city"
+
     class Meta:
         ordering = ["name"]
         verbose_name = "School"
         verbose_name_plural = "Schools"
+        indexes = [models.Index(fields=["latitude", "longitude"], name="hub_school_geo_idx")]
 
     def clean(self):
         """Validate the model instance."""
@@ -208,3 +290,124 @@ class School(SluggedModel):
 
     def get_absolute_url(self) -> str:
         return reverse("hub:school-detail", kwargs={"slug": self.slug})
+
+
+class Membership(models.Model):
+    """A person belonging to a community."""
+
+    person = models.ForeignKey(Person, on_delete=models.CASCADE, related_name="memberships")
+    community = models.ForeignKey(Community, on_delete=models.CASCADE, related_name="memberships")
+    role = models.CharField(max_length=120, blank=True, help_text="Organizer, member, speaker...")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["community", "person"]
+        constraints = [
+            models.UniqueConstraint(fields=["person", "community"], name="hub_membership_unique"),
+        ]
+        # The unique constraint serves lookups by person; this one by community.
+        indexes = [models.Index(fields=["community", "person"], name="hub_membership_community_idx")]
+
+    def __str__(self) -> str:  # pragma: no cover - human-friendly repr
+        return f"{self.person} in {self.community}"
+
+
+class Affiliation(models.Model):
+    """A person's tie to a school."""
+
+    STUDENT = "student"
+    ALUMNUS = "alumnus"
+    STAFF = "staff"
+    MENTOR = "mentor"
+    KIND_CHOICES = [
+        (STUDENT, "Student"),
+        (ALUMNUS, "Alumnus"),
+        (STAFF, "Staff"),
+        (MENTOR, "Mentor"),
+    ]
+
+    person = models.ForeignKey(Person, on_delete=models.CASCADE, related_name="affiliations")
+    school = models.ForeignKey(School, on_delete=models.CASCADE, related_name="affiliations")
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, default=STUDENT)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["school", "person"]
+        constraints = [
+            models.UniqueConstraint(fields=["person", "school"], name="hub_affiliation_unique"),
+        ]
+        indexes = [models.Index(fields=["school", "person"], name="hub_affiliation_school_idx")]
+
+    def __str__(self) -> str:  # pragma: no cover - human-friendly repr
+        return f"{self.person} at {self.school} ({self.get_kind_display()})"
+
+
+class SimilarPerson(models.Model):
+    """Precomputed recommendation: ``similar`` is the ``rank``-th closest
+    match for ``person``. Rebuilt by ``build_recommendations``."""
+
+    person = models.ForeignKey(Person, on_delete=models.CASCADE, related_name="similar_links")
+    similar = models.ForeignKey(Person, on_delete=models.CASCADE, related_name="+")
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+
+    class Meta:
+        ordering = ["person", "rank"]
+        constraints = [
+            models.UniqueConstraint(fields=["person", "rank"], name="hub_similarperson_rank_unique"),
+        ]
+
+
+class RelatedCommunity(models.Model):
+    """Precomputed recommendation: ``related`` is the ``rank``-th closest
+    match for ``community``. Rebuilt by ``build_recommendations``."""
+
+    community = models.ForeignKey(Community, on_delete=models.CASCADE, related_name="related_links")
+    related = models.ForeignKey(Community, on_delete=models.CASCADE, related_name="+")
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+
+    class Meta:
+        ordering = ["community", "rank"]
+        constraints = [
+            models.UniqueConstraint(fields=["community", "rank"], name="hub_relatedcommunity_rank_unique"),
+        ]
+
+
+class ChangeLogEntry(models.Model):
+    """One created, updated or deleted directory row, appended in the same
+    transaction as the change. ``seq`` only grows; see hub/changelog.py."""
+
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
+    ACTION_CHOICES = [
+        (CREATED, "Created"),
+        (UPDATED, "Updated"),
+        (DELETED, "Deleted"),
+    ]
+
+    seq = models.BigAutoField(primary_key=True)
+    model_name = models.CharField(max_length=40)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    changed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["seq"]
+        verbose_name_plural = "change log entries"
+
+    def __str__(self):
+        return f"#{self.seq} {self.action} {self.model_name} {self.object_id}"
+
+
+class IndexGeneration(models.Model):
+    """Single row bumped by ``manage.py flush_search_index``. Every process
+    re-indexes its in-memory search indexes when it sees a new value; see
+    :meth:`hub.indexing.IndexQueue.sync_generation`."""
+
+    generation = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Index generation {self.generation}"
@@ -0,0 +1,163 @@
+"""A small filter language for the directory lists and API.
+
+    interest:django,python role:lead -availability:speaking ada
+
+Each ``field:value`` term filters on a field; comma-separated values match
+any of them, repeated terms must all match, and a leading ``-`` excludes.
+Values with spaces go in double quotes (``role:"tech lead"``). Words that
+are not a known ``field:`` term form the free-text search, which the list
+views rank as before.
+
+Text is parsed into a :class:`Query` of :class:`Term` nodes, then compiled
+into one ``Q`` per model: terms become lookups on the indexed folded
+columns (tags match whole items), and relations become ``EXISTS``
+subqueries on the membership tables, so no join multiplies rows. Compiled
+plans are cached per ``(model, text)`` and shared by every request.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache, reduce
+from operator import and_, or_
+
+from django.db.models import Exists, OuterRef, Q
+
+from .models import Affiliation, Community, Membership, Person, School
+from .utils import fold_text, prefix_q
+
+PLAN_CACHE_SIZE = 512
+
+_TOKEN_RE = re.compile(r'(-?)([a-z_]+):("([^"]*)"?|\S*)|"([^"]*)"?|(\S+)', re.IGNORECASE)
+
+
+class QueryError(ValueError):
+    """Raised for malformed filter expressions."""
+
+
+@dataclass(frozen=True)
+class Term:
+    field: str
+    values: tuple
+    negated: bool = False
+
+
+@dataclass(frozen=True)
+class Query:
+    terms: tuple
+    text: str
+
+
+def _contains(column):
+    return lambda value: Q(**{f"{column}__contains": value})
+
+
+def _tag(column):
+    # Folded tag columns look like "|django|web design|".
+    return lambda value: Q(**{f"{column}__contains": f"|{value}|"})
+
+
+def _prefix(column):
+    return lambda value: prefix_q(column, value)
+
+
+def _icontains(column):
+    return lambda value: Q(**{f"{column}__icontains": value})
+
+
+def _related(model, owner, lookup):
+    """Match rows with a related ``model`` row for which ``lookup`` holds."""
+
+    def build(values):
+        matches = reduce(or_, (lookup(value) for value in values))
+        return Q(Exists(model.objects.filter(matches, **{owner: OuterRef("pk")})))
+
+    build.related = True
+    return build
+
+
+QUERY_FIELDS = {
+    Person: {
+        "name": _prefix("name_folded"),
+        "role": _contains("role_folded"),
+        "interest": _tag("interests_folded"),
+        "availability": _icontains("availability"),
+        "community": _related(Membership, "person", _contains("community__name_folded")),
+        "school": _related(Affiliation, "person", _contains("school__name_folded")),
+    },
+    Community: {
+        "name": _prefix("name_folded"),
+        "location": _contains("location_folded"),
+        "focus": _icontains("focus"),
+        "member": _related(Membership, "community", _contains("person__name_folded")),
+        "interest": _related(Membership, "community", _tag("person__interests_folded")),
+    },
+    School: {
+        "name": _prefix("name_folded"),
+        "city": _contains("city_folded"),
+        "program": _tag("programs_folded"),
+        "affiliate": _related(Affiliation, "school", _contains("person__name_folded")),
+    },
+}
+
+ALIASES = {
+    Person: {"interests": "interest"},
+    Community: {"city": "location", "interests": "interest", "members": "member"},
+    School: {"programs": "program", "affiliates": "affiliate"},
+}
+
+
+def field_names(model):
+    return sorted(QUERY_FIELDS[model])
+
+
+def parse(model, text):
+    """Parse ``text`` into a :class:`Query` against ``model``'s fields."""
+    fields, aliases = QUERY_FIELDS[model], ALIASES.get(model, {})
+    terms, words = [], []
+    for match in _TOKEN_RE.finditer(text):
+        negated, name, raw, quoted, phrase, word = match.groups()
+        field = aliases.get((name or "").lower(), (name or "").lower())
+        if name is None or field not in fields:
+            words.append(phrase if phrase is not None else (word or match.group(0)))
+            continue
+        parts = [quoted] if quoted is not None else raw.split(",")
+        values = tuple(dict.fromkeys(v for v in (fold_text(part) for part in parts) if v))
+        if not values:
+            raise QueryError(f"No value given for {field}:.")
+        terms.append(Term(field, values, bool(negated)))
+    return Query(tuple(terms), " ".join(w for w in words if w.strip()))
+
+
+def compile_terms(model, terms):
+    """One ``Q`` for all ``terms``, or ``None`` when there are none."""
+    fields = QUERY_FIELDS[model]
+    conditions = []
+    for term in terms:
+        build = fields[term.field]
+        if getattr(build, "related", False):
+            condition = build(term.values)
+        else:
+            condition = reduce(or_, (build(value) for value in term.values))
+        conditions.append(~condition if term.negated else condition)
+    return reduce(and_, conditions) if conditions else None
+
+
+@lru_cache(maxsize=PLAN_CACHE_SIZE)
+def plan(model, text):
+    """``(Q or None, free text)`` for ``text``; cached across requests.
+
+    The ``Q`` is shared, so callers must only pass it to ``filter()``.
+    """
+    query = parse(model, text)
+    return compile_terms(model, query.terms), query.text
+
+
+def apply_query(queryset, text):
+    """Filter ``queryset`` by the terms in ``text``; return it with the
+    remaining free text."""
+    condition, free_text = plan(queryset.model, " ".join(text.split()))
+    if condition is not None:
+        queryset = queryset.filter(condition)
+    return queryset, free_text
@@ -0,0 +1,191 @@
+"""Per-client rate limiting and request coalescing for public endpoints.
+
+:func:`ratelimit` guards a view with a token bucket per client IP. Limits
+are configured per scope in ``HUB_RATE_LIMITS`` as ``(rate, burst)``: a
+client may make ``burst`` requests at once and then ``rate`` per second.
+Buckets live in process memory by default (``HUB_RATELIMIT_STORE =
+"locmem"``); ``"cache"`` keeps them in the ``HUB_RATELIMIT_CACHE`` cache
+backend so all workers share them. Behind reverse proxies, set
+``HUB_TRUSTED_PROXY_COUNT`` so clients are told apart by
+``X-Forwarded-For`` rather than by the proxy's address.
+
+:class:`SingleFlight` lets concurrent identical computations share one
+result.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import JsonResponse
+
+from .instrumentation import metrics
+
+DEFAULT_RATE_LIMITS = {
+    "search": (5.0, 30),
+}
+
+
+class LocMemBucketStore:
+    """Token buckets in this process's memory."""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, burst, now=None):
+        """Spend one token from ``key``; return ``(allowed, retry_after)``."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens, stamp = self._buckets.pop(key, (burst, now))
+            tokens = min(burst, tokens + (now - stamp) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            # Re-inserting keeps the dict in least-recently-used order.
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_entries:
+                del self._buckets[next(iter(self._buckets))]
+        return allowed, 0.0 if allowed else (1 - tokens) / rate
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class CacheBucketStore:
+    """Token buckets in a Django cache backend, shared by every worker.
+
+    The read-modify-write is not atomic, so concurrent requests from one
+    client can occasionally spend a token twice; the limit stays
+    approximately right, which is all a rate limiter needs.
+    """
+
+    key_prefix = "hub:ratelimit:"
+
+    def __init__(self, alias="default"):
+        self.alias = alias
+
+    def take(self, key, rate, burst, now=None):
+        now = time.time() if now is None else now
+        cache = caches[self.alias]
+        cache_key = self.key_prefix + key
+        tokens, stamp = cache.get(cache_key, (burst, now))
+        tokens = min(burst, tokens + (now - stamp) * rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        # Expire once the bucket would have refilled anyway.
+        cache.set(cache_key, (tokens, now), timeout=math.ceil(burst / rate) + 1)
+        return allowed, 0.0 if allowed else (1 - tokens) / rate
+
+    def reset(self):
+        """Clear the whole cache backend; intended for tests."""
+        caches[self.alias].clear()
+
+
+_locmem_store = LocMemBucketStore()
+
+
+def get_store():
+    if getattr(settings, "HUB_RATELIMIT_STORE", "locmem") == "cache":
+        return CacheBucketStore(getattr(settings, "HUB_RATELIMIT_CACHE", "default"))
+    return _locmem_store
+
+
+def get_limit(scope):
+    """``(rate, burst)`` for ``scope``, or ``None`` when it is unlimited."""
+    limits = {**DEFAULT_RATE_LIMITS, **getattr(settings, "HUB_RATE_LIMITS", {})}
+    return limits.get(scope)
+
+
+def client_ip(request):
+    """The address a client's bucket is keyed by.
+
+    ``REMOTE_ADDR``, unless ``HUB_TRUSTED_PROXY_COUNT`` proxies each append
+    to ``X-Forwarded-For``: then the address the outermost one saw. Entries
+    left of that are client-supplied and never trusted.
+    """
+    proxies = getattr(settings, "HUB_TRUSTED_PROXY_COUNT", 0)
+    if proxies:
+        forwarded = request.META.get("HTTP_X_FORWARDED_FOR", "")
+        addresses = [address.strip() for address in forwarded.split(",") if address.strip()]
+        if len(addresses) >= proxies:
+            return addresses[-proxies]
+    return request.META.get("REMOTE_ADDR") or "unknown"
+
+
+def ratelimit(scope):
+    """Reject requests over the ``scope`` limit with ``429 Too Many Requests``."""
+
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            limit = get_limit(scope)
+            if limit:
+                rate, burst = limit
+                allowed, retry_after = get_store().take(f"{scope}:{client_ip(request)}", rate, burst)
+                if not allowed:
+                    metrics.incr(f"ratelimit.{scope}.rejected")
+                    response = JsonResponse({"error": "Too many requests."}, status=429)
+                    response["Retry-After"] = str(math.ceil(retry_after))
+                    return response
+            return view(request, *args, **kwargs)
+
+        return wrapped
+
+    return decorator
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Run one computation per key at a time; concurrent callers share it."""
+
+    def __init__(self, name):
+        self.name = name
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func):
+        """Return ``func()``, or the result of an identical call in flight.
+
+        Followers receive the leader's result object itself, so it must be
+        treated as read-only.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            metrics.incr(f"{self.name}.coalesced")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
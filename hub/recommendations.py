@@ -0,0 +1,89 @@
+"""Precomputed "similar people" and "related communities".
+
+:func:`build_recommendations` stores each row's ``top_k`` best matches in
+:class:`~hub.models.SimilarPerson` and :class:`~hub.models.RelatedCommunity`
+so detail pages read them with a single indexed lookup instead of
+comparing rows at request time. People are matched by the vector
+similarity in :mod:`hub.similarity`. Communities are matched by the
+Jaccard index of their members' interests, with candidate pairs taken
+from an inverted index (interest -> rows) so rows with nothing in common
+are never compared.
+"""
+
+from __future__ import annotations
+
+import heapq
+from collections import Counter, defaultdict
+
+from django.db import transaction
+
+from . import similarity
+from .models import Membership, Person, RelatedCommunity
+from .utils import fold_text
+
+DEFAULT_TOP_K = 5
+# Pairs scoring below this are not worth recommending.
+DEFAULT_MIN_SCORE = 0.1
+
+
+def top_matches(tag_sets, top_k=DEFAULT_TOP_K, min_score=DEFAULT_MIN_SCORE):
+    """``{key: [(other, score), ...]}``, best first, for ``{key: set(tags)}``.
+
+    Scores are Jaccard indexes, ``|a ∩ b| / |a ∪ b|``, with ``|a ∩ b|``
+    counted from the postings. Ties are broken by key so results are
+    deterministic.
+    """
+    postings = defaultdict(list)
+    for key, tags in tag_sets.items():
+        for tag in tags:
+            postings[tag].append(key)
+
+    matches = {}
+    for key, tags in tag_sets.items():
+        shared = Counter(other for tag in tags for other in postings[tag] if other != key)
+        scored = (
+            (count / (len(tags) + len(tag_sets[other]) - count), other)
+            for other, count in shared.items()
+        )
+        best = heapq.nsmallest(top_k, ((-score, other) for score, other in scored if score >= min_score))
+        if best:
+            matches[key] = [(other, -negative) for negative, other in best]
+    return matches
+
+
+def person_interests():
+    """``{person_pk: set(folded interests)}``."""
+    return {
+        pk: {fold_text(tag) for tag in interests or () if fold_text(tag)}
+        for pk, interests in Person.objects.order_by().values_list("pk", "interests").iterator(chunk_size=2000)
+    }
+
+
+def community_interests(people=None):
+    """``{community_pk: union of its members' folded interests}``."""
+    people = person_interests() if people is None else people
+    tags = defaultdict(set)
+    for community_id, person_id in Membership.objects.order_by().values_list("community_id", "person_id"):
+        tags[community_id] |= people.get(person_id, set())
+    return dict(tags)
+
+
+def _replace(model, owner_field, target_field, matches):
+    rows = [
+        model(**{f"{owner_field}_id": owner, f"{target_field}_id": target, "score": score, "rank": rank})
+        for owner, ranked in matches.items()
+        for rank, (target, score) in enumerate(ranked, start=1)
+    ]
+    model.objects.all().delete()
+    model.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def build_recommendations(top_k=DEFAULT_TOP_K, min_score=DEFAULT_MIN_SCORE):
+    """Rebuild both recommendation tables; return ``(people_rows, community_rows)``."""
+    related = top_matches(community_interests(), top_k, min_score)
+    with transaction.atomic():
+        return (
+            similarity.rebuild(top_k, min_score),
+            _replace(RelatedCommunity, "community", "related", related),
+        )
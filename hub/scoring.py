@@ -0,0 +1,281 @@
+"""Relevance scoring for directory search.
+
+A row's score is the sum of:
+
+* the weight of every field the query matches (``name`` > ``role`` >
+  ``interests`` > ``bio`` by default), matched on the folded shadow
+  columns where a model has them;
+* ``HUB_SEARCH_PREFIX_BOOST`` when the name starts with the query;
+* ``HUB_SEARCH_FUZZY_WEIGHT`` times the trigram similarity of typo matches
+  found by :mod:`hub.fuzzy`;
+* ``HUB_SEARCH_RECENCY_BOOST`` decayed by the record's age, halving every
+  ``HUB_SEARCH_RECENCY_HALF_LIFE_DAYS``.
+
+:func:`rank_queryset` computes all of it in the database, approximating
+the recency decay with a step function, and returns a queryset ordered by
+score. :func:`rerank` scores an already-fetched candidate set exactly in
+process (vectorized with numpy when it is installed); the search API uses
+it to pick its top suggestions from the database's best candidates.
+
+On Postgres, rows are matched with ``pg_trgm``'s word-similarity operator
+against one :class:`TrigramDocument` per model, the expression the GIN
+index of migration ``0009_trigram_indexes`` is built on, so the planner
+reads the index instead of computing similarities for every row.
+"""
+
+from __future__ import annotations
+
+import operator
+from datetime import timedelta
+from functools import reduce
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import BooleanField, Case, F, FloatField, Func, Q, TextField, Value, When
+from django.utils import timezone
+
+from . import sharedstore
+from .fuzzy import fuzzy_matches
+from .indexing import index_queue
+from .models import Community, Person, School
+from .utils import fold_text, optional_numpy
+
+# Default per-field weights. Override per model with HUB_SEARCH_WEIGHTS,
+# e.g. {"person": {"bio": 0.5}}.
+DEFAULT_WEIGHTS = {
+    Person: {"name": 4.0, "role": 3.0, "interests": 2.0, "availability": 1.0, "bio": 1.0},
+    Community: {"name": 4.0, "focus": 2.0, "location": 2.0, "description": 1.0},
+    School: {"name": 4.0, "city": 2.0, "programs": 2.0},
+}
+DEFAULT_PREFIX_BOOST = 2.0
+DEFAULT_FUZZY_WEIGHT = 3.0
+DEFAULT_RECENCY_BOOST = 1.0
+DEFAULT_HALF_LIFE_DAYS = 180
+TRIGRAM_THRESHOLD = 0.2
+
+# Columns concatenated into each model's trigram document: the folded
+# shadow column where there is one, the raw field otherwise (pg_trgm
+# lowercases on its own). Migration 0009 indexes exactly this expression;
+# changing it needs a migration rebuilding the index.
+TRIGRAM_DOCUMENTS = {
+    Person: ("name_folded", "role_folded", "interests_folded", "availability", "bio"),
+    Community: ("name_folded", "focus", "location_folded", "description"),
+    School: ("name_folded", "city_folded", "programs_folded"),
+}
+
+# The database approximates the recency decay with this many steps of half
+# a half-life each; older rows get no recency boost.
+RECENCY_STEPS = 8
+
+
+def field_weights(model):
+    overrides = getattr(settings, "HUB_SEARCH_WEIGHTS", {}).get(model._meta.model_name, {})
+    return {**DEFAULT_WEIGHTS[model], **overrides}
+
+
+def _setting(name, default):
+    return float(getattr(settings, name, default))
+
+
+def _column(model, field):
+    """The folded shadow column for ``field``, or ``None`` if it has none."""
+    return model.FOLDED_FIELDS.get(field)
+
+
+def _field_q(model, field, query, folded):
+    column = _column(model, field)
+    if column:
+        return Q(**{f"{column}__contains": folded})
+    return Q(**{f"{field}__icontains": query})
+
+
+def match_q(model, query):
+    """Rows matching ``query`` in any weighted field."""
+    folded = fold_text(query)
+    return reduce(operator.or_, (_field_q(model, field, query, folded) for field in field_weights(model)))
+
+
+def match_text(obj):
+    """Folded text of every weighted field of ``obj``, one field per line.
+
+    The search API sends it along with suggestions so the client can narrow
+    a complete result set locally as the query grows.
+    """
+    lines = []
+    for field in field_weights(type(obj)):
+        column = _column(type(obj), field)
+        lines.append(getattr(obj, column) if column else fold_text(getattr(obj, field)))
+    return "\n".join(lines)
+
+
+class TrigramDocument(Func):
+    """``col1 || ' ' || col2 || ...`` over a model's trigram document columns.
+
+    Must render the same expression as the index in migration 0009, or
+    Postgres will not use it.
+    """
+
+    template = "(%(expressions)s)"
+    arg_joiner = " || ' ' || "
+
+    def __init__(self, model):
+        super().__init__(*TRIGRAM_DOCUMENTS[model], output_field=TextField())
+
+
+class WordSimilar(Func):
+    """``query <% document``: true when ``query`` is word-similar to part of
+    ``document`` by at least ``pg_trgm.word_similarity_threshold``."""
+
+    template = "%(expressions)s"
+    arg_joiner = " <%% "
+    output_field = BooleanField()
+
+
+def use_trigram():
+    """Whether searches go through ``pg_trgm`` (on Postgres)."""
+    return connection.vendor == "postgresql"
+
+
+def set_trigram_threshold(sender, connection, **kwargs):
+    """``connection_created`` receiver: make ``<%`` use :data:`TRIGRAM_THRESHOLD`."""
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT set_config('pg_trgm.word_similarity_threshold', %s, false)", [str(TRIGRAM_THRESHOLD)]
+            )
+
+
+def _flag(condition, weight):
+    return Case(When(condition, then=Value(weight)), default=Value(0.0), output_field=FloatField())
+
+
+def recency_expression(now=None):
+    """Stepped approximation of ``boost * 0.5 ** (age / half_life)``."""
+    boost = _setting("HUB_SEARCH_RECENCY_BOOST", DEFAULT_RECENCY_BOOST)
+    half_life = _setting("HUB_SEARCH_RECENCY_HALF_LIFE_DAYS", DEFAULT_HALF_LIFE_DAYS)
+    if not boost or half_life <= 0:
+        return Value(0.0, output_field=FloatField())
+    now = now or timezone.now()
+    step = timedelta(days=half_life / 2)
+    # Each step is scored at its midpoint age.
+    whens = [
+        When(created_at__gte=now - step * (index + 1), then=Value(boost * 0.5 ** ((index + 0.5) / 2)))
+        for index in range(RECENCY_STEPS)
+    ]
+    return Case(*whens, default=Value(0.0), output_field=FloatField())
+
+
+def rank_queryset(queryset, query, trigram=False, now=None):
+    """Filter ``queryset`` to rows matching ``query``, best first.
+
+    Annotates ``score`` on every row, and ``fuzzy`` (the trigram similarity
+    of typo matches) when the in-memory fuzzy index contributed. With
+    ``trigram=True`` (Postgres with ``pg_trgm``) field matches are weighted
+    trigram similarities instead of substring hits, and rows are found
+    through the trigram index; ``similarity`` is then annotated too.
+    """
+    model = queryset.model
+    weights = field_weights(model)
+    folded = fold_text(query)
+    prefix = _flag(Q(name_folded__startswith=folded), _setting("HUB_SEARCH_PREFIX_BOOST", DEFAULT_PREFIX_BOOST))
+    recency = recency_expression(now)
+
+    if trigram:
+        # Imported here so workers on other databases never load it.
+        from django.contrib.postgres.search import TrigramSimilarity, TrigramWordSimilarity
+
+        similarities = {
+            field: TrigramSimilarity(_column(model, field) or field, folded if _column(model, field) else query)
+            for field in weights
+        }
+        weighted = reduce(operator.add, (sim * Value(weights[field]) for field, sim in similarities.items()))
+        document = TrigramDocument(model)
+        return (
+            queryset.filter(WordSimilar(Value(folded), document))
+            .annotate(
+                similarity=TrigramWordSimilarity(folded, document),
+                score=weighted + prefix + recency,
+            )
+            .order_by("-score", "name")
+        )
+
+    matched = reduce(
+        operator.add,
+        (_flag(_field_q(model, field, query, folded), weight) for field, weight in weights.items()),
+    )
+    condition = match_q(model, query)
+    narrowed = sharedstore.candidate_q(model, query)
+    if narrowed is not None:
+        # An indexed primary key lookup instead of a substring scan.
+        condition &= narrowed
+    fuzzy = Value(0.0, output_field=FloatField())
+    if getattr(settings, "HUB_FUZZY_SEARCH", False):
+        index_queue.sync_generation()
+        matches = fuzzy_matches(model, query)
+        if matches:
+            condition |= Q(pk__in=[pk for pk, _ in matches])
+            fuzzy = Case(
+                *(When(pk=pk, then=Value(score)) for pk, score in matches),
+                default=Value(0.0),
+                output_field=FloatField(),
+            )
+    fuzzy_weight = _setting("HUB_SEARCH_FUZZY_WEIGHT", DEFAULT_FUZZY_WEIGHT)
+    return (
+        queryset.filter(condition)
+        .annotate(fuzzy=fuzzy)
+        .annotate(score=matched + prefix + recency + F("fuzzy") * Value(fuzzy_weight))
+        .order_by("-score", "name")
+    )
+
+
+def _matches(obj, field, query, folded):
+    column = _column(type(obj), field)
+    if column:
+        return folded in (getattr(obj, column) or "")
+    value = getattr(obj, field)
+    return query.casefold() in str(value or "").casefold()
+
+
+def rerank(objects, query, now=None):
+    """Score ``objects`` exactly in process; return ``[(obj, score)]`` best first.
+
+    Uses the same components as :func:`rank_queryset` but with a continuous
+    recency decay. ``objects`` should come from :func:`rank_queryset` so
+    typo matches carry their ``fuzzy`` similarity.
+    """
+    objects = list(objects)
+    if not objects:
+        return []
+    model = type(objects[0])
+    weights = field_weights(model)
+    folded = fold_text(query)
+    now = now or timezone.now()
+    prefix_boost = _setting("HUB_SEARCH_PREFIX_BOOST", DEFAULT_PREFIX_BOOST)
+    fuzzy_weight = _setting("HUB_SEARCH_FUZZY_WEIGHT", DEFAULT_FUZZY_WEIGHT)
+    recency_boost = _setting("HUB_SEARCH_RECENCY_BOOST", DEFAULT_RECENCY_BOOST)
+    half_life = _setting("HUB_SEARCH_RECENCY_HALF_LIFE_DAYS", DEFAULT_HALF_LIFE_DAYS) or 1.0
+
+    hits = [[_matches(obj, field, query, folded) for field in weights] for obj in objects]
+    prefixes = [obj.name_folded.startswith(folded) for obj in objects]
+    fuzzies = [getattr(obj, "fuzzy", 0.0) or 0.0 for obj in objects]
+    ages = [max((now - obj.created_at).total_seconds() / 86400, 0.0) for obj in objects]
+
+    numpy = optional_numpy()
+    if numpy is not None:
+        scores = (
+            numpy.asarray(hits, dtype=float) @ numpy.fromiter(weights.values(), dtype=float)
+            + prefix_boost * numpy.asarray(prefixes, dtype=float)
+            + fuzzy_weight * numpy.asarray(fuzzies, dtype=float)
+            + recency_boost * numpy.exp2(-numpy.asarray(ages) / half_life)
+        ).tolist()
+    else:
+        weight_values = list(weights.values())
+        scores = [
+            sum(weight for weight, hit in zip(weight_values, row) if hit)
+            + prefix_boost * is_prefix
+            + fuzzy_weight * fuzzy
+            + recency_boost * 2 ** (-age / half_life)
+            for row, is_prefix, fuzzy, age in zip(hits, prefixes, fuzzies, ages)
+        ]
+
+    return sorted(zip(objects, scores), key=lambda item: (-item[1], item[0].name))
@@ -0,0 +1,216 @@
+"""Bulk writes for seeding, imports and admin mass edits.
+
+``save()`` probes slug uniqueness and fires signals once per row. The
+functions here write in chunks with ``bulk_create``/``bulk_update`` inside
+one transaction, allocate slugs for a whole chunk with one query, and
+record everything they touched as one :mod:`hub.batching` batch, so derived
+data is refreshed once after the transaction commits. Each chunk is also
+appended to the change log (:mod:`hub.changelog`), as ``save()`` would.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import time
+from dataclasses import dataclass, field
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from .batching import batch_changes, record
+from .changelog import log_changes
+from .export import EXPORT_FIELDS
+from .models import ChangeLogEntry
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+@dataclass
+class BulkReport:
+    """Outcome of a bulk write; ``progress`` holds one line per chunk."""
+
+    created: int = 0
+    updated: int = 0
+    skipped: int = 0
+    errors: list = field(default_factory=list)
+    progress: list = field(default_factory=list)
+
+    def log_chunk(self, done, total, started):
+        self.progress.append(f"{done}/{total} rows written ({time.perf_counter() - started:.2f}s)")
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _written_fields(model, fields):
+    """``fields`` plus the columns derived from them and ``updated_at``."""
+    return [*fields, *model.derived_fields(fields), "updated_at"]
+
+
+def allocate_slugs(model, objects):
+    """Give each of ``objects`` a unique slug with one query per chunk.
+
+    Mirrors ``SluggedModel.save()``: the slugified name, or the first free
+    ``-2``, ``-3``, ... suffix when it is taken.
+    """
+    bases = []
+    for obj in objects:
+        base = slugify(obj.name)
+        if not base:
+            raise ValueError(f"Unable to derive slug from name {obj.name!r}.")
+        bases.append(base)
+    taken = set(model.objects.filter(slug__in=set(bases)).values_list("slug", flat=True))
+    for base in {base for base in bases if base in taken}:
+        taken.update(model.objects.filter(slug__startswith=f"{base}-").values_list("slug", flat=True))
+    for obj, base in zip(objects, bases):
+        slug, counter = base, 1
+        while slug in taken:
+            counter += 1
+            slug = f"{base}-{counter}"
+        taken.add(slug)
+        obj.slug = slug
+
+
+def _coerce(model, name, value):
+    model_field = model._meta.get_field(name)
+    if model_field.get_internal_type() == "JSONField":
+        if isinstance(value, str):
+            value = json.loads(value) if value.strip() else model_field.get_default()
+        return model_field.get_default() if value is None else value
+    if value in (None, "") and model_field.null:
+        return None
+    return model_field.to_python("" if value is None else value)
+
+
+def bulk_seed(model, entries, chunk_size=DEFAULT_CHUNK_SIZE, validate=False, progress=None):
+    """Create or update ``model`` rows from ``entries`` keyed by ``name``.
+
+    Entries use the seed/export layout (:data:`hub.export.EXPORT_FIELDS`);
+    missing keys reset fields to their defaults, as the seed commands always
+    have. With ``validate`` each row is checked with the model's field and
+    ``clean()`` validation and invalid rows are skipped with an error.
+    ``progress(done, total)`` is called after every chunk.
+    """
+    fields = [name for name in EXPORT_FIELDS[model] if name != "name"]
+    report = BulkReport()
+    rows = {}
+    for index, entry in enumerate(entries, start=1):
+        name = (entry.get("name") or "").strip() if isinstance(entry, dict) else ""
+        if not name:
+            report.skipped += 1
+            report.errors.append(f"Row {index}: missing name.")
+            continue
+        if not slugify(name):
+            report.skipped += 1
+            report.errors.append(f"Row {index} ({name}): unable to derive a slug from the name.")
+            continue
+        try:
+            values = {key: _coerce(model, key, entry.get(key)) for key in fields}
+        except (ValidationError, ValueError) as exc:
+            report.skipped += 1
+            report.errors.append(f"Row {index} ({name}): {exc}")
+            continue
+        # A repeated name updates the same row; the last entry wins.
+        rows[name] = (index, name, values)
+
+    rows = list(rows.values())
+    started = time.perf_counter()
+    now = timezone.now()
+    with batch_changes(), transaction.atomic():
+        done = 0
+        for chunk in _chunks(rows, chunk_size):
+            existing = model.objects.in_bulk([name for _, name, _ in chunk], field_name="name")
+            to_create, to_update = [], []
+            for index, name, values in chunk:
+                obj = existing.get(name) or model(name=name)
+                for key, value in values.items():
+                    setattr(obj, key, value)
+                if validate:
+                    try:
+                        # The slug is allocated below, after validation.
+                        obj.clean_fields(exclude=["slug"])
+                        obj.clean()
+                    except ValidationError as exc:
+                        report.skipped += 1
+                        problems = "; ".join(
+                            f"{key}: {' '.join(messages)}" if key != "__all__" else " ".join(messages)
+                            for key, messages in exc.message_dict.items()
+                        )
+                        report.errors.append(f"Row {index} ({name}): {problems}")
+                        continue
+                obj.prepare_for_write()
+                obj.updated_at = now
+                (to_update if obj.pk else to_create).append(obj)
+
+            allocate_slugs(model, to_create)
+            model.objects.bulk_create(to_create)
+            model.objects.bulk_update(to_update, _written_fields(model, fields))
+            report.created += len(to_create)
+            report.updated += len(to_update)
+            log_changes(model, [obj.pk for obj in to_create], ChangeLogEntry.CREATED)
+            log_changes(model, [obj.pk for obj in to_update], ChangeLogEntry.UPDATED)
+            record(model, [obj.pk for obj in to_create + to_update])
+
+            done += len(chunk)
+            report.log_chunk(done, len(rows), started)
+            if progress:
+                progress(done, len(rows))
+    return report
+
+
+def bulk_apply(queryset, changes, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """Apply ``changes`` to every row of ``queryset`` in chunks.
+
+    ``changes`` maps field names to callables computing the new value from
+    the current one, e.g. ``{"role": lambda old: "Mentor"}``.
+    """
+    model = queryset.model
+    fields = list(changes)
+    # Every source prepare_for_write() reads, so it never loads deferred fields.
+    loaded = {"pk", "name", *fields, *model.FOLDED_FIELDS, *filter(None, [model.GEO_SOURCE])}
+    pks = list(queryset.order_by("pk").values_list("pk", flat=True))
+    report = BulkReport()
+    started = time.perf_counter()
+    now = timezone.now()
+    with batch_changes(), transaction.atomic():
+        for chunk in _chunks(pks, chunk_size):
+            objects = list(model.objects.filter(pk__in=chunk).only(*loaded))
+            for obj in objects:
+                for name, change in changes.items():
+                    setattr(obj, name, change(getattr(obj, name)))
+                obj.prepare_for_write()
+                obj.updated_at = now
+            model.objects.bulk_update(objects, _written_fields(model, fields))
+            report.updated += len(objects)
+            log_changes(model, [obj.pk for obj in objects], ChangeLogEntry.UPDATED)
+            record(model, chunk)
+            report.log_chunk(report.updated, len(pks), started)
+            if progress:
+                progress(report.updated, len(pks))
+    return report
+
+
+def parse_records(data, filename):
+    """Parse an uploaded ``.jsonl``, ``.json`` or ``.csv`` export into dicts.
+
+    Accepts exactly what ``dump_directory`` and the admin export actions
+    write; CSV cells holding lists or objects are JSON-encoded.
+    """
+    text = data.decode("utf-8-sig")
+    suffix = filename.rsplit(".", 1)[-1].lower()
+    if suffix == "jsonl":
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    if suffix == "json":
+        records = json.loads(text)
+        if not isinstance(records, list):
+            raise ValueError("Expected a JSON list of records.")
+        return records
+    if suffix == "csv":
+        return list(csv.DictReader(io.StringIO(text)))
+    raise ValueError("Unsupported file type; upload a .jsonl, .json or .csv file.")
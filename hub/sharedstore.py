@@ -0,0 +1,458 @@
+"""Read-mostly data shared by every worker on a host through one mmap'd file.
+
+Each worker would otherwise hold its own copy of the facet and count caches
+and refill it after every change. Instead, a single leader process (cron, a
+deploy hook) runs ``manage.py build_shared_store``, which writes a compact
+binary file to ``HUB_SHARED_STORE_PATH``. Every worker maps it read-only, so
+the operating system keeps a single copy in memory, and reads it through
+``memoryview`` slices without parsing it up front.
+
+Setting ``HUB_SHARED_STORE_REBUILD_DELAY`` instead makes every process that
+writes rows rebuild the store that many seconds after a change, from the
+index queue (:func:`apply`). Concurrent builds are safe: a build is stamped
+with the time it started reading, and only replaces the file if that is
+newer than the file's own stamp.
+
+The file is a header followed by named sections, each 8-byte aligned::
+
+    magic "HUBS" | format u16 | byte order u16 | version u64 | sections u32
+    per section: name length u16 | name | offset u64 | length u64
+
+Sections are string tables (``count u32 | offsets u32[count + 1] | UTF-8``)
+or arrays of unsigned ints; see :func:`pack_strings` and :func:`pack_ints`.
+A rebuild writes a new file beside the old one and renames it over it
+atomically, stamped with a higher version. Readers notice the new file
+within ``CHECK_INTERVAL`` seconds and map it; mappings of the old file stay
+valid until they are dropped.
+
+Per model, the store holds row primary keys, names and slugs in name order,
+the row count, the facet counts of :mod:`hub.facets`, and search postings:
+from each trigram of a row's folded search text (:func:`~hub.scoring.match_text`)
+to the rows containing it. A row whose text contains a query contains all of
+its trigrams, so the postings list a superset of the substring matches.
+:func:`candidate_q` turns that into a primary key filter for
+:func:`~hub.scoring.rank_queryset`, adding the rows the change log records
+as changed since the build, so a stale store narrows the scan but never
+drops a match.
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q
+
+from . import changelog
+from .models import ChangeLogEntry, Community, Person, School
+from .utils import fold_text
+
+try:
+    import fcntl
+except ImportError:  # Not on Windows; builds there are not serialized.
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"HUBS"
+FORMAT_VERSION = 1
+# Seconds between checks for a rebuilt file.
+CHECK_INTERVAL = 1.0
+MODELS = (Person, Community, School)
+DEFAULT_REBUILD_DELAY = None
+# Above this many candidate rows, searches scan the table instead: a long
+# primary key list costs more than it saves.
+MAX_CANDIDATES = 2000
+
+_HEADER = struct.Struct("<4sHHQI")
+_SECTION = struct.Struct("<QQ")
+_LITTLE_ENDIAN = 1
+
+
+class StoreError(ValueError):
+    """Raised for files that are not readable in the section layout."""
+
+
+def _pad(length):
+    return -length % 8
+
+
+def pack_ints(values, typecode="I"):
+    """Little-endian array of unsigned ints (``I``: 32-bit, ``Q``: 64-bit)."""
+    packed = array(typecode, values)
+    if sys.byteorder != "little":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def pack_strings(strings):
+    """String table: ``count u32 | offsets u32[count + 1] | UTF-8 blob``."""
+    encoded = [value.encode("utf-8") for value in strings]
+    offsets = [0]
+    for value in encoded:
+        offsets.append(offsets[-1] + len(value))
+    return struct.pack("<I", len(encoded)) + pack_ints(offsets) + b"".join(encoded)
+
+
+def ints(view, typecode="I"):
+    """Sequence over a :func:`pack_ints` buffer, without copying it where
+    the host is little-endian."""
+    if sys.byteorder == "little":
+        return view.cast(typecode)
+    unpacked = array(typecode, view)
+    unpacked.byteswap()
+    return unpacked
+
+
+class StringTable:
+    """Lazy view of a :func:`pack_strings` table: strings are decoded one
+    at a time, when accessed."""
+
+    def __init__(self, view):
+        count = struct.unpack_from("<I", view)[0]
+        self._offsets = ints(view[4:8 + 4 * count])
+        self._blob = view[8 + 4 * count:]
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if not -len(self) <= index < len(self):
+            raise IndexError("string table index out of range")
+        index %= len(self)
+        return str(self._blob[self._offsets[index]:self._offsets[index + 1]], "utf-8")
+
+    def __iter__(self):
+        return (self[index] for index in range(len(self)))
+
+
+def write_sections(path, sections, version, magic=MAGIC, format_version=FORMAT_VERSION):
+    """Write ``{name: bytes}`` sections to ``path``, atomically replacing it.
+
+    Other binary formats reuse this layout under their own ``magic``.
+    """
+    path = Path(path)
+    names = [name.encode("ascii") for name in sections]
+    table_size = _HEADER.size + sum(2 + len(name) + _SECTION.size for name in names)
+    offset = table_size + _pad(table_size)
+    header = [_HEADER.pack(magic, format_version, _LITTLE_ENDIAN, version, len(sections))]
+    body = []
+    for name, data in zip(names, sections.values()):
+        header += [struct.pack("<H", len(name)), name, _SECTION.pack(offset, len(data))]
+        body += [data, b"\0" * _pad(len(data))]
+        offset += len(data) + _pad(len(data))
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(b"".join(header) + b"\0" * _pad(table_size))
+            handle.writelines(body)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.chmod(temp_name, 0o644)  # mkstemp creates it private.
+        os.replace(temp_name, path)
+    except BaseException:
+        os.unlink(temp_name)
+        raise
+
+
+def read_sections(buffer, magic=MAGIC, format_version=FORMAT_VERSION):
+    """``(version, {name: memoryview})`` for the contents of a file written
+    by :func:`write_sections` with the same ``magic``."""
+    view = memoryview(buffer)
+    if len(view) < _HEADER.size:
+        raise StoreError("File too short for a header.")
+    found_magic, found_format, byte_order, version, count = _HEADER.unpack_from(view)
+    if found_magic != magic:
+        raise StoreError(f"Not a {magic.decode()} file.")
+    if found_format != format_version or byte_order != _LITTLE_ENDIAN:
+        raise StoreError(f"Unsupported {magic.decode()} format version {found_format}; rebuild the file.")
+    position, sections = _HEADER.size, {}
+    for _ in range(count):
+        (length,) = struct.unpack_from("<H", view, position)
+        name = bytes(view[position + 2:position + 2 + length]).decode("ascii")
+        offset, size = _SECTION.unpack_from(view, position + 2 + length)
+        sections[name] = view[offset:offset + size]
+        position += 2 + length + _SECTION.size
+    return version, sections
+
+
+class Snapshot:
+    """One mapped version of the store."""
+
+    def __init__(self, path):
+        with open(path, "rb") as handle:
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        self.version, self._sections = read_sections(self._map)
+
+    def count(self, model):
+        return ints(self._sections["counts"], "Q")[MODELS.index(model)]
+
+    @property
+    def seq(self):
+        """The last change log ``seq`` the build had seen before reading rows."""
+        return ints(self._sections["changes"], "Q")[0]
+
+    def rows(self, model):
+        """``(pks, names, slugs)`` in name order."""
+        label = model._meta.model_name
+        return (
+            ints(self._sections[f"{label}.pks"], "Q"),
+            StringTable(self._sections[f"{label}.names"]),
+            StringTable(self._sections[f"{label}.slugs"]),
+        )
+
+    def candidates(self, model, query):
+        """Primary keys of every row whose search text, as stored, contains
+        ``query`` (and possibly others), or ``None`` for queries shorter
+        than a trigram."""
+        grams = _grams(fold_text(query))
+        if not grams:
+            return None
+        label = model._meta.model_name
+        terms = StringTable(self._sections[f"{label}.terms"])
+        offsets = ints(self._sections[f"{label}.postings.offsets"])
+        postings = ints(self._sections[f"{label}.postings"])
+        lists = []
+        for gram in grams:
+            index = bisect.bisect_left(terms, gram)
+            if index == len(terms) or terms[index] != gram:
+                return set()
+            lists.append(postings[offsets[index]:offsets[index + 1]])
+        matched = None
+        # Rarest first, so the intersection shrinks as early as possible.
+        for rows in sorted(lists, key=len):
+            matched = set(rows) if matched is None else matched.intersection(rows)
+            if not matched:
+                return set()
+        pks = ints(self._sections[f"{label}.pks"], "Q")
+        return {pks[row] for row in matched}
+
+    def facet_counts(self, model, field):
+        """``[(value, row_count)]`` sorted by value, or ``None`` if not stored."""
+        label = model._meta.model_name
+        values = self._sections.get(f"{label}.{field}.values")
+        if values is None:
+            return None
+        return list(zip(StringTable(values), ints(self._sections[f"{label}.{field}.counts"])))
+
+
+class SharedStore:
+    """Process-wide handle on the store file at ``path``, remapped when a
+    rebuild replaces it."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._identity = None
+        self._checked = float("-inf")
+
+    def reload(self):
+        """Map the file now if it changed; return the current snapshot."""
+        with self._lock:
+            self._checked = time.monotonic()
+            try:
+                stat = self.path.stat()
+            except FileNotFoundError:
+                self._snapshot = self._identity = None
+                return None
+            identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            if identity != self._identity:
+                snapshot = Snapshot(self.path)
+                if self._snapshot is None or snapshot.version >= self._snapshot.version:
+                    self._snapshot, self._identity = snapshot, identity
+            return self._snapshot
+
+    def current(self):
+        """The latest snapshot, or ``None`` when there is no file yet."""
+        if time.monotonic() - self._checked >= CHECK_INTERVAL:
+            return self.reload()
+        return self._snapshot
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def store_path():
+    return getattr(settings, "HUB_SHARED_STORE_PATH", None)
+
+
+def shared_store():
+    """Current :class:`Snapshot` of the configured store, or ``None``."""
+    path = store_path()
+    if not path:
+        return None
+    with _stores_lock:
+        store = _stores.setdefault(str(path), SharedStore(path))
+    try:
+        return store.current()
+    except (OSError, ValueError):
+        return None
+
+
+def _grams(text):
+    """Every three-character substring of ``text``."""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def candidate_q(model, query):
+    """A primary key filter holding every row of ``model`` whose search
+    text contains ``query``, or ``None`` when the store cannot narrow it.
+
+    Rows the change log records as changed since the store was built are
+    always included, whatever the store says about them.
+    """
+    snapshot = shared_store()
+    if snapshot is None:
+        return None
+    pks = snapshot.candidates(model, query)
+    if pks is None or len(pks) > MAX_CANDIDATES:
+        return None
+    changed = ChangeLogEntry.objects.filter(seq__gt=snapshot.seq, model_name=model._meta.model_name)
+    pks.update(changed.values_list("object_id", flat=True)[:MAX_CANDIDATES])
+    if len(pks) > MAX_CANDIDATES:
+        return None
+    return Q(pk__in=pks)
+
+
+def _model_sections(model):
+    # Both read from this module.
+    from . import facets
+    from .scoring import field_weights, match_text
+
+    label = model._meta.model_name
+    columns = [model.FOLDED_FIELDS.get(field, field) for field in field_weights(model)]
+    rows = model.objects.order_by("name", "pk").only("name", "slug", *columns)
+    pks, names, slugs, postings = [], [], [], {}
+    for row, obj in enumerate(rows.iterator(chunk_size=2000)):
+        pks.append(obj.pk)
+        names.append(obj.name)
+        slugs.append(obj.slug)
+        for gram in _grams(match_text(obj)):
+            postings.setdefault(gram, []).append(row)
+    terms = sorted(postings)
+    offsets = [0]
+    for term in terms:
+        offsets.append(offsets[-1] + len(postings[term]))
+
+    sections = {
+        f"{label}.pks": pack_ints(pks, "Q"),
+        f"{label}.names": pack_strings(names),
+        f"{label}.slugs": pack_strings(slugs),
+        f"{label}.terms": pack_strings(terms),
+        f"{label}.postings.offsets": pack_ints(offsets),
+        f"{label}.postings": pack_ints(row for term in terms for row in postings[term]),
+    }
+    for field in facets.FACET_FIELDS.get(model, ()):
+        counts = facets._compute(model, field)
+        sections[f"{label}.{field}.values"] = pack_strings(str(value) for value, _ in counts)
+        sections[f"{label}.{field}.counts"] = pack_ints(count for _, count in counts)
+    return len(pks), sections
+
+
+def file_version(path):
+    """Version stamped in the store at ``path``, or 0 if it is missing or
+    unreadable."""
+    try:
+        with open(path, "rb") as handle:
+            magic, _, _, version, _ = _HEADER.unpack(handle.read(_HEADER.size))
+    except (OSError, struct.error):
+        return 0
+    return version if magic == MAGIC else 0
+
+
+@contextmanager
+def _build_lock(path):
+    """Exclusive lock on ``<path>.lock``, serializing the version check and
+    the file replacement of concurrent builds."""
+    lock_path = Path(f"{path}.lock")
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "a") as handle:  # Closing releases the lock.
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        yield
+
+
+def build(path=None):
+    """Write the store from the database; return the version now on disk.
+
+    The version is the clock when the build started reading. If another
+    build that started later has already written the file, this one is
+    dropped rather than replace newer data with older.
+    """
+    path = path or store_path()
+    version = time.time_ns()
+    seq = changelog.settled_seq()
+    counts, sections = [], {}
+    for model in MODELS:
+        count, model_sections = _model_sections(model)
+        counts.append(count)
+        sections.update(model_sections)
+    with _build_lock(path):
+        current = file_version(path)
+        if current >= version:
+            logger.info("Shared store build %d dropped; version %d is newer.", version, current)
+            version = current
+        else:
+            write_sections(
+                path, {"counts": pack_ints(counts, "Q"), "changes": pack_ints([seq], "Q"), **sections}, version
+            )
+    with _stores_lock:
+        store = _stores.get(str(path))
+    if store is not None:
+        store.reload()
+    return version
+
+
+def rebuild_delay():
+    return getattr(settings, "HUB_SHARED_STORE_REBUILD_DELAY", DEFAULT_REBUILD_DELAY)
+
+
+_rebuild_timer = None
+_rebuild_lock = threading.Lock()
+
+
+def _scheduled_build():
+    global _rebuild_timer
+    with _rebuild_lock:
+        _rebuild_timer = None
+    try:
+        build()
+    except Exception:
+        logger.exception("Shared store rebuild failed.")
+    finally:
+        connections.close_all()
+
+
+def schedule_build(delay=None):
+    """Build the store after ``delay`` seconds (default: the configured
+    delay) unless a build is already pending, which then covers this
+    change too."""
+    global _rebuild_timer
+    with _rebuild_lock:
+        if _rebuild_timer is not None:
+            return
+        _rebuild_timer = threading.Timer(rebuild_delay() if delay is None else delay, _scheduled_build)
+        _rebuild_timer.daemon = True
+        _rebuild_timer.start()
+
+
+def apply(batch):
+    """Index queue handler: schedule a rebuild after directory changes."""
+    if batch and store_path():
+        schedule_build()
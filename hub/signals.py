@@ -0,0 +1,43 @@
+"""Signal receivers keeping derived data in sync with directory rows.
+
+Row-level ``post_save``/``post_delete`` append to the change log (see
+:mod:`hub.changelog`) and :func:`~hub.batching.record` the change; the
+receivers of :data:`~hub.batching.objects_changed` then
+update derived data once per batch (see :mod:`hub.batching`).
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import facets
+from .batching import objects_changed, record
+from .changelog import log_changes
+from .indexing import index_queue
+from .models import ChangeLogEntry, Community, Person, School
+
+DIRECTORY_MODELS = (Person, Community, School)
+
+
+@receiver(post_save, sender=Person)
+@receiver(post_save, sender=Community)
+@receiver(post_save, sender=School)
+@receiver(post_delete, sender=Person)
+@receiver(post_delete, sender=Community)
+@receiver(post_delete, sender=School)
+def record_change(sender, instance, signal, created=False, **kwargs):
+    if signal is post_delete:
+        action = ChangeLogEntry.DELETED
+    else:
+        action = ChangeLogEntry.CREATED if created else ChangeLogEntry.UPDATED
+    log_changes(sender, [instance.pk], action)
+    record(sender, [instance.pk])
+
+
+@receiver(objects_changed)
+def queue_index_updates(sender, pks, **kwargs):
+    index_queue.put_pks(sender, pks)
+
+
+@receiver(objects_changed)
+def invalidate_facets(sender, **kwargs):
+    facets.invalidate(sender)
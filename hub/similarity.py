@@ -0,0 +1,301 @@
+"""Vector similarity behind "people like this" on person pages.
+
+Each person is encoded as a sparse feature vector: folded interests, role
+words and availability words, weighted per kind (:data:`FEATURE_WEIGHTS`)
+and by inverse document frequency, then L2-normalized so dot products are
+cosine similarities. :func:`rebuild` stores every person's ``top_k``
+nearest neighbours in :class:`~hub.models.SimilarPerson`, which the detail
+page reads with one indexed lookup.
+
+With numpy installed and a vocabulary small enough to hold densely
+(``DENSE_CELL_LIMIT``), neighbours come from a blocked matrix product:
+``BLOCK_SIZE`` rows at a time against the whole matrix, so memory stays
+at one ``BLOCK_SIZE x n`` block of scores. Otherwise sparse dot products
+are accumulated over an inverted index; both give the same results.
+
+:func:`refresh` recomputes only what a change can affect: the changed
+rows' own lists, the lists that held a changed row, and the lists a changed
+row now enters. It scores against :data:`vector_index`, every person's
+vector and the postings over them, loaded once per process and updated row
+by row. Changed rows are weighted with the current document frequencies;
+the other vectors keep theirs until the index is reloaded
+(``INDEX_MAX_AGE``, or after :func:`rebuild`). With
+``HUB_SIMILARITY_INCREMENTAL`` (the default) the :mod:`hub.indexing` queue
+calls :func:`apply`, so the work happens after the write, off the request. Seed
+commands reload rows in bulk and leave the lists to ``build_recommendations``.
+Rows that listed a since-deleted person keep a shorter list until the next
+rebuild.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.db import transaction
+
+from .models import Person, SimilarPerson
+from .utils import fold_text, optional_numpy
+
+FEATURE_WEIGHTS = {"interest": 1.0, "role": 0.6, "availability": 0.3}
+DEFAULT_TOP_K = 5
+DEFAULT_MIN_SCORE = 0.1
+BLOCK_SIZE = 512
+DENSE_CELL_LIMIT = 50_000_000
+# Seconds before the vector index is reloaded, picking up rows changed by
+# other processes and refreshing every weight.
+INDEX_MAX_AGE = 3600
+# person_id values per query when reading stored lists.
+QUERY_CHUNK_SIZE = 500
+
+_WORD_RE = re.compile(r"[a-z0-9+#]{3,}")
+
+
+def raw_features(interests, role, availability):
+    """``{feature: weight}`` before IDF weighting and normalization."""
+    features = {}
+    for tag in interests or ():
+        tag = fold_text(tag)
+        if tag:
+            features[f"i:{tag}"] = FEATURE_WEIGHTS["interest"]
+    for word in _WORD_RE.findall(fold_text(role)):
+        features[f"r:{word}"] = FEATURE_WEIGHTS["role"]
+    for word in _WORD_RE.findall(fold_text(availability)):
+        features[f"a:{word}"] = FEATURE_WEIGHTS["availability"]
+    return features
+
+
+def _weigh(features, df, total):
+    weighted = {f: w * math.log(1 + total / df[f]) for f, w in features.items()}
+    norm = math.sqrt(sum(w * w for w in weighted.values()))
+    return {f: w / norm for f, w in weighted.items()} if norm else {}
+
+
+def encode(rows):
+    """Return ``{pk: {feature: weight}}`` unit vectors for ``(pk, interests,
+    role, availability)`` rows."""
+    raw = {pk: raw_features(interests, role, availability) for pk, interests, role, availability in rows}
+    df = Counter(feature for features in raw.values() for feature in features)
+    return {pk: _weigh(features, df, len(raw)) for pk, features in raw.items()}
+
+
+def load_vectors():
+    rows = Person.objects.order_by().values_list("pk", "interests", "role", "availability")
+    return encode(rows.iterator(chunk_size=2000))
+
+
+def _best(scores, top_k, min_score):
+    """``[(pk, score)]`` for the ``top_k`` best of ``(pk, score)`` pairs."""
+    best = heapq.nsmallest(top_k, ((-score, pk) for pk, score in scores if score >= min_score))
+    return [(pk, -negative) for negative, pk in best]
+
+
+def _postings(vectors):
+    postings = defaultdict(dict)
+    for pk, vector in vectors.items():
+        for feature, weight in vector.items():
+            postings[feature][pk] = weight
+    return postings
+
+
+def _scores(vectors, postings, pk):
+    """Cosine similarity of ``pk`` with every row sharing a feature."""
+    scores = defaultdict(float)
+    for feature, weight in vectors[pk].items():
+        for other, other_weight in postings[feature].items():
+            if other != pk:
+                scores[other] += weight * other_weight
+    return scores
+
+
+def _sparse_neighbors(vectors, query_pks, top_k, min_score):
+    postings = _postings(vectors)
+    return {pk: _best(_scores(vectors, postings, pk).items(), top_k, min_score) for pk in query_pks}
+
+
+def _dense_neighbors(numpy, vectors, query_pks, top_k, min_score):
+    pks = list(vectors)
+    position = {pk: index for index, pk in enumerate(pks)}
+    vocabulary = {f: index for index, f in enumerate({f for vector in vectors.values() for f in vector})}
+    matrix = numpy.zeros((len(pks), len(vocabulary)), dtype=numpy.float32)
+    for row, pk in enumerate(pks):
+        for feature, weight in vectors[pk].items():
+            matrix[row, vocabulary[feature]] = weight
+    ids = numpy.asarray(pks)
+    k = min(top_k, len(pks) - 1)
+    result = {}
+    query_pks = list(query_pks)
+    for start in range(0, len(query_pks), BLOCK_SIZE):
+        block = query_pks[start:start + BLOCK_SIZE]
+        rows = numpy.asarray([position[pk] for pk in block])
+        scores = matrix[rows] @ matrix.T
+        scores[numpy.arange(len(block)), rows] = -1.0  # Never recommend oneself.
+        if k <= 0:
+            result.update((pk, []) for pk in block)
+            continue
+        top = numpy.argpartition(-scores, k - 1, axis=1)[:, :k]
+        for offset, pk in enumerate(block):
+            candidates = zip(ids[top[offset]].tolist(), scores[offset, top[offset]].tolist())
+            result[pk] = _best(candidates, top_k, min_score)
+    return result
+
+
+def neighbors(vectors, query_pks=None, top_k=DEFAULT_TOP_K, min_score=DEFAULT_MIN_SCORE):
+    """``{pk: [(neighbor_pk, score), ...]}`` for ``query_pks`` (default: all)."""
+    query_pks = list(vectors) if query_pks is None else [pk for pk in query_pks if pk in vectors]
+    vocabulary_size = len({f for vector in vectors.values() for f in vector})
+    numpy = optional_numpy()
+    if numpy is not None and len(vectors) * vocabulary_size <= DENSE_CELL_LIMIT:
+        return _dense_neighbors(numpy, vectors, query_pks, top_k, min_score)
+    return _sparse_neighbors(vectors, query_pks, top_k, min_score)
+
+
+def _store(lists, replace_all=False):
+    rows = [
+        SimilarPerson(person_id=pk, similar_id=other, score=score, rank=rank)
+        for pk, ranked in lists.items()
+        for rank, (other, score) in enumerate(ranked, start=1)
+    ]
+    with transaction.atomic():
+        stale = SimilarPerson.objects.all()
+        if not replace_all:
+            stale = stale.filter(person_id__in=list(lists))
+        stale.delete()
+        SimilarPerson.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def rebuild(top_k=DEFAULT_TOP_K, min_score=DEFAULT_MIN_SCORE):
+    """Recompute every person's neighbours; return the rows stored."""
+    stored = _store(neighbors(load_vectors(), top_k=top_k, min_score=min_score), replace_all=True)
+    vector_index.reset()
+    return stored
+
+
+class VectorIndex:
+    """Every person's vector and the postings over them, kept current row by
+    row between reloads."""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self._loaded_at = None
+
+    def reset(self):
+        """Forget everything; the next use reloads from the database."""
+        with self.lock:
+            self._loaded_at = None
+
+    def _load(self):
+        rows = Person.objects.order_by().values_list("pk", "interests", "role", "availability")
+        self.raw = {pk: raw_features(*values) for pk, *values in rows.iterator(chunk_size=2000)}
+        self.df = Counter(feature for features in self.raw.values() for feature in features)
+        self.vectors = {pk: _weigh(features, self.df, len(self.raw)) for pk, features in self.raw.items()}
+        self.postings = _postings(self.vectors)
+        self._loaded_at = time.monotonic()
+
+    def ensure_loaded(self):
+        with self.lock:
+            if self._loaded_at is None or time.monotonic() - self._loaded_at > INDEX_MAX_AGE:
+                self._load()
+
+    def update(self, pk, document):
+        """Replace row ``pk`` with ``document`` (``interests``, ``role`` and
+        ``availability``), or remove it when ``document`` is ``None``."""
+        for feature in self.raw.pop(pk, ()):
+            self.df[feature] -= 1
+        for feature in self.vectors.pop(pk, ()):
+            del self.postings[feature][pk]
+        if document is None:
+            return
+        self.raw[pk] = features = raw_features(document["interests"], document["role"], document["availability"])
+        self.df.update(features)
+        self.vectors[pk] = vector = _weigh(features, self.df, len(self.raw))
+        for feature, weight in vector.items():
+            self.postings[feature][pk] = weight
+
+    def scores(self, pk):
+        return _scores(self.vectors, self.postings, pk)
+
+
+vector_index = VectorIndex()
+
+
+def _chunks(items, size=QUERY_CHUNK_SIZE):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def refresh_documents(documents, top_k=DEFAULT_TOP_K, min_score=DEFAULT_MIN_SCORE):
+    """Update stored neighbours after people changed; ``documents`` maps
+    their pks to their new ``interests``/``role``/``availability``, or to
+    ``None`` once deleted. Returns the rows stored."""
+    index = vector_index
+    index.ensure_loaded()
+    with index.lock:
+        for pk, document in documents.items():
+            index.update(pk, document)
+        changed = [pk for pk, document in documents.items() if document is not None]
+        lists, entering = {}, defaultdict(list)
+        for pk in changed:
+            scores = index.scores(pk)
+            lists[pk] = _best(scores.items(), top_k, min_score)
+            for other, score in scores.items():
+                if score >= min_score and other not in documents:
+                    entering[other].append((pk, score))
+
+    # Lists holding a changed row may lose it to anyone: recompute those.
+    holders = set()
+    for chunk in _chunks(documents):
+        holders.update(SimilarPerson.objects.filter(similar_id__in=chunk).values_list("person_id", flat=True))
+    holders -= documents.keys()
+    with index.lock:
+        lists.update((pk, _best(index.scores(pk).items(), top_k, min_score)) for pk in holders if pk in index.vectors)
+
+    # Anyone else gains a changed row that beats their last stored match.
+    floors = {}
+    candidates = [pk for pk in entering if pk not in holders]
+    for chunk in _chunks(candidates):
+        floors.update(SimilarPerson.objects.filter(person_id__in=chunk, rank=top_k).values_list("person_id", "score"))
+    # A list without a top_k-th match takes anything above min_score.
+    gaining = [pk for pk in candidates if pk not in floors or max(s for _, s in entering[pk]) > floors[pk]]
+    current = defaultdict(list)
+    for chunk in _chunks(gaining):
+        rows = SimilarPerson.objects.filter(person_id__in=chunk).order_by("person_id", "rank")
+        for person_id, similar_id, score in rows.values_list("person_id", "similar_id", "score"):
+            current[person_id].append((similar_id, score))
+    for pk in gaining:
+        lists[pk] = _best(current[pk] + entering[pk], top_k, min_score)
+    return _store(lists)
+
+
+def refresh(pks, top_k=DEFAULT_TOP_K, min_score=DEFAULT_MIN_SCORE):
+    """Update stored neighbours after the people ``pks`` changed."""
+    rows = Person.objects.filter(pk__in=list(pks)).values("pk", "interests", "role", "availability")
+    documents = dict.fromkeys(pks)
+    documents.update((row.pop("pk"), row) for row in rows)
+    return refresh_documents(documents, top_k, min_score)
+
+
+def apply(batch):
+    """Index queue handler: refresh the lists around people in ``batch``.
+
+    Bulk reloads (seed commands) only reset the vector index; their lists
+    are rebuilt by ``build_recommendations``.
+    """
+    label = Person._meta.label_lower
+    documents = {}
+    for update in batch:
+        if update.label != label:
+            continue
+        if update.pk is None or update.reload:
+            vector_index.reset()
+            documents.clear()
+        else:
+            documents[update.pk] = update.document
+    if documents:
+        refresh_documents(documents)
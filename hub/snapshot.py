@@ -0,0 +1,200 @@
+"""Compact binary snapshots of the whole directory.
+
+A snapshot holds every person, community and school in the seed/export
+layout (:data:`hub.export.EXPORT_FIELDS`, plus slugs when taken from the
+database). It is much smaller than the equivalent JSON and opens without
+parsing: the file is memory-mapped and a record's fields are decoded only
+when that record is read. It can be seeded from (``manage.py
+seed_snapshot``) or kept open as an in-process read model.
+
+The file uses the section layout of :mod:`hub.sharedstore` under its own
+magic and format version:
+
+* ``schema``: JSON ``{"models": {label: {"rows": n, "columns": [[field,
+  kind], ...]}}}``;
+* ``strings``: every distinct string value, stored once;
+* one or two sections per column, one entry per row, rows in name order:
+
+  ``str``   ``u32`` string ids (``NULL_ID`` for ``None``);
+  ``strs``  lists of strings: ``u32`` offsets (``rows + 1``) into ``u32``
+            string ids;
+  ``json``  ``u32`` ids of JSON-encoded values (dicts such as ``links``);
+  ``int``   ``i64`` values plus a ``u8`` null mask.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import mmap
+import time
+
+from .export import EXPORT_FIELDS
+from .models import Community, Person, School
+from .sharedstore import StringTable, ints, pack_ints, pack_strings, read_sections, write_sections
+
+MAGIC = b"HUBD"
+FORMAT_VERSION = 1
+NULL_ID = 0xFFFFFFFF
+MODELS = (Person, Community, School)
+
+
+def column_kind(model, field):
+    model_field = model._meta.get_field(field)
+    internal = model_field.get_internal_type()
+    if internal == "JSONField":
+        return "strs" if isinstance(model_field.get_default(), list) else "json"
+    if internal.endswith("IntegerField"):
+        return "int"
+    return "str"
+
+
+class _Interner:
+    def __init__(self):
+        self.ids = {}
+
+    def __call__(self, value):
+        if value is None:
+            return NULL_ID
+        return self.ids.setdefault(str(value), len(self.ids))
+
+
+def _encode_column(name, kind, values, intern):
+    if kind == "str":
+        return {name: pack_ints(intern(value) for value in values)}
+    if kind == "json":
+        return {name: pack_ints(
+            intern(None if value is None else json.dumps(value, ensure_ascii=False, sort_keys=True))
+            for value in values
+        )}
+    if kind == "int":
+        return {
+            name: pack_ints((value or 0 for value in values), "q"),
+            f"{name}.nulls": pack_ints((value is None for value in values), "B"),
+        }
+    offsets, ids = [0], []
+    for value in values:
+        ids.extend(intern(item) for item in value or ())
+        offsets.append(len(ids))
+    return {f"{name}.offsets": pack_ints(offsets), name: pack_ints(ids)}
+
+
+def write_snapshot(path, tables):
+    """Write ``{model: (fields, rows)}`` to ``path``; return the version.
+
+    ``rows`` are dictionaries with (at least) ``fields``, which must include
+    ``name``; missing keys are stored as ``None``.
+    """
+    intern = _Interner()
+    schema, sections = {"models": {}}, {}
+    for model, (fields, rows) in tables.items():
+        label = model._meta.model_name
+        rows = sorted(rows, key=lambda row: row["name"])
+        columns = []
+        for field in fields:
+            kind = column_kind(model, field)
+            sections.update(_encode_column(f"{label}.{field}", kind, [row.get(field) for row in rows], intern))
+            columns.append([field, kind])
+        schema["models"][label] = {"rows": len(rows), "columns": columns}
+    version = time.time_ns()
+    write_sections(
+        path,
+        {"schema": json.dumps(schema).encode(), "strings": pack_strings(intern.ids), **sections},
+        version,
+        magic=MAGIC,
+        format_version=FORMAT_VERSION,
+    )
+    return version
+
+
+def database_tables(models=MODELS):
+    """``write_snapshot`` input for the current database contents."""
+    tables = {}
+    for model in models:
+        fields = ("slug", *EXPORT_FIELDS[model])
+        tables[model] = (fields, model.objects.order_by().values(*fields).iterator(chunk_size=2000))
+    return tables
+
+
+class Column:
+    """Lazy sequence over one column; values are decoded when indexed."""
+
+    def __init__(self, sections, name, kind, strings):
+        self.kind = kind
+        self._strings = strings
+        self._values = ints(sections[name], "q" if kind == "int" else "I")
+        if kind == "int":
+            self._nulls = ints(sections[f"{name}.nulls"], "B")
+        elif kind == "strs":
+            self._offsets = ints(sections[f"{name}.offsets"])
+
+    def __len__(self):
+        return len(self._offsets) - 1 if self.kind == "strs" else len(self._values)
+
+    def __getitem__(self, index):
+        if self.kind == "strs":
+            return [self._strings[i] for i in self._values[self._offsets[index]:self._offsets[index + 1]]]
+        if self.kind == "int":
+            return None if self._nulls[index] else self._values[index]
+        string_id = self._values[index]
+        if string_id == NULL_ID:
+            return None
+        value = self._strings[string_id]
+        return json.loads(value) if self.kind == "json" else value
+
+
+class Table:
+    """Rows of one model. Indexing decodes just that row into a dict."""
+
+    def __init__(self, sections, label, info, strings):
+        self.fields = [field for field, _ in info["columns"]]
+        self._rows = info["rows"]
+        self.columns = {
+            field: Column(sections, f"{label}.{field}", kind, strings) for field, kind in info["columns"]
+        }
+
+    def __len__(self):
+        return self._rows
+
+    def __getitem__(self, index):
+        if not -self._rows <= index < self._rows:
+            raise IndexError("snapshot row index out of range")
+        index %= self._rows
+        return {field: column[index] for field, column in self.columns.items()}
+
+    def __iter__(self):
+        return (self[index] for index in range(self._rows))
+
+    def get(self, name):
+        """The row named ``name``, or ``None``; a binary search on names."""
+        names = self.columns["name"]
+        index = bisect.bisect_left(names, name)
+        return self[index] if index < self._rows and names[index] == name else None
+
+
+class DirectorySnapshot:
+    """A snapshot file (or buffer) opened for lazy reading."""
+
+    def __init__(self, buffer):
+        self._buffer = buffer
+        self.version, self._sections = read_sections(buffer, magic=MAGIC, format_version=FORMAT_VERSION)
+        self.schema = json.loads(bytes(self._sections["schema"]))
+        self._strings = StringTable(self._sections["strings"])
+        self._tables = {}
+
+    @classmethod
+    def open(cls, path):
+        with open(path, "rb") as handle:
+            return cls(mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ))
+
+    @property
+    def models(self):
+        return [model for model in MODELS if model._meta.model_name in self.schema["models"]]
+
+    def table(self, model):
+        label = model._meta.model_name
+        if label not in self._tables:
+            if label not in self.schema["models"]:
+                raise KeyError(f"No {model._meta.verbose_name_plural} in this snapshot.")
+            self._tables[label] = Table(self._sections, label, self.schema["models"][label], self._strings)
+        return self._tables[label]
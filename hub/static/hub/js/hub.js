@@ -0,0 +1,224 @@
+// Live search functionality
+function escapeHtml(text) {
+  return String(text)
+    .replace(/&/g, '&amp;')
+    .replace(/</g, '&lt;')
+    .replace(/>/g, '&gt;')
+    .replace(/"/g, '&quot;')
+    .replace(/'/g, '&#39;');
+}
+
+function highlightTerm(text, term) {
+  if (!term) return text;
+  const re = new RegExp(`(${term.replace(/[.*+?^${}()|[\]\\]/g, '\\$&')})`, 'ig');
+  return text.replace(re, '<mark class="bg-yellow-300/40 text-yellow-900">$1</mark>');
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+  const searchForms = document.querySelectorAll('form[data-live-search]');
+  
+  searchForms.forEach(form => {
+    const searchInput = form.querySelector('input[name="search"]');
+    const selectInputs = form.querySelectorAll('select');
+    let searchTimeout;
+    
+    function performSearch() {
+      clearTimeout(searchTimeout);
+      searchTimeout = setTimeout(() => {
+        form.submit();
+      }, 500); // Debounce search by 500ms
+    }
+    
+    if (searchInput) {
+      searchInput.addEventListener('input', performSearch);
+    }
+    
+    selectInputs.forEach(select => {
+      select.addEventListener('change', () => {
+        form.submit();
+      });
+    });
+  });
+
+  // Global search functionality
+  const globalSearchInput = document.getElementById('global-search');
+  const searchResults = document.getElementById('search-results');
+  const searchLoading = document.getElementById('search-loading');
+  const searchContent = document.getElementById('search-content');
+  const SECTIONS = ['people', 'communities', 'schools'];
+  const CACHE_SIZE = 50;
+  const DEBOUNCE_MS = 250;
+  // Query -> response, least recently used first.
+  const searchCache = new Map();
+  let globalSearchTimeout;
+  let inFlight = null;
+
+  function cacheGet(key) {
+    const data = searchCache.get(key);
+    if (data !== undefined) {
+      searchCache.delete(key);
+      searchCache.set(key, data);
+    }
+    return data;
+  }
+
+  function cacheSet(key, data) {
+    searchCache.delete(key);
+    searchCache.set(key, data);
+    if (searchCache.size > CACHE_SIZE) {
+      searchCache.delete(searchCache.keys().next().value);
+    }
+  }
+
+  // Approximates hub.utils.fold_text: strip accents, lowercase, collapse spaces.
+  function fold(text) {
+    return text.normalize('NFKD').replace(/[\u0300-\u036f]/g, '').toLowerCase().replace(/\s+/g, ' ').trim();
+  }
+
+  // A complete response for a prefix of `key` already holds every match for
+  // `key`; filter it locally. Returns null when the server must be asked.
+  function narrowFromCache(key) {
+    for (let length = key.length - 1; length >= 2; length--) {
+      const data = searchCache.get(key.slice(0, length));
+      if (!data || !data.complete) continue;
+      const narrowed = { complete: true };
+      let found = 0;
+      SECTIONS.forEach(section => {
+        narrowed[section] = data[section].filter(item => item.match.includes(key));
+        found += narrowed[section].length;
+      });
+      // Nothing left locally: let the server have the final word.
+      return found ? narrowed : null;
+    }
+    return null;
+  }
+
+  function renderResults(data, query) {
+    searchLoading.classList.add('hidden');
+
+    let html = '';
+
+    if (data.people.length > 0) {
+      html += '<div class="p-2"><h3 class="text-xs font-semibold text-slate-400 uppercase tracking-wide mb-2">People</h3>';
+      data.people.forEach(person => {
+        const name = escapeHtml(person.name);
+        html += `
+          <a href="${escapeHtml(person.url)}" class="flex items-center gap-3 p-2 hover:bg-slate-700 rounded-lg">
+            ${person.avatar ? `<img src="${escapeHtml(person.avatar)}" alt="${name}" class="w-8 h-8 rounded-full object-cover">` : `<div class="w-8 h-8 rounded-full bg-sky-500/20 flex items-center justify-center text-sm font-bold text-sky-200">${name[0]}</div>`}
+            <div>
+              <div class="text-white font-medium">${highlightTerm(name, query)}</div>
+              <div class="text-sm text-slate-400">${highlightTerm(escapeHtml(person.role), query)}</div>
+            </div>
+          </a>
+        `;
+      });
+      html += '</div>';
+    }
+
+    if (data.communities.length > 0) {
+      html += '<div class="p-2"><h3 class="text-xs font-semibold text-slate-400 uppercase tracking-wide mb-2">Communities</h3>';
+      data.communities.forEach(community => {
+        const name = escapeHtml(community.name);
+        html += `
+          <a href="${escapeHtml(community.url)}" class="flex items-center gap-3 p-2 hover:bg-slate-700 rounded-lg">
+            ${community.logo ? `<img src="${escapeHtml(community.logo)}" alt="${name}" class="w-8 h-8 rounded-lg object-cover">` : `<div class="w-8 h-8 rounded-lg bg-purple-500/20 flex items-center justify-center text-sm font-bold text-purple-200">${name[0]}</div>`}
+            <div>
+              <div class="text-white font-medium">${highlightTerm(name, query)}</div>
+              <div class="text-sm text-slate-400">${highlightTerm(escapeHtml(community.location || ''), query)}</div>
+            </div>
+          </a>
+        `;
+      });
+      html += '</div>';
+    }
+
+    if (data.schools.length > 0) {
+      html += '<div class="p-2"><h3 class="text-xs font-semibold text-slate-400 uppercase tracking-wide mb-2">Schools</h3>';
+      data.schools.forEach(school => {
+        const name = escapeHtml(school.name);
+        html += `
+          <a href="${escapeHtml(school.url)}" class="flex items-center gap-3 p-2 hover:bg-slate-700 rounded-lg">
+            <div class="w-8 h-8 rounded-lg bg-teal-500/20 flex items-center justify-center text-sm font-bold text-teal-200">${name[0]}</div>
+            <div>
+              <div class="text-white font-medium">${highlightTerm(name, query)}</div>
+              <div class="text-sm text-slate-400">${highlightTerm(escapeHtml(school.city || ''), query)}</div>
+            </div>
+          </a>
+        `;
+      });
+      html += '</div>';
+    }
+
+    if (html === '') {
+      html = '<div class="p-4 text-center text-slate-400">No results found</div>';
+    }
+
+    searchContent.innerHTML = html;
+    // Re-apply highlight for dynamic HTML
+    const marks = searchContent.querySelectorAll('mark');
+    marks.forEach(m => m.classList.add('rounded', 'px-1'));
+  }
+
+  function fetchResults(key, query) {
+    if (inFlight) inFlight.abort();
+    const controller = new AbortController();
+    inFlight = controller;
+
+    fetch(`${globalSearchInput.dataset.searchUrl}?q=${encodeURIComponent(key)}`, { signal: controller.signal })
+      .then(response => {
+        if (!response.ok) throw new Error(`HTTP ${response.status}`);
+        return response.json();
+      })
+      .then(data => {
+        cacheSet(key, data);
+        if (fold(globalSearchInput.value) === key) renderResults(data, query);
+      })
+      .catch(error => {
+        if (error.name === 'AbortError') return;
+        searchLoading.classList.add('hidden');
+        searchContent.innerHTML = '<div class="p-4 text-center text-red-400">Error loading results</div>';
+      })
+      .finally(() => {
+        if (inFlight === controller) inFlight = null;
+      });
+  }
+
+  if (globalSearchInput) {
+    globalSearchInput.addEventListener('input', function() {
+      const query = this.value.trim();
+      // Normalized so "Yaoundé", "yaounde " and "YAOUNDE" share one cache
+      // entry, in memory and in the browser's HTTP cache.
+      const key = fold(query);
+
+      clearTimeout(globalSearchTimeout);
+
+      if (key.length < 2) {
+        if (inFlight) inFlight.abort();
+        searchResults.classList.add('hidden');
+        return;
+      }
+
+      searchResults.classList.remove('hidden');
+
+      const cached = cacheGet(key) || narrowFromCache(key);
+      if (cached) {
+        if (inFlight) inFlight.abort();
+        cacheSet(key, cached);
+        renderResults(cached, query);
+        return;
+      }
+
+      // Show loading
+      searchLoading.classList.remove('hidden');
+      searchContent.innerHTML = '';
+      globalSearchTimeout = setTimeout(() => fetchResults(key, query), DEBOUNCE_MS);
+    });
+
+    // Hide search results when clicking outside
+    document.addEventListener('click', function(e) {
+      if (!globalSearchInput.contains(e.target) && !searchResults.contains(e.target)) {
+        searchResults.classList.add('hidden');
+      }
+    });
+  }
+});
@@ -0,0 +1,226 @@
+"""Render the directory to a tree of static HTML files.
+
+The build is planned in the parent process: every page gets a *stamp*
+derived from the rows it displays (``updated_at`` values, counts, facet
+values, and on detail pages the related rows with their names and slugs)
+plus a digest of the templates. Pages whose stamp matches the
+manifest from the previous build are skipped; the rest are rendered,
+optionally in a process pool, straight to disk.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+import shutil
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.db import connections
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+
+from .middleware import minify_html
+from .models import Affiliation, Community, Membership, Person, RelatedCommunity, School, SimilarPerson
+from .templating import TEMPLATE_DIR, hub_template_names
+from .utils import setup_worker
+from .views import PAGE_SIZE
+
+MANIFEST_NAME = ".static-manifest.json"
+
+LISTINGS = (
+    (Person, "hub:people", ("role", "interests")),
+    (Community, "hub:communities", ("location",)),
+    (School, "hub:schools", ("city",)),
+)
+
+# Related rows each detail page renders: (model, owner field, shown values).
+DETAIL_RELATIONS = {
+    Person: (
+        (Membership, "person", ("community__name", "community__slug", "role")),
+        (Affiliation, "person", ("school__name", "school__slug", "kind")),
+        (SimilarPerson, "person", ("rank", "similar__name", "similar__slug")),
+    ),
+    Community: (
+        (Membership, "community", ("person__name", "person__slug", "role")),
+        (RelatedCommunity, "community", ("rank", "related__name", "related__slug")),
+    ),
+    School: (
+        (Affiliation, "school", ("person__name", "person__slug", "kind")),
+    ),
+}
+
+
+@dataclass
+class Page:
+    path: str
+    output: str
+    query: dict = field(default_factory=dict)
+    stamp: str = ""
+
+
+@dataclass
+class BuildResult:
+    rendered: list
+    skipped: int
+    removed: list
+
+
+def _digest(*parts):
+    sha = hashlib.sha1()
+    for part in parts:
+        sha.update(str(part).encode("utf-8"))
+        sha.update(b"\x1f")
+    return sha.hexdigest()
+
+
+def templates_digest():
+    """Fingerprint of every hub template, so template edits rebuild all pages."""
+    return _digest(*((name, (TEMPLATE_DIR / name).read_bytes()) for name in hub_template_names()))
+
+
+def _output_for(path):
+    return f"{path.strip('/')}/index.html".lstrip("/")
+
+
+def _facet_digest(model, facet_fields):
+    values = set()
+    for row in model.objects.values_list(*facet_fields).iterator():
+        for value in row:
+            if isinstance(value, list):
+                values.update(value)
+            elif value:
+                values.add(value)
+    return _digest(*sorted(values))
+
+
+def _related_rows(model):
+    """``{pk: sorted related rows}`` as the detail pages of ``model`` show them."""
+    related = defaultdict(list)
+    for relation, owner, values in DETAIL_RELATIONS[model]:
+        label = relation._meta.model_name
+        rows = relation.objects.order_by().values_list(f"{owner}_id", *values)
+        for pk, *shown in rows.iterator(chunk_size=2000):
+            related[pk].append((label, *shown))
+    return {pk: sorted(rows) for pk, rows in related.items()}
+
+
+def plan_pages():
+    """Return every page of the site with its freshness stamp."""
+    base = templates_digest()
+    pages = []
+
+    home_rows = [
+        list(Person.objects.order_by("-created_at").values_list("pk", "updated_at")[:3]),
+        list(Community.objects.order_by("-created_at").values_list("pk", "updated_at")[:3]),
+        Person.objects.count(),
+        Community.objects.count(),
+        School.objects.count(),
+    ]
+    home = reverse("hub:home")
+    pages.append(Page(home, _output_for(home), stamp=_digest(base, *home_rows)))
+
+    for model, url_name, facet_fields in LISTINGS:
+        list_path = reverse(url_name)
+        facets = _facet_digest(model, facet_fields)
+        rows = list(model.objects.order_by("name").values_list("pk", "slug", "updated_at"))
+        num_pages = max(1, math.ceil(len(rows) / PAGE_SIZE))
+
+        for number in range(1, num_pages + 1):
+            chunk = rows[(number - 1) * PAGE_SIZE:number * PAGE_SIZE]
+            path = list_path if number == 1 else f"{list_path}page/{number}/"
+            stamp = _digest(base, facets, num_pages, *((pk, ts) for pk, _, ts in chunk))
+            pages.append(Page(list_path, _output_for(path), {"page": number}, stamp))
+
+        related = _related_rows(model)
+        for pk, slug, updated_at in rows:
+            path = model(pk=pk, slug=slug).get_absolute_url()
+            pages.append(Page(path, _output_for(path), stamp=_digest(base, updated_at, *related.get(pk, ()))))
+
+    return pages
+
+
+def render_page(page, output_dir):
+    """Render ``page`` through its view and write it below ``output_dir``."""
+    request = RequestFactory().get(page.path, page.query)
+    request.static_site = True
+    match = resolve(page.path)
+    request.resolver_match = match
+    response = match.func(request, *match.args, **match.kwargs)
+    content = response.content.decode(response.charset)
+    if getattr(settings, "HUB_MINIFY_HTML", False):
+        content = minify_html(content)
+
+    target = Path(output_dir) / page.output
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_suffix(".html.tmp")
+    tmp.write_text(content, encoding="utf-8")
+    os.replace(tmp, target)
+    return page.output
+
+
+def _render_in_worker(args):
+    page, output_dir = args
+    return render_page(page, output_dir)
+
+
+def read_manifest(output_dir):
+    try:
+        return json.loads((Path(output_dir) / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def copy_static(output_dir):
+    """Copy every file the staticfiles finders know about into ``static/``."""
+    root = Path(output_dir) / settings.STATIC_URL.strip("/")
+    for finder in finders.get_finders():
+        for path, storage in finder.list(["CVS", ".*", "*~"]):
+            target = root / path
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with storage.open(path) as source, target.open("wb") as handle:
+                shutil.copyfileobj(source, handle)
+
+
+def build_site(output_dir, workers=1, force=False):
+    """Build or incrementally refresh the static site in ``output_dir``."""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    previous = {} if force else read_manifest(output_dir)
+
+    pages = plan_pages()
+    stale = [
+        page for page in pages
+        if previous.get(page.output) != page.stamp or not (output_dir / page.output).exists()
+    ]
+
+    if workers > 1 and len(stale) > 1:
+        connections.close_all()
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=setup_worker, initargs=(settings.SETTINGS_MODULE,)
+        ) as pool:
+            rendered = list(pool.map(
+                _render_in_worker, ((page, output_dir) for page in stale), chunksize=8
+            ))
+    else:
+        rendered = [render_page(page, output_dir) for page in stale]
+
+    current = {page.output: page.stamp for page in pages}
+    removed = sorted(set(previous) - set(current))
+    for output in removed:
+        target = output_dir / output
+        target.unlink(missing_ok=True)
+        # Drop now-empty slug directories.
+        for parent in target.parents:
+            if parent == output_dir or any(parent.iterdir()):
+                break
+            parent.rmdir()
+
+    (output_dir / MANIFEST_NAME).write_text(json.dumps(current, indent=0, sort_keys=True), encoding="utf-8")
+    return BuildResult(rendered=rendered, skipped=len(pages) - len(stale), removed=removed)
@@ -0,0 +1,18 @@
+"""Template helpers for hub pages."""
+
+from django import template
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def page_url(context, number):
+    """Link to page ``number`` of the current listing.
+
+    Pages rendered by ``build_static_site`` link to ``<list>/page/<n>/``
+    files instead of query strings a plain file server cannot route.
+    """
+    request = context.get("request")
+    if request is not None and getattr(request, "static_site", False):
+        return request.path if number == 1 else f"{request.path}page/{number}/"
+    return f"?page={number}"
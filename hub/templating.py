@@ -0,0 +1,41 @@
+"""Template helpers: precompilation and timed rendering."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from django.http import HttpResponse
+from django.template import engines
+from django.template.loader import get_template
+
+from .instrumentation import metrics
+
+TEMPLATE_DIR = Path(__file__).resolve().parent / "templates"
+
+
+def hub_template_names():
+    """Return every template shipped under ``hub/templates/hub``."""
+    return sorted(
+        path.relative_to(TEMPLATE_DIR).as_posix()
+        for path in (TEMPLATE_DIR / "hub").rglob("*.html")
+    )
+
+
+def precompile_templates():
+    """Compile all hub templates into the cached loader.
+
+    Returns the list of template names that were compiled.
+    """
+    names = hub_template_names()
+    engine = engines["django"]
+    for name in names:
+        engine.get_template(name)
+    return names
+
+
+def render_timed(request, template_name, context=None, status=None):
+    """Drop-in for ``django.shortcuts.render`` that records render time."""
+    template = get_template(template_name)
+    with metrics.timer(f"template.render.{template_name}"):
+        content = template.render(context, request)
+    return HttpResponse(content, status=status)
@@ -1,11 +1,65 @@
 """Comprehensive tests for hub views and models."""
 
-from django.test import TestCase
-from django.urls import reverse
+import csv
+import gzip
+import importlib
+import io
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from datetime import timedelta
+from pathlib import Path
+from unittest import addModuleCleanup, mock, skipUnless
+
+from django.contrib.admin import helpers
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.template.loader import get_template
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import NoReverseMatch, reverse
+from django.utils import timezone
 from django.core.exceptions import ValidationError
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
+
+from . import changelog, facets
+from .export import iter_export, iter_rows
+from .admin import EstimatedCountPaginator
+from .batching import batch_changes, objects_changed
+from .fuzzy import fuzzy_index, similarity
+from .geo import geocode, haversine_km, within
+from .indexing import IndexQueue, IndexUpdate, index_queue
+from .instrumentation import metrics
+from .warmup import warm_up
+from .management.commands.profile_startup import _boot, parse_importtime, summarize
+from .middleware import minify_html
+from .query import QueryError, Term, apply_query, parse, plan
+from .recommendations import build_recommendations, top_matches
+from .ratelimit import CacheBucketStore, LocMemBucketStore, SingleFlight, get_store
+from .models import Affiliation, ChangeLogEntry, Community, Membership, Person, RelatedCommunity, School, SimilarPerson
+from .scoring import TRIGRAM_DOCUMENTS, rank_queryset, rerank
+from . import similarity as person_similarity
+from . import sharedstore
+from .snapshot import DirectorySnapshot, database_tables, write_snapshot
+from .seeding import bulk_apply, bulk_seed, parse_records
+from .staticsite import build_site
+from .templating import precompile_templates
+from .utils import fold_text, load_json_data
+
 
-from .models import Community, Person, School
+def setUpModule():
+    # The queue thread would refresh similar people through its own
+    # connection, which SQLite blocks while a TestCase transaction holds the
+    # tables. SimilarityTests drive the handler through a queue of their own.
+    if person_similarity.apply in index_queue._handlers:
+        index_queue.unregister(person_similarity.apply)
+        addModuleCleanup(index_queue.register, person_similarity.apply)
 
 
 class HubViewTests(TestCase):
@@ -323,3 +377,1508 @@ class FilterTests(TestCase):
         response = self.client.get(reverse('hub:people'), {'availability': 'Speaking'})
         self.assertEqual(response.status_code, 200)
         self.assertEqual(len(response.context['people']), 2)  # Frontend and Full Stack
+
+
+class DirectoryAPITests(TestCase):
+    """Test the read-only JSON list and detail endpoints."""
+
+    def setUp(self):
+        for index in range(5):
+            Person.objects.create(
+                name=f"Person {index}",
+                role="Backend Developer" if index % 2 else "Designer",
+                interests=["Django"],
+            )
+        School.objects.create(name="Tech University", city="Buea")
+
+    def _json(self, response):
+        return json.loads(b"".join(response.streaming_content))
+
+    def test_cursor_pagination_walks_all_records(self):
+        names = []
+        params = {"limit": 2}
+        while True:
+            response = self.client.get(reverse("hub:api-people"), params)
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.streaming)
+            data = self._json(response)
+            names.extend(item["name"] for item in data["results"])
+            if not data["next"]:
+                break
+            params["cursor"] = data["next"]
+        self.assertEqual(names, [f"Person {index}" for index in range(5)])
+
+    def test_filters_and_field_selection(self):
+        response = self.client.get(
+            reverse("hub:api-people"), {"role": "Backend", "fields": "name,url"}
+        )
+        data = self._json(response)
+        self.assertEqual(len(data["results"]), 2)
+        self.assertEqual(set(data["results"][0]), {"name", "url"})
+        self.assertEqual(data["results"][0]["url"], "/people/person-1/")
+
+    def test_invalid_parameters(self):
+        response = self.client.get(reverse("hub:api-people"), {"fields": "password"})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(reverse("hub:api-people"), {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_etag_conditional_requests(self):
+        url = reverse("hub:api-schools")
+        response = self.client.get(url)
+        etag = response["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        School.objects.create(name="New School")
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_etag_only_reads_the_page(self):
+        url = reverse("hub:api-people")
+        etag = self.client.get(url, {"limit": 2})["ETag"]
+        Person.objects.create(name="Zed")  # Sorts after the first page.
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {"limit": 2}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertNotIn("COUNT(", queries[0]["sql"])
+        self.assertIn("LIMIT 3", queries[0]["sql"])
+
+    def test_detail_endpoint(self):
+        url = reverse("hub:api-school-detail", kwargs={"slug": "tech-university"})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["city"], "Buea")
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304
+        )
+        missing = reverse("hub:api-school-detail", kwargs={"slug": "missing"})
+        self.assertEqual(self.client.get(missing).status_code, 404)
+
+
+class ExportTests(TestCase):
+    """Test streaming exports and their round trip through seeding."""
+
+    def setUp(self):
+        Person.objects.create(
+            name="Ada Ndongo",
+            role="Mentor",
+            interests=["Django", "Data"],
+            bio='Likes "quotes", commas, and accents: Yaoundé',
+        )
+        Community.objects.create(
+            name="GDG Buea",
+            location="Buea",
+            links={"website": "https://example.com"},
+            founded_year=2015,
+        )
+        School.objects.create(name="Tech University", city="Buea", programs=["CS"])
+
+    def test_csv_and_jsonl_formats(self):
+        from .export import iter_export
+
+        lines = "".join(iter_export(Person.objects.all(), "jsonl")).splitlines()
+        self.assertEqual(json.loads(lines[0])["interests"], ["Django", "Data"])
+
+        rows = list(csv.DictReader(io.StringIO("".join(iter_export(Person.objects.all(), "csv")))))
+        self.assertEqual(rows[0]["bio"], 'Likes "quotes", commas, and accents: Yaoundé')
+        self.assertEqual(json.loads(rows[0]["interests"]), ["Django", "Data"])
+
+    def test_dump_directory_round_trips_through_seeding(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            call_command("dump_directory", format="json", output=tmp, stdout=io.StringIO())
+            with override_settings(DATA_ROOT=tmp):
+                call_command("seed_people", refresh=True, stdout=io.StringIO())
+                call_command("seed_communities", refresh=True, stdout=io.StringIO())
+                call_command("seed_schools", refresh=True, stdout=io.StringIO())
+
+        person = Person.objects.get()
+        self.assertEqual(person.interests, ["Django", "Data"])
+        self.assertEqual(person.bio, 'Likes "quotes", commas, and accents: Yaoundé')
+        self.assertEqual(Community.objects.get().founded_year, 2015)
+        self.assertEqual(School.objects.get().programs, ["CS"])
+
+    def test_gzip_dump(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            call_command(
+                "dump_directory", format="jsonl", output=tmp, gzip=True,
+                models=["schools"], stdout=io.StringIO(),
+            )
+            with gzip.open(Path(tmp) / "schools.jsonl.gz", "rt", encoding="utf-8") as handle:
+                self.assertEqual(json.loads(handle.readline())["name"], "Tech University")
+
+
+class TemplateProfileTests(TestCase):
+    """Test template precompilation and render instrumentation."""
+
+    def setUp(self):
+        metrics.reset()
+
+    def test_precompile_populates_cached_loader(self):
+        names = precompile_templates()
+        self.assertIn("hub/people.html", names)
+        self.assertIn("hub/includes/pagination.html", names)
+        first = get_template("hub/people.html").template
+        self.assertIs(get_template("hub/people.html").template, first)
+
+    def test_render_time_is_recorded(self):
+        self.client.get(reverse("hub:people"))
+        self.client.get(reverse("hub:people"))
+        stats = metrics.stats("template.render.hub/people.html")
+        self.assertEqual(stats["count"], 2)
+        self.assertGreater(stats["total"], 0)
+
+    def test_metrics_endpoint_is_staff_only(self):
+        url = reverse("hub:api-metrics")
+        self.assertEqual(self.client.get(url).status_code, 302)
+        staff = User.objects.create_user("staff", password="pw", is_staff=True)
+        self.client.force_login(staff)
+        self.client.get(reverse("hub:home"))
+        data = self.client.get(url).json()
+        self.assertIn("template.render.hub/home.html", data["observations"])
+
+    def test_profile_templates_command(self):
+        out = io.StringIO()
+        call_command("profile_templates", iterations=3, stdout=out)
+        self.assertIn("ms/render", out.getvalue())
+
+
+class StaticAssetTests(TestCase):
+    """Test the external asset wiring in base.html."""
+
+    def test_search_script_is_external(self):
+        response = self.client.get(reverse("hub:home"))
+        self.assertContains(response, 'src="/static/hub/js/hub.js"')
+        self.assertContains(response, f'data-search-url="{reverse("hub:search-api")}"')
+        self.assertNotContains(response, "fetch(")
+        self.assertContains(response, "cdn.tailwindcss.com")
+
+    @override_settings(HUB_BUILT_ASSETS=True)
+    def test_built_assets_replace_tailwind_cdn(self):
+        response = self.client.get(reverse("hub:home"))
+        self.assertContains(response, 'href="/static/hub/css/hub.css"')
+        self.assertNotContains(response, "cdn.tailwindcss.com")
+
+    def test_hashed_assets_get_far_future_cache_headers(self):
+        from .views import static_asset
+
+        with tempfile.TemporaryDirectory() as tmp:
+            (Path(tmp) / "hub.0123456789ab.css").write_text("body{}")
+            (Path(tmp) / "hub.css").write_text("body{}")
+            with override_settings(STATIC_ROOT=tmp):
+                request = RequestFactory().get("/static/hub.0123456789ab.css")
+                hashed = static_asset(request, "hub.0123456789ab.css")
+                plain = static_asset(request, "hub.css")
+        self.assertIn("max-age=31536000", hashed["Cache-Control"])
+        self.assertIn("immutable", hashed["Cache-Control"])
+        self.assertIn("no-cache", plain["Cache-Control"])
+
+    def test_build_assets_requires_tailwind_cli(self):
+        with self.assertRaises(CommandError):
+            call_command("build_assets", tailwind="/nonexistent/tailwindcss", stdout=io.StringIO())
+
+
+class CompressionMiddlewareTests(TestCase):
+    """Test HTML minification and response compression."""
+
+    def setUp(self):
+        metrics.reset()
+        for index in range(12):
+            Person.objects.create(name=f"Person {index}", role="Contributor")
+
+    def test_minify_html_preserves_significant_whitespace(self):
+        html = "<div>\n    <p>Hi   there</p>\n  <!-- note -->\n</div>\n<pre>  keep\n    this</pre>"
+        self.assertEqual(
+            minify_html(html), "<div>\n<p>Hi there</p>\n</div>\n<pre>  keep\n    this</pre>\n"
+        )
+
+    def test_html_is_minified_and_gzipped(self):
+        plain = self.client.get(reverse("hub:people"))
+        self.assertEqual(plain.content.count(b"\n<article"), 9)
+
+        response = self.client.get(reverse("hub:people"), HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertLess(metrics.stats("compression.ratio")["last"], 0.5)
+
+    def test_small_and_refused_responses_are_not_compressed(self):
+        response = self.client.get(
+            reverse("hub:search-api"), {"q": "zz"}, HTTP_ACCEPT_ENCODING="gzip"
+        )
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+        response = self.client.get(reverse("hub:people"), HTTP_ACCEPT_ENCODING="gzip;q=0")
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    def test_gzip_is_padded_and_the_only_coding_for_forms(self):
+        first = self.client.get(reverse("hub:people"), HTTP_ACCEPT_ENCODING="gzip")
+        second = self.client.get(reverse("hub:people"), HTTP_ACCEPT_ENCODING="gzip")
+        self.assertNotEqual(first.content, second.content)
+        self.assertEqual(gzip.decompress(first.content), gzip.decompress(second.content))
+
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "pw"))
+        with mock.patch("hub.middleware.available_encodings", return_value=["br", "zstd", "gzip"]):
+            response = self.client.get(
+                reverse("admin:hub_person_import"), HTTP_ACCEPT_ENCODING="br, zstd, gzip"
+            )
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn(b"csrfmiddlewaretoken", gzip.decompress(response.content))
+
+    def test_streaming_responses_are_compressed(self):
+        response = self.client.get(reverse("hub:api-people"), HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertTrue(response["ETag"].startswith("W/"))
+        data = json.loads(gzip.decompress(b"".join(response.streaming_content)))
+        self.assertEqual(len(data["results"]), 12)
+        self.assertEqual(metrics.counter("compression.gzip"), 1)
+
+
+class StaticSiteTests(TestCase):
+    """Test full-page static generation and incremental rebuilds."""
+
+    def setUp(self):
+        for index in range(12):
+            Person.objects.create(name=f"Person {index:02d}", role="Contributor")
+        Community.objects.create(name="GDG Buea", location="Buea")
+        School.objects.create(name="Tech University", city="Buea")
+        self.output = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.output)
+
+    def test_build_renders_every_page(self):
+        result = build_site(self.output)
+        # home + 2 people pages + 12 people + 1 + 1 community + 1 + 1 school
+        self.assertEqual(len(result.rendered), 19)
+        page_two = (self.output / "people/page/2/index.html").read_text()
+        self.assertIn("Person 11", page_two)
+        self.assertIn('href="/people/"', page_two)
+        self.assertTrue((self.output / "people/person-00/index.html").exists())
+        self.assertTrue((self.output / "schools/tech-university/index.html").exists())
+
+    def test_incremental_rebuild(self):
+        build_site(self.output)
+        self.assertEqual(build_site(self.output).rendered, [])
+
+        person = Person.objects.get(name="Person 03")
+        person.bio = "Now mentoring."
+        person.save()
+        self.assertEqual(
+            sorted(build_site(self.output).rendered),
+            ["people/index.html", "people/person-03/index.html"],
+        )
+
+        # A new role shows up in the filter dropdown of every list page.
+        person.role = "Mentor"
+        person.save()
+        self.assertEqual(
+            sorted(build_site(self.output).rendered),
+            ["people/index.html", "people/page/2/index.html", "people/person-03/index.html"],
+        )
+
+        # Detail pages list related rows, named as they are now.
+        community = Community.objects.get()
+        Membership.objects.create(person=person, community=community)
+        self.assertEqual(
+            sorted(build_site(self.output).rendered),
+            ["communities/gdg-buea/index.html", "people/person-03/index.html"],
+        )
+        self.assertIn("GDG Buea", (self.output / "people/person-03/index.html").read_text())
+        community.name = "GDG Buea Cloud"
+        community.save()
+        self.assertIn("people/person-03/index.html", build_site(self.output).rendered)
+
+        School.objects.all().delete()
+        result = build_site(self.output)
+        self.assertEqual(result.removed, ["schools/tech-university/index.html"])
+        self.assertFalse((self.output / "schools/tech-university").exists())
+
+    def test_command_copies_static_files(self):
+        out = io.StringIO()
+        call_command("build_static_site", output=str(self.output), workers=1, stdout=out)
+        self.assertIn("Rendered 19 page(s)", out.getvalue())
+        self.assertTrue((self.output / "static/hub/js/hub.js").exists())
+
+
+class IndexQueueTests(TestCase):
+    """Test the write-behind index queue."""
+
+    def setUp(self):
+        self.batches = []
+        index_queue.register(self.batches.append)
+        self.addCleanup(index_queue.unregister, self.batches.append)
+        index_queue.flush()
+
+    def applied(self):
+        return [update for batch in self.batches for update in batch]
+
+    def test_updates_are_coalesced_and_batched(self):
+        queue = IndexQueue(batch_size=2, autostart=False)
+        queue.register(self.batches.append)
+        for role in ("Dev", "Lead", "Mentor"):
+            queue.put(IndexUpdate("hub.person", 1, {"role": role}))
+        queue.put(IndexUpdate("hub.person", 2, {"role": "Dev"}))
+        queue.put(IndexUpdate("hub.person", 3, None))
+        self.assertEqual(queue.pending(), 3)
+
+        queue.flush()
+        self.assertEqual([len(batch) for batch in self.batches], [2, 1])
+        self.assertEqual(self.applied()[0].document, {"role": "Mentor"})
+
+    @mock.patch("hub.indexing.GENERATION_CHECK_INTERVAL", 0)
+    def test_flush_command_makes_other_processes_reindex(self):
+        worker = []  # Batches applied in a "worker" with its own queue.
+        queue = IndexQueue(autostart=False)
+        queue.register(worker.append)
+        Person.objects.create(name="Ada")
+        queue.sync_generation()  # A worker's first search only notes the generation.
+        self.assertEqual(queue.pending(), 0)
+
+        call_command("flush_search_index", stdout=io.StringIO())
+        queue.sync_generation()
+        queue.flush()
+        self.assertIn(IndexUpdate("hub.person", None), [update for batch in worker for update in batch])
+        queue.sync_generation()  # Nothing new: no second re-index.
+        self.assertEqual(queue.pending(), 0)
+
+    def test_reset_drops_pending_updates_for_model(self):
+        queue = IndexQueue(autostart=False)
+        queue.register(self.batches.append)
+        queue.put(IndexUpdate("hub.person", 1, {"name": "A"}))
+        queue.put(IndexUpdate("hub.school", 1, {"name": "S"}))
+        queue.put(IndexUpdate("hub.person", None))
+        queue.flush()
+        self.assertEqual(
+            [(u.label, u.pk) for u in self.applied()], [("hub.school", 1), ("hub.person", None)]
+        )
+
+    def test_saves_and_deletes_are_indexed_in_background(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            person = Person.objects.create(name="Queue Person", role="Dev")
+            person.delete()
+        self.assertTrue(index_queue.flush(timeout=5))
+        # Both changes coalesce into the final deletion.
+        self.assertEqual(self.applied()[-1].document, None)
+        self.assertEqual(self.applied()[-1].label, "hub.person")
+
+    def test_seeding_indexes_once_per_model(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            Path(tmp, "schools.json").write_text(
+                json.dumps([{"name": f"School {i}", "city": "Buea"} for i in range(3)])
+            )
+            with override_settings(DATA_ROOT=tmp):
+                call_command("seed_schools", stdout=io.StringIO())
+        self.assertTrue(index_queue.flush(timeout=5))
+        updates = self.applied()
+        self.assertEqual(updates[0], IndexUpdate("hub.school", None))
+        self.assertEqual(len(updates), 4)
+
+
+class FuzzySearchTests(TestCase):
+    """Test the in-memory trigram index used without Postgres."""
+
+    def setUp(self):
+        index_queue.flush()
+        fuzzy_index.reset()
+        self.addCleanup(fuzzy_index.reset)
+        self.yaounde = Community.objects.create(name="Django Yaoundé", location="Yaoundé")
+        self.douala = Community.objects.create(name="Python Douala", location="Douala")
+
+    def test_fold_text(self):
+        self.assertEqual(fold_text("  YAOUNDÉ\tCentre "), "yaounde centre")
+        self.assertEqual(fold_text(None), "")
+
+    def test_similarity_matches_pg_trgm(self):
+        # pg_trgm: similarity('word', 'two words') = 0.363636
+        self.assertAlmostEqual(similarity("word", "two words"), 4 / 11)
+        self.assertEqual(similarity("Yaoundé", "yaounde"), 1.0)
+
+    def test_typos_and_missing_accents_match(self):
+        response = self.client.get(reverse("hub:communities"), {"search": "Yaunde"})
+        self.assertEqual(list(response.context["communities"]), [self.yaounde])
+
+    def test_results_ordered_by_similarity(self):
+        closer = Community.objects.create(name="Yaounde Devs", location="Yaoundé")
+        index_queue.flush()
+        results = fuzzy_index.search(Community, "Yaounde Devs")
+        self.assertEqual(results[0][0], closer.pk)
+        self.assertEqual({pk for pk, _ in results}, {closer.pk, self.yaounde.pk})
+
+    def test_index_follows_saves_and_deletes(self):
+        fuzzy_index.search(Community, "Douala")  # Build the index.
+        self.douala.location = "Bamenda"
+        self.douala.name = "Python Bamenda"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.douala.save()
+        index_queue.flush()
+        self.assertEqual(fuzzy_index.search(Community, "Douala"), [])
+        self.assertEqual(fuzzy_index.search(Community, "Bamnda")[0][0], self.douala.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.douala.delete()
+        index_queue.flush()
+        self.assertEqual(fuzzy_index.search(Community, "Bamnda"), [])
+
+    def test_updates_during_a_build_are_replayed(self):
+        renamed = {"name": "Python Bamenda", "location": "Bamenda"}
+        load = Community.objects.order_by
+
+        def order_by(*args):
+            # The queue delivers a rename while the build is still reading rows.
+            fuzzy_index.apply([IndexUpdate("hub.community", self.douala.pk, renamed)])
+            return load(*args)
+
+        index_queue.flush()
+        with mock.patch.object(Community.objects, "order_by", order_by):
+            fuzzy_index.build(Community)
+        self.assertEqual(fuzzy_index.search(Community, "Bamnda")[0][0], self.douala.pk)
+
+    def test_search_prunes_without_losing_matches(self):
+        names = ["Yaounde Devs", "Douala Pythonistas", "Bamenda", "Buea Django Girls", "Limbe"]
+        for name in names:
+            Community.objects.create(name=name, location=name)
+        index_queue.flush()
+        for query in ("Yaunde", "Pythonista", "Bue", "Django Limbe"):
+            expected = sorted(
+                pk for pk, name in Community.objects.values_list("pk", "name")
+                if similarity(query, name) >= 0.2
+            )
+            results = fuzzy_index.search(Community, query, threshold=0.2)
+            self.assertEqual(sorted(pk for pk, _ in results), expected, query)
+
+    def test_search_api_uses_fuzzy_matches(self):
+        response = self.client.get(reverse("hub:search-api"), {"q": "yaunde"})
+        self.assertEqual(response.json()["communities"][0]["name"], "Django Yaoundé")
+
+    @override_settings(HUB_FUZZY_SEARCH=False)
+    def test_disabled_falls_back_to_substring_search(self):
+        response = self.client.get(reverse("hub:communities"), {"search": "Yaunde"})
+        self.assertEqual(list(response.context["communities"]), [])
+
+
+class FoldedColumnTests(TestCase):
+    """Test the accent- and case-folded shadow columns."""
+
+    def test_columns_maintained_on_save(self):
+        person = Person.objects.create(name="Élodie Ngo", role="Développeuse", interests=["Éducation", " IA "])
+        self.assertEqual(person.name_folded, "elodie ngo")
+        self.assertEqual(person.role_folded, "developpeuse")
+        self.assertEqual(person.interests_folded, "|education|ia|")
+
+        person.role = "Ingénieure"
+        person.save(update_fields=["role"])
+        person.refresh_from_db()
+        self.assertEqual(person.role_folded, "ingenieure")
+
+    def test_filters_ignore_accents_and_case(self):
+        school = School.objects.create(name="École Polytechnique", city="Yaoundé", programs=["Génie Logiciel"])
+        Community.objects.create(name="Douala Devs", location="Douala")
+        for params in ({"search": "ecole"}, {"city": "YAOUNDE"}, {"search": "genie"}):
+            response = self.client.get(reverse("hub:schools"), params)
+            self.assertEqual(list(response.context["schools"]), [school], params)
+        response = self.client.get(reverse("hub:communities"), {"location": "douala"})
+        self.assertEqual(len(response.context["communities"]), 1)
+
+    @skipUnless(connection.vendor == "sqlite", "SQLite query plans")
+    def test_name_prefix_uses_the_folded_index(self):
+        Person.objects.create(name="Élodie Ngo")
+        queryset, _ = apply_query(Person.objects.all(), "name:elo")
+        self.assertEqual([person.name for person in queryset], ["Élodie Ngo"])
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            details = " ".join(row[-1] for row in cursor.fetchall())
+        self.assertIn("USING INDEX hub_person_name_folded", details)
+
+    def test_interest_filter_matches_whole_items_only(self):
+        Person.objects.create(name="Token Person", role="Dev", interests=["Web Design", "Dev Ops"])
+        response = self.client.get(reverse("hub:people"), {"interest": "Web"})
+        self.assertEqual(len(response.context["people"]), 0)
+        response = self.client.get(reverse("hub:people"), {"interest": "dev ops"})
+        self.assertEqual(len(response.context["people"]), 1)
+
+
+class SearchScoringTests(TestCase):
+    """Test weighted relevance scoring."""
+
+    def setUp(self):
+        fuzzy_index.reset()
+        self.addCleanup(fuzzy_index.reset)
+        self.bio_match = Person.objects.create(name="Alice", role="Designer", bio="Loves Django")
+        self.role_match = Person.objects.create(name="Bob", role="Django Developer")
+        self.name_match = Person.objects.create(name="Zed Django", role="Writer")
+
+    def test_fields_are_weighted(self):
+        ranked = list(rank_queryset(Person.objects.all(), "django"))
+        self.assertEqual(ranked, [self.name_match, self.role_match, self.bio_match])
+
+    def test_name_prefix_is_boosted(self):
+        prefixed = Person.objects.create(name="Djangonaut", role="Writer")
+        ranked = list(rank_queryset(Person.objects.all(), "djang"))
+        self.assertEqual(ranked[0], prefixed)
+
+    def test_recent_records_win_ties(self):
+        Person.objects.filter(pk=self.role_match.pk).update(created_at=self.role_match.created_at - timedelta(days=400))
+        newer = Person.objects.create(name="Carl", role="Django Developer")
+        ranked = list(rank_queryset(Person.objects.filter(role="Django Developer"), "django"))
+        self.assertEqual(ranked, [newer, self.role_match])
+
+    @override_settings(HUB_SEARCH_WEIGHTS={"person": {"bio": 10.0}})
+    def test_weights_are_configurable(self):
+        self.assertEqual(rank_queryset(Person.objects.all(), "django").first(), self.bio_match)
+
+    def test_rerank_agrees_with_database(self):
+        candidates = rank_queryset(Person.objects.all(), "django")
+        self.assertEqual([obj for obj, _ in rerank(candidates, "django")], list(candidates))
+
+    def test_search_api_orders_suggestions(self):
+        response = self.client.get(reverse("hub:search-api"), {"q": "django"})
+        self.assertEqual([p["name"] for p in response.json()["people"]], ["Zed Django", "Bob", "Alice"])
+
+    @override_settings(HUB_FUZZY_SEARCH=False)
+    def test_search_api_is_cacheable_and_narrowable(self):
+        response = self.client.get(reverse("hub:search-api"), {"q": "django"})
+        self.assertIn("max-age=60", response["Cache-Control"])
+        data = response.json()
+        self.assertTrue(data["complete"])
+        self.assertIn("loves django", data["people"][2]["match"])
+
+        for index in range(5):
+            Person.objects.create(name=f"Django Fan {index}", role="Dev")
+        self.assertFalse(self.client.get(reverse("hub:search-api"), {"q": "django"}).json()["complete"])
+
+    def test_fuzzy_suggestions_are_never_complete(self):
+        # With HUB_FUZZY_SEARCH on (the default), a longer query may add typo matches.
+        self.assertFalse(self.client.get(reverse("hub:search-api"), {"q": "djang"}).json()["complete"])
+
+    def test_benchmark_command(self):
+        out = io.StringIO()
+        call_command("benchmark_search", "--model", "person", "--sample", "2", stdout=out)
+        self.assertIn("reranked", out.getvalue())
+
+
+class RateLimitTests(TestCase):
+    """Test search API rate limiting and request coalescing."""
+
+    def setUp(self):
+        get_store().reset()
+        self.addCleanup(get_store().reset)
+        metrics.reset()
+
+    def test_bucket_refills_at_rate(self):
+        for store in (LocMemBucketStore(), CacheBucketStore()):
+            store.reset()
+            self.assertEqual(store.take("k", rate=1.0, burst=2, now=0), (True, 0.0))
+            self.assertTrue(store.take("k", rate=1.0, burst=2, now=0)[0])
+            allowed, retry_after = store.take("k", rate=1.0, burst=2, now=0.5)
+            self.assertFalse(allowed)
+            self.assertAlmostEqual(retry_after, 0.5)
+            self.assertTrue(store.take("k", rate=1.0, burst=2, now=1.5)[0])
+
+    @override_settings(HUB_RATE_LIMITS={"search": (0.001, 2)})
+    def test_search_api_rejects_over_limit(self):
+        url = reverse("hub:search-api")
+        for _ in range(2):
+            self.assertEqual(self.client.get(url, {"q": "zz"}).status_code, 200)
+        response = self.client.get(url, {"q": "zz"})
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response["Retry-After"]), 0)
+        # Other clients keep their own bucket.
+        self.assertEqual(self.client.get(url, {"q": "zz"}, REMOTE_ADDR="10.0.0.2").status_code, 200)
+        self.assertEqual(metrics.counter("ratelimit.search.rejected"), 1)
+
+    @override_settings(HUB_RATE_LIMITS={"search": (0.001, 1)}, HUB_TRUSTED_PROXY_COUNT=1)
+    def test_clients_behind_a_trusted_proxy(self):
+        url = reverse("hub:search-api")
+        proxy = {"REMOTE_ADDR": "10.0.0.1"}
+        self.assertEqual(self.client.get(url, {"q": "zz"}, HTTP_X_FORWARDED_FOR="1.1.1.1", **proxy).status_code, 200)
+        self.assertEqual(self.client.get(url, {"q": "zz"}, HTTP_X_FORWARDED_FOR="2.2.2.2", **proxy).status_code, 200)
+        # A spoofed leftmost entry does not buy a fresh bucket.
+        response = self.client.get(url, {"q": "zz"}, HTTP_X_FORWARDED_FOR="9.9.9.9, 1.1.1.1", **proxy)
+        self.assertEqual(response.status_code, 429)
+
+    @override_settings(HUB_RATE_LIMITS={"search": (0.001, 1)}, HUB_RATELIMIT_STORE="cache")
+    def test_cache_store(self):
+        url = reverse("hub:search-api")
+        self.assertEqual(self.client.get(url, {"q": "zz"}).status_code, 200)
+        self.assertEqual(self.client.get(url, {"q": "zz"}).status_code, 429)
+
+    def test_single_flight_shares_one_computation(self):
+        flight = SingleFlight("test")
+        started, release = threading.Event(), threading.Event()
+        calls, results = [], []
+
+        def compute():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return {"value": 42}
+
+        leader = threading.Thread(target=lambda: results.append(flight.do("q", compute)))
+        leader.start()
+        started.wait(5)
+        followers = [threading.Thread(target=lambda: results.append(flight.do("q", compute))) for _ in range(3)]
+        for thread in followers:
+            thread.start()
+        while metrics.counter("test.coalesced") < 3:
+            threading.Event().wait(0.01)
+        release.set()
+        for thread in [leader, *followers]:
+            thread.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"value": 42}] * 4)
+
+    def test_single_flight_propagates_errors(self):
+        flight = SingleFlight("test")
+        with self.assertRaises(ZeroDivisionError):
+            flight.do("q", lambda: 1 / 0)
+        self.assertEqual(flight.do("q", lambda: "ok"), "ok")
+
+
+class AdminPerformanceTests(TestCase):
+    """Test the admin changelist performance mode and the facet cache."""
+
+    def setUp(self):
+        facets.invalidate()
+        self.addCleanup(facets.invalidate)
+        for index, role in enumerate(["Développeur", "Mentor", "Développeur", "Mentor"]):
+            Person.objects.create(name=f"Admin Person {index}", role=role, interests=["Django", f"Topic {index}"])
+        admin_user = User.objects.create_superuser("admin", "admin@example.com", "pw")
+        self.client.force_login(admin_user)
+        self.url = reverse("admin:hub_person_changelist")
+
+    def test_facets_count_distinct_values(self):
+        self.assertEqual(facets.facet_counts(Person, "role"), [("Développeur", 2), ("Mentor", 2)])
+        self.assertEqual(facets.facet_counts(Person, "interests")[0], ("Django", 4))
+
+    def test_facets_are_invalidated_on_save(self):
+        facets.facet_values(Person, "role")
+        with self.captureOnCommitCallbacks(execute=True):
+            Person.objects.create(name="New Role Person", role="Writer")
+        self.assertIn("Writer", facets.facet_values(Person, "role"))
+
+    def test_people_page_roles_are_distinct(self):
+        response = self.client.get(reverse("hub:people"))
+        self.assertEqual(response.context["roles"], ["Développeur", "Mentor"])
+
+    def test_changelist_filters_and_searches_folded_columns(self):
+        response = self.client.get(self.url, {"role": "Développeur"})
+        self.assertEqual(response.context["cl"].result_count, 2)
+        self.assertContains(response, "Développeur (2)")
+        response = self.client.get(self.url, {"q": "DEVELOPPEUR"})
+        self.assertEqual(response.context["cl"].result_count, 2)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url, {"q": "Admin Pérson 1"})
+        self.assertEqual([person.name for person in response.context["cl"].result_list], ["Admin Person 1"])
+        self.assertNotIn("UPPER(", ctx.captured_queries[-1]["sql"])
+
+    def test_changelist_search_matches_inside_fields(self):
+        marie = Person.objects.create(name="Marie Ndongo", role="Backend Developer", interests=["Python"])
+        for term in ("Ndongo", "developer", "python"):
+            response = self.client.get(self.url, {"q": term})
+            self.assertEqual(list(response.context["cl"].result_list), [marie], term)
+
+    def test_changelist_skips_full_count_and_defers_columns(self):
+        self.client.get(self.url)  # Warm the facet cache and session.
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url)
+        self.assertFalse(response.context["cl"].show_full_result_count)
+        # Session, user, capped count and one page of rows: no per-row queries.
+        self.assertEqual(len(ctx.captured_queries), 4)
+        sql = " ".join(query["sql"] for query in ctx.captured_queries)
+        self.assertNotIn("DISTINCT", sql)
+        self.assertNotIn('"bio"', sql)
+
+    @override_settings(HUB_ADMIN_COUNT_LIMIT=3)
+    def test_count_is_capped(self):
+        self.assertEqual(EstimatedCountPaginator(Person.objects.all(), 2).count, 3)
+
+
+class BulkWriteTests(TestCase):
+    """Test chunked bulk writes and the admin bulk edit and import screens."""
+
+    def setUp(self):
+        facets.invalidate()
+        self.addCleanup(facets.invalidate)
+        self.batches = []
+        index_queue.register(self.batches.append)
+        self.addCleanup(index_queue.unregister, self.batches.append)
+        index_queue.flush()
+
+    def applied(self):
+        return [update for batch in self.batches for update in batch]
+
+    def test_bulk_seed_creates_updates_and_allocates_slugs(self):
+        Person.objects.create(name="Ada Lovelace", role="Writer")
+        Person.objects.create(name="Ada-Lovelace!", role="Writer")  # Takes the "ada-lovelace-2" slug.
+        entries = [
+            {"name": "Ada Lovelace", "role": "Mentor", "interests": ["Math"]},
+            {"name": "Ada  Lovelace", "role": "Developer"},
+            {"name": "Grace Hopper", "role": "Développeuse"},
+            {"role": "Nameless"},
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            report = bulk_seed(Person, entries, chunk_size=2)
+        self.assertEqual((report.created, report.updated, report.skipped), (2, 1, 1))
+        self.assertEqual(len(report.progress), 2)
+
+        ada = Person.objects.get(name="Ada Lovelace")
+        self.assertEqual((ada.role, ada.role_folded, ada.interests), ("Mentor", "mentor", ["Math"]))
+        self.assertEqual(Person.objects.get(name="Ada  Lovelace").slug, "ada-lovelace-3")
+        self.assertEqual(Person.objects.get(name="Grace Hopper").role_folded, "developpeuse")
+
+        index_queue.flush()
+        seeded = Person.objects.filter(name__in=["Ada  Lovelace", "Grace Hopper"]).values_list("pk", flat=True)
+        self.assertLessEqual({ada.pk, *seeded}, {update.pk for update in self.applied()})
+
+    def test_bulk_seed_invalidates_facets_on_commit(self):
+        facets.facet_values(Person, "role")
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk_seed(Person, [{"name": "Facet Person", "role": "Speaker"}])
+        self.assertIn("Speaker", facets.facet_values(Person, "role"))
+
+    def test_bulk_seed_validation_skips_invalid_rows(self):
+        report = bulk_seed(
+            Person,
+            [
+                {"name": "Bad Link", "role": "Dev", "github_url": "not a url"},
+                {"name": "!!!", "role": "Dev"},
+                {"name": "Good Row", "role": "Dev"},
+            ],
+            validate=True,
+        )
+        self.assertEqual((report.created, report.skipped), (1, 2))
+        self.assertIn("Row 1 (Bad Link): github_url: Enter a valid URL.", report.errors)
+        self.assertFalse(Person.objects.filter(name="Bad Link").exists())
+
+    def test_bulk_seed_validation_reports_overlong_names(self):
+        long_name = "A" * 151
+        report = bulk_seed(Person, [{"name": long_name, "role": "Dev"}, {"name": "Fine", "role": "Dev"}], validate=True)
+        self.assertEqual((report.created, report.skipped), (1, 1))
+        self.assertTrue(report.errors[0].startswith(f"Row 1 ({long_name}): name:"))
+        self.assertFalse(Person.objects.filter(name=long_name).exists())
+
+    def test_bulk_apply_edits_lists_and_folded_columns(self):
+        school = School.objects.create(name="Bulk School", city="Douala", programs=["AI", "Web"])
+        report = bulk_apply(
+            School.objects.all(),
+            {"city": lambda old: "Yaoundé", "programs": lambda old: [p for p in old if p != "Web"] + ["Data"]},
+        )
+        self.assertEqual(report.updated, 1)
+        school.refresh_from_db()
+        self.assertEqual((school.city_folded, school.programs), ("yaounde", ["AI", "Data"]))
+        self.assertEqual(school.programs_folded, "|ai|data|")
+
+    def test_parse_records_reads_export_formats(self):
+        Person.objects.create(name="Export Person", role="Dev", interests=["Django", "APIs"])
+        for fmt in ("jsonl", "csv", "json"):
+            data = "".join(iter_export(Person.objects.all(), fmt)).encode()
+            records = parse_records(data, f"people.{fmt}")
+            bulk_seed(Person, records)
+            self.assertEqual(Person.objects.get().interests, ["Django", "APIs"])
+        with self.assertRaises(ValueError):
+            parse_records(b"", "people.xml")
+
+    def test_admin_bulk_edit_action(self):
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "pw"))
+        people = [Person.objects.create(name=f"Bulk {i}", interests=["Django"]) for i in range(3)]
+        url = reverse("admin:hub_person_changelist")
+        selected = [str(person.pk) for person in people[:2]]
+        post = {"action": "bulk_edit", helpers.ACTION_CHECKBOX_NAME: selected}
+
+        response = self.client.post(url, post)
+        self.assertContains(response, "applied to 2 People")
+
+        post.update({"apply": "1", "set_role": "Mentor", "add_interests": "Python", "remove_interests": "Django"})
+        response = self.client.post(url, post, follow=True)
+        self.assertContains(response, "Updated 2 People")
+        self.assertEqual(Person.objects.filter(role="Mentor", interests=["Python"]).count(), 2)
+        self.assertEqual(Person.objects.get(pk=people[2].pk).role, "")
+
+        post["set_role"] = "M" * 121
+        response = self.client.post(url, post)
+        self.assertContains(response, "at most 120 characters")
+        self.assertEqual(Person.objects.filter(role="Mentor").count(), 2)
+
+    def test_admin_import_view(self):
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "pw"))
+        url = reverse("admin:hub_community_import")
+        self.assertContains(self.client.get(reverse("admin:hub_community_changelist")), url)
+
+        upload = SimpleUploadedFile(
+            "communities.jsonl",
+            b'{"name": "Import Club", "location": "Buea"}\n{"name": "", "location": "Limbe"}\n',
+        )
+        response = self.client.post(url, {"file": upload})
+        self.assertContains(response, "Created 1, updated 0, skipped 1.")
+        self.assertContains(response, "missing name")
+        self.assertEqual(Community.objects.get(name="Import Club").location_folded, "buea")
+
+        response = self.client.post(url, {"file": SimpleUploadedFile("communities.xml", b"<x/>")})
+        self.assertContains(response, "Unsupported file type")
+
+
+class BatchingTests(TestCase):
+    """Test batched change notifications."""
+
+    def setUp(self):
+        self.events = []
+        objects_changed.connect(self.receive)
+        self.addCleanup(objects_changed.disconnect, self.receive)
+        facets.invalidate()
+        self.addCleanup(facets.invalidate)
+
+    def receive(self, sender, pks, **kwargs):
+        self.events.append((sender, pks))
+
+    def test_changes_outside_a_batch_are_sent_per_row(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            person = Person.objects.create(name="Solo Person", role="Dev")
+            pk = person.pk
+            person.delete()
+            # Nothing is sent before the write commits.
+            self.assertEqual(self.events, [])
+        self.assertEqual(self.events, [(Person, {pk}), (Person, {pk})])
+
+    def test_rolled_back_changes_are_not_sent(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(IntegrityError), transaction.atomic():
+                Person.objects.create(name="Doomed Person", role="Dev")
+                Person.objects.create(name="Doomed Person", role="Dev")
+        self.assertEqual(self.events, [])
+
+    def test_batch_deduplicates_and_sends_once_per_model(self):
+        # TestCase wraps each test in a transaction; run the commit hooks.
+        with self.captureOnCommitCallbacks(execute=True), batch_changes():
+            person = Person.objects.create(name="Batch Person", role="Dev")
+            for role in ("Lead", "Mentor"):
+                person.role = role
+                person.save()
+            with batch_changes():  # Nested blocks join the outer batch.
+                school = School.objects.create(name="Batch School")
+            self.assertEqual(self.events, [])
+        self.assertEqual(self.events, [(Person, {person.pk}), (School, {school.pk})])
+
+    def test_batch_waits_for_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            with transaction.atomic(), batch_changes():
+                Person.objects.create(name="Atomic Person", role="Dev")
+            self.assertEqual(self.events, [])
+        for callback in callbacks:
+            callback()
+        self.assertEqual(len(self.events), 1)
+
+    def test_batch_works_as_a_decorator(self):
+        @batch_changes()
+        def seed():
+            for index in range(3):
+                Community.objects.create(name=f"Decorated {index}")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            seed()
+        self.assertEqual([(sender, len(pks)) for sender, pks in self.events], [(Community, 3)])
+
+    def test_admin_delete_selected_is_batched(self):
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "pw"))
+        people = [Person.objects.create(name=f"Doomed {i}", role="Dev") for i in range(3)]
+        self.events.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("admin:hub_person_changelist"),
+                {"action": "delete_selected", "post": "yes", helpers.ACTION_CHECKBOX_NAME: [p.pk for p in people]},
+            )
+        self.assertFalse(Person.objects.exists())
+        self.assertEqual(self.events, [(Person, {person.pk for person in people})])
+
+    def test_home_counts_are_cached_until_rows_change(self):
+        self.client.get(reverse("hub:home"))
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("hub:home"))
+        self.assertNotIn("COUNT", " ".join(query["sql"] for query in ctx.captured_queries))
+        with self.captureOnCommitCallbacks(execute=True):
+            School.objects.create(name="Counted School")
+        response = self.client.get(reverse("hub:home"))
+        self.assertEqual(response.context["school_count"], 1)
+
+
+class GeoTests(TestCase):
+    """Test gazetteer geocoding and proximity search."""
+
+    def setUp(self):
+        self.douala = Community.objects.create(name="Douala Devs", location="Douala, Cameroon")
+        self.buea = Community.objects.create(name="Buea Coders", location="Buéa (South-West)")
+        self.yaounde = Community.objects.create(name="Yaounde Guild", location="Yaoundé")
+        self.remote = Community.objects.create(name="Remote Crew", location="Remote / Nationwide")
+
+    def test_geocode_prefers_cities_over_regions(self):
+        self.assertEqual(geocode("Buea, South-West").name, "Buea")
+        self.assertEqual(geocode("South West region").name, "South-West")
+        self.assertEqual(geocode("Garoua Boulai").name, "Garoua-Boulaï")
+        self.assertIsNone(geocode("Remote / Nationwide"))
+
+    def test_rows_are_geocoded_on_save(self):
+        self.assertAlmostEqual(self.douala.latitude, 4.0511)
+        self.assertIsNone(self.remote.latitude)
+        self.douala.location = "Limbe"
+        self.douala.save(update_fields=["location"])
+        self.douala.refresh_from_db()
+        self.assertAlmostEqual(self.douala.longitude, 9.2)
+
+    def test_haversine_distance(self):
+        # Douala to Yaoundé is roughly 200 km as the crow flies.
+        self.assertAlmostEqual(haversine_km(4.0511, 9.7679, 3.8480, 11.5021), 193.6, delta=1)
+
+    def test_within_filters_by_exact_distance(self):
+        nearby = within(Community.objects.all(), 4.0511, 9.7679, 80)
+        self.assertEqual([c.name for c in nearby.order_by("distance_km")], ["Douala Devs", "Buea Coders"])
+        self.assertEqual(nearby.get(pk=self.douala.pk).distance_km, 0)
+
+    def test_near_filter_on_list_page(self):
+        response = self.client.get(reverse("hub:communities"), {"near": "Douala", "radius": "250"})
+        names = [community.name for community in response.context["communities"]]
+        self.assertEqual(names, ["Douala Devs", "Buea Coders", "Yaounde Guild"])
+        self.assertContains(response, "km away")
+        response = self.client.get(reverse("hub:communities"), {"near": "Atlantis"})
+        self.assertEqual(len(response.context["communities"]), 0)
+
+    def test_nearby_api(self):
+        School.objects.create(name="Buea University", city="Buea")
+        response = self.client.get(reverse("hub:api-nearby"), {"place": "Limbé", "radius": "40"})
+        payload = response.json()
+        self.assertEqual(payload["origin"]["place"], "Limbe")
+        self.assertEqual([c["name"] for c in payload["communities"]], ["Buea Coders"])
+        self.assertEqual(payload["schools"][0]["city"], "Buea")
+        self.assertLess(payload["schools"][0]["distance_km"], 40)
+
+        for params in ({"place": "Atlantis"}, {"lat": "x", "lon": "1"}, {"place": "Buea", "radius": "-1"}, {}):
+            self.assertEqual(self.client.get(reverse("hub:api-nearby"), params).status_code, 400)
+
+
+class RecommendationTests(TestCase):
+    """Test relations between directory rows and precomputed recommendations."""
+
+    def setUp(self):
+        self.ada = Person.objects.create(name="Ada", role="Dev", interests=["Django", "Python", "APIs"])
+        self.bob = Person.objects.create(name="Bob", role="Dev", interests=["django", "Python"])
+        self.cy = Person.objects.create(name="Cy", role="Designer", interests=["Figma"])
+        self.pyladies = Community.objects.create(name="PyLadies")
+        self.djangonauts = Community.objects.create(name="Djangonauts")
+        self.design = Community.objects.create(name="Designers")
+        Membership.objects.create(person=self.ada, community=self.pyladies, role="Organizer")
+        Membership.objects.create(person=self.bob, community=self.djangonauts)
+        Membership.objects.create(person=self.cy, community=self.design)
+        self.school = School.objects.create(name="Tech School")
+        Affiliation.objects.create(person=self.ada, school=self.school, kind=Affiliation.ALUMNUS)
+
+    def test_top_matches_ranks_by_jaccard(self):
+        matches = top_matches({1: {"a", "b"}, 2: {"a", "b", "c"}, 3: {"a", "d", "e", "f"}, 4: {"z"}}, top_k=2)
+        self.assertEqual(matches[1], [(2, 2 / 3), (3, 1 / 5)])
+        self.assertNotIn(4, matches)
+
+    def test_build_recommendations(self):
+        self.assertEqual(build_recommendations(), (2, 2))
+        link = SimilarPerson.objects.get(person=self.ada)
+        self.assertEqual((link.similar, link.rank), (self.bob, 1))
+        self.assertEqual(RelatedCommunity.objects.get(community=self.pyladies).related, self.djangonauts)
+        self.assertFalse(RelatedCommunity.objects.filter(community=self.design).exists())
+        # Rebuilding replaces the previous rows.
+        self.assertEqual(build_recommendations(top_k=1), (2, 2))
+
+    def test_person_detail_renders_relations_with_prefetches(self):
+        build_recommendations()
+        with self.assertNumQueries(4):  # Person, memberships, affiliations, similar people.
+            response = self.client.get(self.ada.get_absolute_url())
+        self.assertContains(response, "PyLadies")
+        self.assertContains(response, "Alumnus")
+        self.assertContains(response, self.bob.get_absolute_url())
+
+    def test_community_and_school_pages_list_people(self):
+        build_recommendations()
+        response = self.client.get(self.pyladies.get_absolute_url())
+        self.assertContains(response, "Organizer")
+        self.assertContains(response, self.djangonauts.get_absolute_url())
+        self.assertContains(self.client.get(self.school.get_absolute_url()), self.ada.get_absolute_url())
+
+    def test_command(self):
+        out = io.StringIO()
+        call_command("build_recommendations", "--top-k", "3", stdout=out)
+        self.assertIn("Stored 2 similar-people and 2 related-community links", out.getvalue())
+
+
+class SimilarityTests(TestCase):
+    """Test the vector similarity engine behind "similar people"."""
+
+    def test_vectors_are_unit_length_and_weighted(self):
+        vectors = person_similarity.encode([
+            (1, ["Django", "Python"], "Backend Developer", "Mentoring"),
+            (2, ["Python"], "Developer", ""),
+            (3, [], "", ""),
+        ])
+        self.assertAlmostEqual(sum(w * w for w in vectors[1].values()), 1.0)
+        self.assertEqual(vectors[3], {})
+        # The rarer interest outweighs the shared one.
+        self.assertGreater(vectors[1]["i:django"], vectors[1]["i:python"])
+
+    def test_neighbors_match_brute_force_cosine(self):
+        rows = [(pk, [f"t{pk % 3}", f"t{pk % 5}"], "dev" if pk % 2 else "designer", "") for pk in range(1, 31)]
+        vectors = person_similarity.encode(rows)
+        lists = person_similarity.neighbors(vectors, top_k=3, min_score=0.0)
+        for pk, ranked in lists.items():
+            expected = sorted(
+                ((-sum(w * vectors[other].get(f, 0.0) for f, w in vectors[pk].items()), other)
+                 for other in vectors if other != pk),
+            )[:3]
+            self.assertEqual([other for other, _ in ranked], [other for _, other in expected])
+
+    def setUp(self):
+        person_similarity.vector_index.reset()
+        self.queue = IndexQueue(autostart=False)
+        self.queue.register(person_similarity.apply)
+
+    def test_saves_refresh_only_affected_rows(self):
+        people = [
+            Person.objects.create(name=f"Web {i}", role="Dev", interests=["Django", "HTML", f"w{i}"])
+            for i in range(8)
+        ] + [
+            Person.objects.create(name=f"Data {i}", role="Analyst", interests=["Pandas", "SQL", f"d{i}"])
+            for i in range(8)
+        ]
+        for i in range(8):
+            Person.objects.create(name=f"Design {i}", role="Designer", interests=["Figma", f"x{i}"])
+        person_similarity.rebuild(top_k=3)
+        design_links = set(SimilarPerson.objects.filter(person__name__startswith="Design").values_list("pk", flat=True))
+
+        mover = people[0]
+        mover.interests = ["Pandas", "SQL", "d0"]
+        mover.role = "Analyst"
+        mover.save()
+        self.queue.put_pks(Person, [mover.pk])
+        with self.assertNumQueries(8):  # Load the index; read, delete and store the lists it changes.
+            self.queue.flush()
+
+        self.assertTrue(SimilarPerson.objects.filter(person=mover, similar__name="Data 0").exists())
+        self.assertFalse(SimilarPerson.objects.filter(person=mover, similar__name__startswith="Web").exists())
+        self.assertTrue(SimilarPerson.objects.filter(person__name="Data 0", similar=mover).exists())
+        self.assertFalse(SimilarPerson.objects.filter(person__name__startswith="Web", similar=mover).exists())
+        # Rows the change cannot affect keep their stored links.
+        self.assertEqual(
+            set(SimilarPerson.objects.filter(person__name__startswith="Design").values_list("pk", flat=True)),
+            design_links,
+        )
+
+    def test_bulk_reloads_leave_lists_to_a_rebuild(self):
+        Person.objects.create(name="Ada", interests=["Django"])
+        Person.objects.create(name="Bob", interests=["Django"])
+        self.queue.put_model(Person)
+        with self.assertNumQueries(0):
+            self.queue.flush()
+        self.assertFalse(SimilarPerson.objects.exists())
+
+
+class StructuredQueryTests(TestCase):
+    """Test the field:value filter language."""
+
+    def setUp(self):
+        self.ada = Person.objects.create(
+            name="Ada", role="Tech Lead", interests=["Django", "Web Design"], availability="Mentoring"
+        )
+        self.bob = Person.objects.create(name="Bob", role="Lead Dev", interests=["Python"], availability="Speaking")
+        self.cy = Person.objects.create(name="Cy", role="Designer", interests=["Design"], availability="")
+        self.club = Community.objects.create(name="Douala Club", location="Douala")
+        Membership.objects.create(person=self.ada, community=self.club)
+
+    def names(self, view, params):
+        response = self.client.get(reverse(f"hub:{view}"), params)
+        return sorted(item.name for item in response.context[view])
+
+    def test_parse(self):
+        query = parse(Person, 'interest:Django,PYTHON -availability:speaking role:"tech lead" hello http://x')
+        self.assertEqual(query.terms, (
+            Term("interest", ("django", "python")),
+            Term("availability", ("speaking",), negated=True),
+            Term("role", ("tech lead",)),
+        ))
+        self.assertEqual(query.text, "hello http://x")
+        self.assertEqual(parse(Community, "city:buea").terms, (Term("location", ("buea",)),))
+        with self.assertRaises(QueryError):
+            parse(Person, "role:")
+
+    def test_people_filters(self):
+        self.assertEqual(self.names("people", {"q": "interest:django,python role:lead"}), ["Ada", "Bob"])
+        self.assertEqual(self.names("people", {"q": "interest:django,python -availability:speaking"}), ["Ada"])
+        # Tags match whole items: "design" is not "web design".
+        self.assertEqual(self.names("people", {"q": "interest:design"}), ["Cy"])
+        self.assertEqual(self.names("people", {"search": "community:douala"}), ["Ada"])
+
+    def test_free_text_still_ranks(self):
+        response = self.client.get(reverse("hub:people"), {"search": "role:lead bob"})
+        self.assertEqual([p.name for p in response.context["people"]], ["Bob"])
+
+    def test_relations_filter_without_duplicates(self):
+        Membership.objects.create(person=self.bob, community=self.club)
+        self.assertEqual(self.names("communities", {"q": "member:ada,bob"}), ["Douala Club"])
+        self.assertEqual(self.names("communities", {"q": "interest:python"}), ["Douala Club"])
+        self.assertEqual(self.names("communities", {"q": "-member:ada"}), [])
+
+    def test_plans_are_cached(self):
+        plan.cache_clear()
+        for _ in range(3):
+            self.client.get(reverse("hub:people"), {"q": "interest:django"})
+        self.assertEqual(plan.cache_info().hits, 2)
+
+    def test_errors(self):
+        response = self.client.get(reverse("hub:people"), {"q": "role:"})
+        self.assertEqual(response.context["query_error"], "No value given for role:.")
+        self.assertEqual(self.client.get(reverse("hub:api-people"), {"q": "role:"}).status_code, 400)
+
+    def test_api(self):
+        response = self.client.get(reverse("hub:api-people"), {"q": "interest:python", "fields": "name"})
+        self.assertEqual(json.loads(b"".join(response.streaming_content))["results"], [{"name": "Bob"}])
+
+
+class TrigramIndexTests(TestCase):
+    """Test that Postgres trigram search is written to use its GIN index."""
+
+    def test_query_uses_indexed_operator(self):
+        sql = str(rank_queryset(Person.objects.all(), "Django", trigram=True).query)
+        self.assertIn(
+            '"hub_person"."name_folded" || \' \' || "hub_person"."role_folded" || \' \' || "hub_person"."interests_folded"',
+            sql,
+        )
+        self.assertIn("<% (", sql)
+        self.assertNotIn("GREATEST", sql)
+
+    def test_migration_indexes_the_queried_document(self):
+        migration = importlib.import_module("hub.migrations.0009_trigram_indexes")
+        self.assertEqual(
+            migration.TRIGRAM_DOCUMENTS,
+            {model._meta.db_table: columns for model, columns in TRIGRAM_DOCUMENTS.items()},
+        )
+
+    @skipUnless(connection.vendor == "postgresql", "needs Postgres with pg_trgm")
+    def test_postgres_plan_uses_trigram_index(self):
+        Person.objects.create(name="Ada", role="Django Developer")
+        Person.objects.create(name="Bob", role="Designer")
+        with connection.cursor() as cursor:
+            cursor.execute("SHOW pg_trgm.word_similarity_threshold")
+            self.assertEqual(float(cursor.fetchone()[0]), 0.2)
+            # Tiny test tables are cheaper to scan; make the planner show
+            # whether the index can serve the query at all.
+            cursor.execute("SET enable_seqscan = off")
+        try:
+            for model in TRIGRAM_DOCUMENTS:
+                plan = rank_queryset(model.objects.all(), "djnago", trigram=True).explain()
+                self.assertIn(f"{model._meta.db_table}_trgm_idx", plan)
+            self.assertEqual(
+                [p.name for p in rank_queryset(Person.objects.all(), "djnago", trigram=True)], ["Ada"]
+            )
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute("RESET enable_seqscan")
+
+
+class StartupTests(TestCase):
+    """Test the public worker profile and the startup profiler."""
+
+    def test_summarize_importtime(self):
+        rows = parse_importtime(
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |     django.utils.text\n"
+            "import time:      1000 |       1120 |   django.utils\n"
+            "import time:       300 |       1420 | hub.views\n"
+        )
+        self.assertEqual(rows[0], ("django.utils.text", 120, 120))
+        self.assertEqual(summarize(rows), [("django.utils", 2, 1120), ("hub.views", 1, 300)])
+        self.assertEqual(summarize(rows, depth=1)[0], ("django", 2, 1120))
+
+    @override_settings(ROOT_URLCONF="djangonista.urls_public")
+    def test_public_urlconf_leaves_out_admin_and_staff_routes(self):
+        self.assertEqual(self.client.get(reverse("hub:people")).status_code, 200)
+        self.assertEqual(self.client.get("/admin/").status_code, 404)
+        with self.assertRaises(NoReverseMatch):
+            reverse("hub:api-metrics")
+
+    def test_public_workers_skip_admin_and_postgres_imports(self):
+        with mock.patch.dict(os.environ, {"DJANGO_SETTINGS_MODULE": "djangonista.settings_public"}):
+            modules = {module for module, _, _ in parse_importtime(_boot("-X", "importtime"))}
+        self.assertIn("hub.views", modules)
+        self.assertFalse({m for m in modules if m.startswith(("django.contrib.admin", "django.contrib.postgres"))})
+
+    def test_profile_startup_command(self):
+        out = io.StringIO()
+        call_command("profile_startup", runs=1, top=3, stdout=out)
+        self.assertIn("1 runs: min", out.getvalue())
+        self.assertIn("django.db", out.getvalue())
+
+
+class WarmupTests(TestCase):
+    """Test the worker warmup hook."""
+
+    def setUp(self):
+        facets.invalidate()
+        fuzzy_index.reset()
+        self.addCleanup(fuzzy_index.reset)
+        Person.objects.create(name="Ada", role="Engineer", interests=["Django"])
+
+    def test_warm_up_primes_caches_and_logs_timings(self):
+        with self.assertLogs("hub.warmup", "INFO") as logs:
+            results = warm_up()
+        self.assertEqual(list(results), ["urls", "templates", "connections", "caches"])
+        self.assertTrue(fuzzy_index.is_built(Person))
+        with self.assertNumQueries(0):
+            facets.row_count(Person)
+            facets.facet_values(Person, "interests")
+        self.assertIn("Worker warmed up in", logs.output[-1])
+        self.assertIn("search", results["caches"][1])
+
+    def test_timings_reach_the_console(self):
+        stream = io.StringIO()
+        handler = logging.getLogger("hub.warmup").handlers[0]
+        with mock.patch.object(handler, "stream", stream):
+            warm_up(["urls"])
+        self.assertIn("Warmup urls:", stream.getvalue())
+
+    def test_failing_step_does_not_stop_the_others(self):
+        with mock.patch("hub.warmup.precompile_templates", side_effect=RuntimeError("boom")):
+            with self.assertLogs("hub.warmup", "ERROR"):
+                results = warm_up()
+        self.assertIsNone(results["templates"][1])
+        self.assertIsNotNone(results["caches"][1])
+
+    def test_warmup_command(self):
+        out = io.StringIO()
+        call_command("warmup", step=["urls", "caches"], stdout=out)
+        self.assertIn("caches", out.getvalue())
+        self.assertNotIn("templates", out.getvalue())
+        self.assertIn("Warmed up in", out.getvalue())
+
+
+class SharedStoreTests(TestCase):
+    """Test the mmap'd store shared by workers."""
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = Path(directory) / "store.bin"
+        settings_override = override_settings(HUB_SHARED_STORE_PATH=str(self.path))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        facets.invalidate()
+        self.addCleanup(facets.invalidate)
+        Person.objects.create(name="Ada Lovelace", role="Engineer", interests=["Django", "Math"])
+        Person.objects.create(name="Émile Ngono", role="Designer", interests=["Design"])
+        School.objects.create(name="University of Buea", city="Buea", programs=["CS"])
+
+    def test_string_table_decodes_lazily(self):
+        table = sharedstore.StringTable(memoryview(sharedstore.pack_strings(["a", "", "Yaoundé"])))
+        self.assertEqual((len(table), table[2], table[-2]), (3, "Yaoundé", ""))
+        self.assertEqual(list(table), ["a", "", "Yaoundé"])
+
+    def test_workers_read_counts_and_facets_from_the_store(self):
+        sharedstore.build()
+        with self.assertNumQueries(0):
+            self.assertEqual(facets.row_count(Person), 2)
+            self.assertEqual(facets.facet_counts(Person, "interests"), [("Design", 1), ("Django", 1), ("Math", 1)])
+            self.assertEqual(facets.facet_values(School, "city"), ["Buea"])
+
+    def test_rebuilds_replace_the_version_workers_read(self):
+        sharedstore.build()
+        old = sharedstore.shared_store()
+        Person.objects.create(name="Bob", role="Engineer")
+        self.assertEqual(sharedstore.shared_store().count(Person), 2)  # Saves never rebuild in-line.
+        sharedstore.build()
+        new = sharedstore.shared_store()
+        self.assertGreater(new.version, old.version)
+        self.assertEqual((old.count(Person), new.count(Person)), (2, 3))
+        self.assertEqual(facets.facet_counts(Person, "role"), [("Designer", 1), ("Engineer", 2)])
+
+    def test_store_holds_rows_and_search_postings(self):
+        sharedstore.build()
+        snapshot = sharedstore.shared_store()
+        pks, names, slugs = snapshot.rows(Person)
+        self.assertEqual((list(names), list(slugs)), (["Ada Lovelace", "Émile Ngono"], ["ada-lovelace", "emile-ngono"]))
+        ada = Person.objects.get(name="Ada Lovelace")
+        self.assertEqual(snapshot.candidates(Person, "LOVEL"), {ada.pk})
+        self.assertEqual(snapshot.candidates(Person, "math"), {ada.pk})  # Interests are searched too.
+        self.assertEqual(snapshot.candidates(Person, "xyz"), set())
+        self.assertIsNone(snapshot.candidates(Person, "ad"))
+
+    @override_settings(HUB_FUZZY_SEARCH=False)
+    def test_search_narrows_through_the_store_without_missing_changes(self):
+        sharedstore.build()
+        ada = Person.objects.get(name="Ada Lovelace")
+        ada.name = "Ada Byron"
+        ada.save()
+        bob = Person.objects.create(name="Bob Byron")
+        with CaptureQueriesContext(connection) as ctx:
+            found = list(rank_queryset(Person.objects.all(), "byron"))
+        self.assertEqual({person.pk for person in found}, {ada.pk, bob.pk})
+        self.assertIn(".\"id\" IN (", ctx.captured_queries[-1]["sql"])
+        self.assertEqual(list(rank_queryset(Person.objects.all(), "lovelace")), [])
+
+    def test_an_older_build_never_replaces_a_newer_one(self):
+        newer = sharedstore.build()
+        Person.objects.create(name="Bob")
+        with mock.patch("hub.sharedstore.time.time_ns", return_value=newer - 1):
+            self.assertEqual(sharedstore.build(), newer)
+        self.assertEqual(sharedstore.file_version(self.path), newer)
+        self.assertEqual(sharedstore.shared_store().count(Person), 2)
+
+    def test_changes_schedule_one_delayed_rebuild(self):
+        update = IndexUpdate("hub.person", 1, {"name": "Ada"})
+        with override_settings(HUB_SHARED_STORE_REBUILD_DELAY=60):
+            sharedstore.apply([update])
+            timer = sharedstore._rebuild_timer
+            self.addCleanup(setattr, sharedstore, "_rebuild_timer", None)
+            self.addCleanup(timer.cancel)
+            sharedstore.apply([update])
+        self.assertIs(sharedstore._rebuild_timer, timer)
+        self.assertEqual(timer.interval, 60)
+
+    def test_unreadable_store_falls_back_to_the_database(self):
+        self.path.write_bytes(b"not a store")
+        self.assertIsNone(sharedstore.shared_store())
+        self.assertEqual(facets.row_count(Person), 2)
+
+    def test_build_command(self):
+        out = io.StringIO()
+        call_command("build_shared_store", stdout=out)
+        self.assertIn("2 people, 0 communities, 1 schools", out.getvalue())
+
+
+class SnapshotTests(TestCase):
+    """Test the binary directory snapshot format."""
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = Path(directory) / "directory.snap"
+        Person.objects.create(name="Zoé", role="Engineer", interests=["Django", "Data"])
+        Person.objects.create(name="Ada", role="Engineer", interests=[])
+        Community.objects.create(
+            name="Douala Devs", location="Douala", links={"github": "https://github.com/dd"}, founded_year=2019
+        )
+
+    def test_round_trip_matches_export(self):
+        write_snapshot(self.path, database_tables())
+        snapshot = DirectorySnapshot.open(self.path)
+        people = snapshot.table(Person)
+        expected = sorted(iter_rows(Person.objects.all()), key=lambda row: row["name"])
+        self.assertEqual([{k: v for k, v in row.items() if k != "slug"} for row in people], expected)
+        community = snapshot.table(Community)[0]
+        self.assertEqual(community["links"], {"github": "https://github.com/dd"})
+        self.assertEqual((community["founded_year"], community["member_count"]), (2019, None))
+        self.assertEqual(snapshot.table(School).fields[:2], ["slug", "name"])
+
+    def test_strings_are_interned_and_rows_decoded_lazily(self):
+        write_snapshot(self.path, database_tables([Person]))
+        snapshot = DirectorySnapshot.open(self.path)
+        self.assertEqual(list(snapshot._strings).count("Engineer"), 1)
+        people = snapshot.table(Person)
+        self.assertEqual(people.columns["role"][1], "Engineer")
+        self.assertEqual(people.get("Zoé")["interests"], ["Django", "Data"])
+        self.assertIsNone(people.get("Bob"))
+        with self.assertRaises(KeyError):
+            snapshot.table(School)
+
+    def test_rejects_other_files(self):
+        sharedstore.build(self.path)
+        with self.assertRaisesMessage(sharedstore.StoreError, "Not a HUBD file."):
+            DirectorySnapshot.open(self.path)
+
+    def test_seed_from_snapshot(self):
+        call_command("build_snapshot", output=str(self.path), stdout=io.StringIO())
+        Person.objects.all().delete()
+        Person.objects.create(name="Ada", role="Retired")
+        out = io.StringIO()
+        call_command("seed_snapshot", str(self.path), stdout=out)
+        self.assertIn("Created 1 and updated 1 people.", out.getvalue())
+        self.assertEqual(Person.objects.get(name="Ada").role, "Engineer")
+        self.assertEqual(Person.objects.get(name="Zoé").interests, ["Django", "Data"])
+
+    def test_compare_with_json(self):
+        out = io.StringIO()
+        call_command("build_snapshot", output=str(self.path), from_data=True, compare=True, stdout=out)
+        self.assertIn("json.load", out.getvalue())
+        self.assertEqual(len(DirectorySnapshot.open(self.path).table(Person)), len(load_json_data("people")))
+
+
+class ChangeLogTests(TestCase):
+    def changes(self, **params):
+        response = self.client.get(reverse("hub:api-changes"), params)
+        if response.status_code != 200:
+            return response.status_code, json.loads(response.content)
+        return 200, json.loads(b"".join(response.streaming_content))
+
+    def log(self):
+        return list(ChangeLogEntry.objects.values_list("model_name", "action"))
+
+    def test_writes_are_logged_in_order(self):
+        person = Person.objects.create(name="Ada", role="Engineer")
+        person.role = "Architect"
+        person.save()
+        Community.objects.create(name="Django Denmark")
+        person.delete()
+        self.assertEqual(self.log(), [
+            ("person", "created"), ("person", "updated"), ("community", "created"), ("person", "deleted"),
+        ])
+
+    def test_save_and_its_entry_commit_together(self):
+        with mock.patch("hub.signals.log_changes", side_effect=IntegrityError):
+            with self.assertRaises(IntegrityError):
+                Person.objects.create(name="Ada")
+        self.assertFalse(Person.objects.exists())
+
+    def test_bulk_seed_is_logged(self):
+        Person.objects.create(name="Ada")
+        ChangeLogEntry.objects.all().delete()
+        bulk_seed(Person, [{"name": "Ada", "role": "Engineer"}, {"name": "Zoé"}])
+        self.assertEqual(sorted(self.log()), [("person", "created"), ("person", "updated")])
+
+    def test_feed_pages_with_since(self):
+        ada = Person.objects.create(name="Ada", role="Engineer")
+        Person.objects.create(name="Zoé")
+        School.objects.create(name="DTU")
+        _, page = self.changes(limit=2)
+        self.assertEqual([item["record"]["name"] for item in page["results"]], ["Ada", "Zoé"])
+        self.assertEqual(page["results"][0]["record"]["role"], "Engineer")
+        self.assertTrue(page["more"])
+        _, page = self.changes(since=page["next"])
+        self.assertEqual([(item["model"], item["action"]) for item in page["results"]], [("school", "created")])
+        self.assertFalse(page["more"])
+        _, caught_up = self.changes(since=page["next"])
+        self.assertEqual((caught_up["results"], caught_up["next"]), ([], page["next"]))
+
+        ada_id = ada.pk
+        ada.delete()
+        _, page = self.changes(model="person")
+        ada_changes = [item for item in page["results"] if item["id"] == ada_id]
+        self.assertEqual([item["action"] for item in ada_changes], ["created", "deleted"])
+        self.assertEqual([item["record"] for item in ada_changes], [None, None])
+
+    def test_rejects_bad_parameters(self):
+        self.assertEqual(self.changes(since="x")[0], 400)
+        self.assertEqual(self.changes(since=-1)[0], 400)
+        status, body = self.changes(model="planet")
+        self.assertEqual(status, 400)
+        self.assertIn("planet", body["error"])
+
+    @override_settings(HUB_CHANGE_FEED_DELAY_SECONDS=60)
+    def test_delay_holds_recent_entries_back(self):
+        Person.objects.create(name="Ada")
+        self.assertEqual(self.changes()[1]["results"], [])
+        ChangeLogEntry.objects.update(changed_at=timezone.now() - timedelta(minutes=2))
+        self.assertEqual(len(self.changes()[1]["results"]), 1)
+
+    def test_delay_defaults_to_zero_only_on_sqlite(self):
+        with mock.patch("hub.changelog.connections", {"default": mock.Mock(vendor="postgresql")}):
+            self.assertEqual(changelog.feed_delay(), changelog.DEFAULT_CONCURRENT_DELAY)
+        self.assertEqual(changelog.feed_delay(), 0)
+
+    def test_stream_changes_command(self):
+        for name in ("Ada", "Bob", "Zoé"):
+            Person.objects.create(name=name)
+        Community.objects.create(name="Django Denmark")
+        first = ChangeLogEntry.objects.first().seq
+        out = io.StringIO()
+        call_command("stream_changes", since=first, batch_size=1, model=["person"], stdout=out, stderr=io.StringIO())
+        lines = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([line["record"]["name"] for line in lines], ["Bob", "Zoé"])
@@ -1,9 +1,12 @@
 from django.urls import path
 
-from . import views
+from . import api, views
 
 app_name = "hub"
 
+# Routes needing a staff login; left out of the public-worker URLconf.
+STAFF_URL_NAMES = {"api-metrics"}
+
 urlpatterns = [
     path("", views.home, name="home"),
     path("people/", views.people_list, name="people"),
@@ -13,4 +16,13 @@ urlpatterns = [
     path("schools/", views.school_list, name="schools"),
     path("schools/<slug:slug>/", views.school_detail, name="school-detail"),
     path("api/search/", views.search_api, name="search-api"),
+    path("api/people/", api.people_collection, name="api-people"),
+    path("api/people/<slug:slug>/", api.person_detail, name="api-person-detail"),
+    path("api/communities/", api.community_collection, name="api-communities"),
+    path("api/communities/<slug:slug>/", api.community_detail, name="api-community-detail"),
+    path("api/schools/", api.school_collection, name="api-schools"),
+    path("api/schools/<slug:slug>/", api.school_detail, name="api-school-detail"),
+    path("api/nearby/", api.nearby, name="api-nearby"),
+    path("api/changes/", api.changes, name="api-changes"),
+    path("api/metrics/", api.metrics_snapshot, name="api-metrics"),
 ]
@@ -3,9 +3,14 @@
 from __future__ import annotations
 
 import json
+import os
+import unicodedata
+from functools import lru_cache
 from pathlib import Path
 
 from django.conf import settings
+from django.db import connection
+from django.db.models import Q
 
 
 def load_json_data(name: str):
@@ -19,3 +24,71 @@ def load_json_data(name: str):
     data_file = Path(settings.DATA_ROOT) / f"{name}.json"
     with data_file.open(encoding="utf-8") as handle:
         return json.load(handle)
+
+
+def fold_text(value) -> str:
+    """Return ``value`` accent-stripped, casefolded and whitespace-collapsed.
+
+    ``"Yaoundé"`` and ``"YAOUNDE"`` both fold to ``"yaounde"``.
+    """
+
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", str(value))
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.casefold().split())
+
+
+def fold_tokens(values) -> str:
+    """Fold each item of ``values`` and join them as ``"|python|web dev|"``.
+
+    The delimiters let ``contains`` lookups match whole items
+    (``"|web dev|"``) without one item's text running into the next.
+    """
+
+    tokens = [token for token in (fold_text(value) for value in values or ()) if token]
+    return f"|{'|'.join(tokens)}|" if tokens else ""
+
+
+@lru_cache(maxsize=1)
+def optional_numpy():
+    """The ``numpy`` module, or ``None`` when it is not installed.
+
+    Imported on first use rather than at module level: it would otherwise
+    be the largest import of every worker's boot.
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def prefix_q(column, prefix):
+    """``Q`` for rows whose folded ``column`` starts with ``prefix``, in a
+    form the column's index can serve.
+
+    SQLite only uses an index for ``LIKE`` on ``NOCASE`` columns, so there
+    the prefix becomes the equivalent range of (binary-ordered) values;
+    PostgreSQL serves ``LIKE 'abc%'`` from the pattern-ops index Django
+    adds for indexed ``CharField`` columns.
+    """
+    if connection.vendor == "sqlite" and prefix and prefix[-1] != "\U0010ffff":
+        return Q(**{f"{column}__gte": prefix, f"{column}__lt": prefix[:-1] + chr(ord(prefix[-1]) + 1)})
+    return Q(**{f"{column}__startswith": prefix})
+
+
+def setup_worker(settings_module):
+    """Process pool initializer: set Django up in a worker process.
+
+    Spawned workers (the default start method on macOS and Windows) start
+    from a fresh interpreter; forked ones must not reuse the parent's
+    database sockets. Lives here, away from the models, so a spawned worker
+    can import it before Django is set up.
+    """
+    import django
+    from django.db import connections
+
+    os.environ["DJANGO_SETTINGS_MODULE"] = settings_module
+    django.setup()
+    connections.close_all()
@@ -1,25 +1,40 @@
 """Views powering the community hub pages."""
 
+import re
+
 from django.core.paginator import Paginator
-from django.shortcuts import get_object_or_404, render
-from django.db.models import Q, Count
-from django.db.models.functions import Greatest
+from django.shortcuts import get_object_or_404
+from django.db.models import Prefetch
 from django.conf import settings
-from django.db import connection
-try:
-    from django.contrib.postgres.search import TrigramSimilarity
-    HAS_TRIGRAM = True
-except ImportError:
-    HAS_TRIGRAM = False
-
-def is_postgres():
-    return connection.vendor == 'postgresql'
 from django.http import JsonResponse
+from django.utils.cache import patch_cache_control
 from django.views.decorators.http import require_http_methods
-
-from .models import Community, Person, School
+from django.views.static import serve
+
+from . import geo
+from .facets import facet_values, row_count
+from .models import (
+    Affiliation, Community, Membership, Person, RelatedCommunity, School, SimilarPerson,
+)
+from .query import QueryError, apply_query
+from .ratelimit import SingleFlight, ratelimit
+from .scoring import match_text, rank_queryset, rerank, use_trigram
+from .templating import render_timed
+from .utils import fold_text
 
 PAGE_SIZE = 9
+# Choices offered for the "near" filter's radius, in km.
+NEAR_RADIUS_CHOICES = (10, 25, 50, 100, 250)
+SUGGESTION_LIMIT = 5
+# Rows fetched per model for the exact rerank behind search suggestions.
+SUGGESTION_CANDIDATES = 25
+DEFAULT_SEARCH_CACHE_SECONDS = 60
+
+search_flight = SingleFlight("search")
+
+# ManifestStaticFilesStorage inserts 12 hex digits of the MD5 before the extension.
+HASHED_ASSET_RE = re.compile(r"\.[0-9a-f]{12}\.[^/.]+$")
+ONE_YEAR = 60 * 60 * 24 * 365
 
 
 def home(request):
@@ -29,13 +44,13 @@ def home(request):
     recent_communities = Community.objects.order_by('-created_at')[:3]
     
     context = {
-        "people_count": Person.objects.count(),
-        "community_count": Community.objects.count(),
-        "school_count": School.objects.count(),
+        "people_count": row_count(Person),
+        "community_count": row_count(Community),
+        "school_count": row_count(School),
         "recent_people": recent_people,
         "recent_communities": recent_communities,
     }
-    return render(request, "hub/home.html", context)
+    return render_timed(request, "hub/home.html", context)
 
 
 def _paginate(request, queryset):
@@ -50,35 +65,20 @@ def _paginate(request, queryset):
 
 def _filter_people(queryset, request):
     """Apply search and filter logic to people queryset."""
-    search_query = request.GET.get('search', '').strip()
+    queryset, search_query = _apply_structured(queryset, request)
     role_filter = request.GET.get('role', '').strip()
     interest_filter = request.GET.get('interest', '').strip()
     availability_filter = request.GET.get('availability', '').strip()
     
     if search_query:
-        if HAS_TRIGRAM and is_postgres():
-            queryset = queryset.annotate(
-                similarity=Greatest(
-                    TrigramSimilarity('name', search_query),
-                    TrigramSimilarity('bio', search_query),
-                    TrigramSimilarity('role', search_query),
-                    TrigramSimilarity('availability', search_query),
-                )
-            ).filter(similarity__gt=0.2).order_by('-similarity')
-        else:
-            queryset = queryset.filter(
-                Q(name__icontains=search_query) |
-                Q(bio__icontains=search_query) |
-                Q(interests__icontains=search_query) |
-                Q(availability__icontains=search_query) |
-                Q(role__icontains=search_query)
-            )
+        queryset = rank_queryset(queryset, search_query, trigram=use_trigram())
     
     if role_filter:
-        queryset = queryset.filter(role__icontains=role_filter)
+        queryset = queryset.filter(role_folded__contains=fold_text(role_filter))
     
     if interest_filter:
-        queryset = queryset.filter(interests__icontains=interest_filter)
+        # Dropdown values are whole interests; match them item by item.
+        queryset = queryset.filter(interests_folded__contains=f"|{fold_text(interest_filter)}|")
     
     if availability_filter:
         queryset = queryset.filter(availability__icontains=availability_filter)
@@ -86,126 +86,156 @@ def _filter_people(queryset, request):
     return queryset
 
 
+def _apply_structured(queryset, request):
+    """Apply ``field:value`` terms from ``q`` and the search box.
+
+    Returns the filtered queryset and the remaining free-text search.
+    Raises :class:`~hub.query.QueryError` for malformed terms.
+    """
+    text = " ".join(filter(None, (request.GET.get('q', '').strip(), request.GET.get('search', '').strip())))
+    if not text:
+        return queryset, ''
+    return apply_query(queryset, text)
+
+
+def _list_queryset(model, filter_func, request):
+    """Filtered rows for a list page, plus an error message for a bad query."""
+    try:
+        return filter_func(model.objects.all(), request), None
+    except QueryError as exc:
+        return model.objects.none(), str(exc)
+
+
+def _filter_near(queryset, request, ranked):
+    """Keep rows within ``radius`` km (default 50) of the ``near`` place.
+
+    Unknown places match nothing. Unless search relevance already orders
+    the rows, the nearest come first.
+    """
+    near = request.GET.get('near', '').strip()
+    if not near:
+        return queryset
+    place = geo.geocode(near)
+    if place is None:
+        return queryset.none()
+    try:
+        radius = geo.parse_radius(request.GET.get('radius', '').strip())
+    except ValueError:
+        radius = geo.DEFAULT_RADIUS_KM
+    queryset = geo.within(queryset, place.lat, place.lon, radius)
+    return queryset if ranked else queryset.order_by('distance_km', 'name')
+
+
 def _filter_communities(queryset, request):
     """Apply search and filter logic to communities queryset."""
-    search_query = request.GET.get('search', '').strip()
+    queryset, search_query = _apply_structured(queryset, request)
     location_filter = request.GET.get('location', '').strip()
     focus_filter = request.GET.get('focus', '').strip()
     
     if search_query:
-        if HAS_TRIGRAM and is_postgres():
-            queryset = queryset.annotate(
-                similarity=Greatest(
-                    TrigramSimilarity('name', search_query),
-                    TrigramSimilarity('description', search_query),
-                    TrigramSimilarity('focus', search_query),
-                    TrigramSimilarity('location', search_query),
-                )
-            ).filter(similarity__gt=0.2).order_by('-similarity')
-        else:
-            queryset = queryset.filter(
-                Q(name__icontains=search_query) |
-                Q(description__icontains=search_query) |
-                Q(focus__icontains=search_query) |
-                Q(location__icontains=search_query)
-            )
+        queryset = rank_queryset(queryset, search_query, trigram=use_trigram())
     
     if location_filter:
-        queryset = queryset.filter(location__icontains=location_filter)
+        queryset = queryset.filter(location_folded__contains=fold_text(location_filter))
     
     if focus_filter:
         queryset = queryset.filter(focus__icontains=focus_filter)
     
-    return queryset
+    return _filter_near(queryset, request, ranked=bool(search_query))
 
 
 def _filter_schools(queryset, request):
     """Apply search and filter logic to schools queryset."""
-    search_query = request.GET.get('search', '').strip()
+    queryset, search_query = _apply_structured(queryset, request)
     city_filter = request.GET.get('city', '').strip()
     
     if search_query:
-        if HAS_TRIGRAM and is_postgres():
-            queryset = queryset.annotate(
-                similarity=Greatest(
-                    TrigramSimilarity('name', search_query),
-                    TrigramSimilarity('city', search_query),
-                )
-            ).filter(similarity__gt=0.2).order_by('-similarity')
-        else:
-            queryset = queryset.filter(
-                Q(name__icontains=search_query) |
-                Q(programs__icontains=search_query) |
-                Q(city__icontains=search_query)
-            )
+        queryset = rank_queryset(queryset, search_query, trigram=use_trigram())
     
     if city_filter:
-        queryset = queryset.filter(city__icontains=city_filter)
+        queryset = queryset.filter(city_folded__contains=fold_text(city_filter))
     
-    return queryset
+    return _filter_near(queryset, request, ranked=bool(search_query))
 
 
 def people_list(request):
     """Directory of contributors and mentors."""
-    queryset = Person.objects.all()
-    queryset = _filter_people(queryset, request)
+    queryset, query_error = _list_queryset(Person, _filter_people, request)
     
     # Get filter options for dropdowns
-    roles = Person.objects.values_list('role', flat=True).distinct().exclude(role='')
-    interests = []
-    for person in Person.objects.all():
-        interests.extend(person.interests or [])
-    interests = sorted(list(set(interests)))
+    roles = facet_values(Person, 'role')
+    interests = facet_values(Person, 'interests')
     
     page_obj = _paginate(request, queryset)
     context = {
         "page_obj": page_obj, 
         "people": page_obj,
-        "roles": sorted(roles),
+        "query_error": query_error,
+        "current_query": request.GET.get('q', ''),
+        "roles": roles,
         "interests": interests,
         "current_search": request.GET.get('search', ''),
         "current_role": request.GET.get('role', ''),
         "current_interest": request.GET.get('interest', ''),
         "current_availability": request.GET.get('availability', ''),
     }
-    return render(request, "hub/people.html", context)
+    return render_timed(request, "hub/people.html", context)
 
 
 def people_detail(request, slug):
     """Detail page for a single contributor."""
-    person = get_object_or_404(Person, slug=slug)
-    return render(request, "hub/person_detail.html", {"person": person})
+    person = get_object_or_404(
+        Person.objects.prefetch_related(
+            Prefetch("memberships", queryset=Membership.objects.select_related("community")),
+            Prefetch("affiliations", queryset=Affiliation.objects.select_related("school")),
+            Prefetch("similar_links", queryset=SimilarPerson.objects.select_related("similar")),
+        ),
+        slug=slug,
+    )
+    return render_timed(request, "hub/person_detail.html", {"person": person})
 
 
 def community_list(request):
     """Directory of communities that collaborate with Django Cameroon."""
-    queryset = Community.objects.all()
-    queryset = _filter_communities(queryset, request)
+    queryset, query_error = _list_queryset(Community, _filter_communities, request)
     
     # Get filter options for dropdowns
-    locations = Community.objects.values_list('location', flat=True).distinct().exclude(location='')
+    locations = facet_values(Community, 'location')
     
     page_obj = _paginate(request, queryset)
     context = {
         "page_obj": page_obj, 
         "communities": page_obj,
-        "locations": sorted(locations),
+        "query_error": query_error,
+        "current_query": request.GET.get('q', ''),
+        "locations": locations,
+        "places": [place.name for place in geo.places("city")],
+        "radii": NEAR_RADIUS_CHOICES,
+        "default_radius": geo.DEFAULT_RADIUS_KM,
         "current_search": request.GET.get('search', ''),
         "current_location": request.GET.get('location', ''),
+        "current_near": request.GET.get('near', ''),
+        "current_radius": request.GET.get('radius', ''),
     }
-    return render(request, "hub/communities.html", context)
+    return render_timed(request, "hub/communities.html", context)
 
 
 def community_detail(request, slug):
     """Detail page for a partner community."""
-    community = get_object_or_404(Community, slug=slug)
+    community = get_object_or_404(
+        Community.objects.prefetch_related(
+            Prefetch("memberships", queryset=Membership.objects.select_related("person").order_by("person__name")),
+            Prefetch("related_links", queryset=RelatedCommunity.objects.select_related("related")),
+        ),
+        slug=slug,
+    )
     links = community.links or {}
     link_items = [
         ("Website", links.get("website")),
         ("Twitter", links.get("twitter")),
     ]
     link_items = [item for item in link_items if item[1]]
-    return render(
+    return render_timed(
         request,
         "hub/community_detail.html",
         {"community": community, "link_items": link_items},
@@ -214,113 +244,117 @@ def community_detail(request, slug):
 
 def school_list(request):
     """Directory of schools and innovation hubs."""
-    queryset = School.objects.all()
-    queryset = _filter_schools(queryset, request)
+    queryset, query_error = _list_queryset(School, _filter_schools, request)
     
     # Get filter options for dropdowns
-    cities = School.objects.values_list('city', flat=True).distinct().exclude(city='')
+    cities = facet_values(School, 'city')
     
     page_obj = _paginate(request, queryset)
     context = {
         "page_obj": page_obj, 
         "schools": page_obj,
-        "cities": sorted(cities),
+        "query_error": query_error,
+        "current_query": request.GET.get('q', ''),
+        "cities": cities,
         "current_search": request.GET.get('search', ''),
         "current_city": request.GET.get('city', ''),
+        "current_near": request.GET.get('near', ''),
     }
-    return render(request, "hub/schools.html", context)
+    return render_timed(request, "hub/schools.html", context)
 
 
 def school_detail(request, slug):
     """Detail page for a school or innovation hub."""
-    school = get_object_or_404(School, slug=slug)
-    return render(request, "hub/school_detail.html", {"school": school})
+    school = get_object_or_404(
+        School.objects.prefetch_related(
+            Prefetch("affiliations", queryset=Affiliation.objects.select_related("person").order_by("person__name")),
+        ),
+        slug=slug,
+    )
+    return render_timed(request, "hub/school_detail.html", {"school": school})
 
 
-@require_http_methods(["GET"])
-def search_api(request):
-    """API endpoint for search suggestions."""
-    query = request.GET.get('q', '').strip()
+def _suggestions(model, query, trigram):
+    """Top search suggestions: the database's best candidates, reranked exactly."""
+    candidates = rank_queryset(model.objects.all(), query, trigram=trigram)[:SUGGESTION_CANDIDATES]
+    return [obj for obj, _ in rerank(candidates, query)[:SUGGESTION_LIMIT]]
+
+
+def _search_results(query):
+    trigram = use_trigram()
     results = {
         'people': [],
         'communities': [],
-        'schools': []
+        'schools': [],
     }
-    if len(query) < 2:
-        return JsonResponse(results)
-    
-    # Search people
-    if HAS_TRIGRAM and query and is_postgres():
-        people = Person.objects.annotate(
-            similarity=Greatest(
-                TrigramSimilarity('name', query),
-                TrigramSimilarity('role', query),
-                TrigramSimilarity('bio', query),
-                TrigramSimilarity('availability', query),
-            )
-        ).filter(similarity__gt=0.2).order_by('-similarity')[:5]
-    else:
-        people = Person.objects.filter(
-            Q(name__icontains=query) | 
-            Q(role__icontains=query) |
-            Q(bio__icontains=query) |
-            Q(availability__icontains=query)
-        )[:5]
-
+    people = _suggestions(Person, query, trigram)
     for person in people:
         results['people'].append({
             'name': person.name,
             'role': person.role,
             'url': person.get_absolute_url(),
-            'avatar': person.avatar_url or None
+            'avatar': person.avatar_url or None,
+            'match': match_text(person),
         })
 
-    # Search communities
-    if HAS_TRIGRAM and query and is_postgres():
-        communities = Community.objects.annotate(
-            similarity=Greatest(
-                TrigramSimilarity('name', query),
-                TrigramSimilarity('focus', query),
-                TrigramSimilarity('location', query),
-                TrigramSimilarity('description', query),
-            )
-        ).filter(similarity__gt=0.2).order_by('-similarity')[:5]
-    else:
-        communities = Community.objects.filter(
-            Q(name__icontains=query) | 
-            Q(focus__icontains=query) |
-            Q(location__icontains=query) |
-            Q(description__icontains=query)
-        )[:5]
-
+    communities = _suggestions(Community, query, trigram)
     for community in communities:
         results['communities'].append({
             'name': community.name,
             'location': community.location,
             'url': community.get_absolute_url(),
-            'logo': community.logo_url or None
+            'logo': community.logo_url or None,
+            'match': match_text(community),
         })
 
-    # Search schools
-    if HAS_TRIGRAM and query and is_postgres():
-        schools = School.objects.annotate(
-            similarity=Greatest(
-                TrigramSimilarity('name', query),
-                TrigramSimilarity('city', query),
-            )
-        ).filter(similarity__gt=0.2).order_by('-similarity')[:5]
-    else:
-        schools = School.objects.filter(
-            Q(name__icontains=query) | 
-            Q(city__icontains=query) |
-            Q(programs__icontains=query)
-        )[:5]
-
+    schools = _suggestions(School, query, trigram)
     for school in schools:
         results['schools'].append({
             'name': school.name,
             'city': school.city,
-            'url': school.get_absolute_url()
+            'url': school.get_absolute_url(),
+            'match': match_text(school),
         })
 
-    return JsonResponse(results)
+    # Trigram and typo matches are not substring matches: a longer query can
+    # find rows a shorter one did not, so the client must ask again.
+    substring_only = not trigram and not getattr(settings, "HUB_FUZZY_SEARCH", False)
+    results['complete'] = substring_only and all(len(items) < SUGGESTION_LIMIT for items in results.values())
+    return results
+
+
+@require_http_methods(["GET"])
+@ratelimit("search")
+def search_api(request):
+    """API endpoint for search suggestions.
+
+    ``complete`` is true when no section hit the suggestion limit and matches
+    are plain substring matches, i.e. the response lists every match for any
+    longer query too. Each suggestion carries its folded ``match``
+    text, so the client can answer longer queries by filtering a complete
+    response instead of asking again. Concurrent identical queries share
+    one computation.
+    """
+    query = request.GET.get('q', '').strip()
+    if len(query) < 2:
+        return _cacheable(JsonResponse({'people': [], 'communities': [], 'schools': [], 'complete': True}))
+    results = search_flight.do(query, lambda: _search_results(query))
+    return _cacheable(JsonResponse(results))
+
+
+def _cacheable(response):
+    """Let browsers and shared caches reuse suggestions for a short while."""
+    max_age = getattr(settings, "HUB_SEARCH_CACHE_SECONDS", DEFAULT_SEARCH_CACHE_SECONDS)
+    if max_age:
+        patch_cache_control(response, public=True, max_age=max_age)
+    return response
+
+
+def static_asset(request, path):
+    """Serve collected static files; hashed names are cached for a year."""
+    response = serve(request, path, document_root=settings.STATIC_ROOT)
+    if HASHED_ASSET_RE.search(path):
+        patch_cache_control(response, public=True, max_age=ONE_YEAR, immutable=True)
+    else:
+        patch_cache_control(response, public=True, no_cache=True)
+    return response
@@ -0,0 +1,116 @@
+"""Warm a worker up before it accepts traffic.
+
+Right after a deploy, the first requests each worker serves would pay for
+populating the URL resolver, compiling templates, connecting to the
+database and filling the in-process caches. :func:`warm_up` does all of
+that up front and logs how long each step took. ``wsgi.py`` and ``asgi.py``
+call it when ``HUB_WARMUP`` is set, and ``manage.py warmup`` runs it by
+hand.
+
+With a preloading prefork server (``gunicorn --preload``), the module-level
+hook runs once in the master and forked workers would share its database
+connections. Leave ``HUB_WARMUP`` off there and warm each worker after the
+fork instead::
+
+    # gunicorn.conf.py
+    def post_worker_init(worker):
+        from hub.warmup import warm_up
+        warm_up()
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.urls import get_resolver, reverse
+
+from . import facets, geo
+from .fuzzy import fuzzy_index
+from .instrumentation import metrics
+from .models import Community, Person, School
+from .scoring import rank_queryset, rerank, use_trigram
+from .templating import precompile_templates
+from .views import SUGGESTION_CANDIDATES
+
+logger = logging.getLogger(__name__)
+
+# Searched once per model to run the search and suggestion code paths.
+PRIME_QUERY = "warmup"
+
+
+def _resolve_urls():
+    resolver = get_resolver()
+    reverse("hub:home")  # Builds the reverse lookup tables too.
+    return f"{len(resolver.url_patterns)} top-level patterns"
+
+
+def _compile_templates():
+    return f"{len(precompile_templates())} templates"
+
+
+def _open_connections():
+    for alias in connections:
+        connections[alias].ensure_connection()
+    return f"{len(connections.all())} open"
+
+
+def _prime_caches():
+    # Home page counts, then every list page dropdown.
+    for model in (Person, Community, School):
+        facets.row_count(model)
+    for model, fields in facets.FACET_FIELDS.items():
+        for field in fields:
+            facets.facet_values(model, field)
+    geo.gazetteer()
+    primed = ["counts", "facets", "gazetteer"]
+    if getattr(settings, "HUB_FUZZY_SEARCH", False) and not use_trigram():
+        for model in fuzzy_index.fields:
+            fuzzy_index.build(model)
+        primed.append("fuzzy index")
+    # A search per model: compiles the ranking queries, and loads the
+    # pg_trgm or numpy code paths suggestions take.
+    trigram = use_trigram()
+    for model in (Person, Community, School):
+        rerank(rank_queryset(model.objects.all(), PRIME_QUERY, trigram=trigram)[:SUGGESTION_CANDIDATES], PRIME_QUERY)
+    primed.append("search")
+    return ", ".join(primed)
+
+
+# (name, step) in the order they run: caches are primed over the
+# connections opened before them.
+STEPS = (
+    ("urls", _resolve_urls),
+    ("templates", _compile_templates),
+    ("connections", _open_connections),
+    ("caches", _prime_caches),
+)
+
+
+def warm_up(steps=None):
+    """Run the warmup ``steps`` (names; default: all) and return
+    ``{name: (milliseconds, summary or None)}``.
+
+    A failing step is logged and skipped, so a worker still starts when,
+    say, the database is briefly unreachable; its summary is ``None``.
+    """
+    results = {}
+    start = time.perf_counter()
+    for name, step in STEPS:
+        if steps is not None and name not in steps:
+            continue
+        step_start = time.perf_counter()
+        try:
+            summary = step()
+        except Exception:
+            logger.exception("Warmup step %r failed.", name)
+            summary = None
+        elapsed = (time.perf_counter() - step_start) * 1000
+        metrics.observe(f"warmup.{name}", elapsed)
+        if summary is not None:
+            logger.info("Warmup %s: %s in %.1f ms.", name, summary, elapsed)
+        results[name] = (elapsed, summary)
+    logger.info("Worker warmed up in %.1f ms.", (time.perf_counter() - start) * 1000)
+    return results
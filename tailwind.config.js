@@ -0,0 +1,13 @@
+/** Tailwind configuration used by `manage.py build_assets`. */
+module.exports = {
+  content: [
+    "./hub/templates/**/*.html",
+    "./hub/static/hub/js/**/*.js",
+    // Models render a few snippets with format_html().
+    "./hub/models.py",
+  ],
+  theme: {
+    extend: {},
+  },
+  plugins: [],
+};